@@ -11,4 +11,6 @@ from . import compat
 from .basic import __version__
 from .basic import NAME, VERSION, AUTHOR, COPYRIGHT
 from .basic import Session, codepage, font
+if not compat.PY2:
+    from .basic import AsyncSession
 from .main import main, script_entry_point_guard
@@ -6,7 +6,10 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 from .data import NAME, VERSION, LONG_VERSION, AUTHOR, COPYRIGHT
+from ..compat import PY2
 from .api import Session, codepage, font
+if not PY2:
+    from .asyncapi import AsyncSession
 from .base.error import *
 from .base import signals, scancode, eascii
 
@@ -19,6 +19,11 @@ from . import state
 from ..data import read_codepage as codepage
 from ..data import read_fonts as font
 from .values import TYPE_TO_CLASS as SIGILS
+from .implementation import RUNNING, WAITING, ENDED, ERROR
+
+
+# session parameters that go into the template and are shared with clones
+TEMPLATE_PARAMS = ('syntax', 'codepage', 'box_protect', 'font', 'template')
 
 
 class Session(object):
@@ -37,7 +42,7 @@ class Session(object):
         """Context guard."""
         self.close()
         # catch Exit and Break events
-        if ex_type in (error.Exit, error.Break):
+        if ex_type in (error.Exit, error.InputClosed, error.Break):
             return True
 
     def __getstate__(self):
@@ -164,6 +169,18 @@ class Session(object):
         with self._impl.io_streams.activate():
             self._impl.interact()
 
+    def run(self, max_statements=None, max_time=None, command=None):
+        """
+        Run the interactive session for at most a number of statements and seconds.
+        If a command is given, start by executing it.
+        Returns 'running', 'waiting' for input, 'ended' at the prompt or 'error'.
+        """
+        self.start()
+        if isinstance(command, text_type):
+            command = self._impl.codepage.unicode_to_bytes(command)
+        with self._impl.io_streams.activate():
+            return self._impl.run(max_statements, max_time, command)
+
     def suspend(self, session_filename):
         """Save session object to file."""
         state.save_session(self, session_filename)
@@ -173,6 +190,20 @@ class Session(object):
         """Load new session object from file."""
         return state.load_session(session_filename)
 
+    @classmethod
+    def template(cls, **kwargs):
+        """Set up a session whose keyword tables, codepage and fonts are shared with its clones."""
+        return cls(template=implementation.Template(**kwargs), **kwargs)
+
+    def clone(self, **kwargs):
+        """Set up a new session with the same settings and fresh state; arguments are added."""
+        shared = set(kwargs) & set(TEMPLATE_PARAMS)
+        if shared:
+            raise ValueError("Can't change template parameters %s in clone" % (sorted(shared),))
+        if 'template' not in self._kwargs:
+            self._kwargs['template'] = implementation.Template(**self._kwargs)
+        return type(self)(**dict(self._kwargs, **kwargs))
+
     def close(self):
         """Close the session."""
         if self._impl:
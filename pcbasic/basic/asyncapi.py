@@ -0,0 +1,47 @@
+"""
+PC-BASIC - asyncapi.py
+Session API for asyncio
+
+(c) 2013--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import asyncio
+
+from .api import Session, WAITING, ENDED, ERROR
+
+
+class AsyncSession(object):
+    """BASIC session that runs in time slices, handing control to the event loop in between."""
+
+    def __init__(self, slice_time=0.01, wait_time=0.02, **kwargs):
+        """
+        Set up session object.
+        slice_time: seconds to run before handing control back to the event loop
+        wait_time: seconds to wait before looking again when waiting for input
+        Other keyword arguments are passed on to Session.
+        """
+        self.session = Session(**kwargs)
+        self._slice_time = slice_time
+        self._wait_time = wait_time
+
+    async def __aenter__(self):
+        """Context guard."""
+        return self
+
+    async def __aexit__(self, ex_type, ex_val, tb):
+        """Context guard."""
+        return self.session.__exit__(ex_type, ex_val, tb)
+
+    def __getattr__(self, attr):
+        """Use the Session API for anything that doesn't need to be run in slices."""
+        return getattr(self.session, attr)
+
+    async def run(self):
+        """Run until the command or program ends; return 'ended' or 'error'."""
+        while True:
+            status = self.session.run(max_time=self._slice_time)
+            if status in (ENDED, ERROR):
+                return status
+            # let other tasks run; if we're waiting, there's no point in coming back at once
+            await asyncio.sleep(self._wait_time if status == WAITING else 0)
@@ -7,129 +7,226 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import operator
+from itertools import chain
 from binascii import hexlify, unhexlify
 
-from ...compat import zip, int2byte, xrange, iterbytes, iterchar
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ...compat import zip, int2byte, xrange, iterbytes, iterchar, int_from_bytes, int_to_bytes
 
 
 class ByteMatrix(object):
-    """2D byte matrix."""
+    """
+    2D byte matrix.
+    Elements are stored row by row in a single buffer; row y starts at offset + y * pitch.
+    """
 
     def __init__(self, height=0, width=0, data=0):
         """Create a new matrix."""
         self._height = height
         self._width = width
+        self._offset = 0
+        self._pitch = width
         if not width and not height:
-            self._rows = [bytearray()]
+            self._buffer = bytearray()
         elif isinstance(data, int):
-            self._rows = [bytearray([data])*width for _ in xrange(self._height)]
+            self._buffer = bytearray([data]) * (width * height)
+        elif isinstance(data, (bytes, bytearray)) and len(data) == width * height:
+            self._buffer = bytearray(data)
         else:
             # assume iterable, TypeError if not
             data = list(data)
-            if len(data) == height:
-                if isinstance(data[0], int):
-                    # bytearrays and python3 bytes
-                    self._rows = [bytearray([_row]) for _row in data]
-                else:
-                    assert len(data[0]) == width
-                    self._rows = [bytearray(_row) for _row in data]
+            if len(data) == height and not isinstance(data[0], int):
+                assert len(data[0]) == width
+                self._buffer = bytearray().join(bytearray(_row) for _row in data)
             else:
+                # flat sequence; includes the case of a single column of ints
                 assert len(data) == height * width
-                self._rows = [
-                    bytearray(data[_offs : _offs+width])
-                    for _offs in xrange(0, len(data), width)
-                ]
+                self._buffer = bytearray(data)
 
     def __repr__(self):
         """Debugging representation."""
-        hexreps = [''.join('\\x{:02x}'.format(_c) for _c in _row) for _row in self._rows]
+        hexreps = [
+            ''.join('\\x{:02x}'.format(_c) for _c in bytearray(_row))
+            for _row in self._iter_rows()
+        ]
         return "ByteMatrix({0._height}, {0._width}, [\n    '{1}' ])".format(
             self, "',\n    '".join(hexreps)
         )
 
+    def _row_offsets(self, start=0, stop=None):
+        """Buffer offsets of the first element of the given rows."""
+        if stop is None:
+            stop = self._height
+        if not self._pitch:
+            # zero-width matrix
+            return [self._offset] * (stop - start)
+        return xrange(
+            self._offset + start * self._pitch, self._offset + stop * self._pitch, self._pitch
+        )
+
+    def _iter_rows(self):
+        """Iterate over the rows, as slices of the buffer."""
+        width = self._width
+        return (self._buffer[_offs:_offs+width] for _offs in self._row_offsets())
+
+    def _is_contiguous(self):
+        """The rows follow each other in the buffer without gaps."""
+        return self._pitch == self._width or self._height <= 1
+
+    def _to_bytearray(self):
+        """Copy the elements to a new contiguous bytearray."""
+        if self._is_contiguous():
+            return bytearray(self._buffer[self._offset : self._offset + self._height*self._width])
+        return bytearray().join(bytearray(_row) for _row in self._iter_rows())
+
+    def _get_range(self, index, size):
+        """Convert an int or slice index to a start, stop range."""
+        if isinstance(index, slice):
+            assert index.step in (None, 1)
+            start, stop, _ = index.indices(size)
+            return start, max(start, stop)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('ByteMatrix index out of range')
+        return index, index + 1
+
+    def _stepped_rows(self, y):
+        """View on the rows selected by a slice with a step."""
+        start, stop, step = y.indices(self._height)
+        return self._create_view(
+            len(xrange(start, stop, step)), self._width, self._pitch * step,
+            self._buffer, self._offset + start*self._pitch
+        )
+
     def __getitem__(self, index):
         """Extract items by [y, x] indexing or slicing or 1D index."""
         y, x = index
-        if isinstance(y, slice):
-            if isinstance(x, slice):
-                return self._create_from_rows([_row[x] for _row in self._rows[y]])
-            else:
-                return self._create_from_rows([bytearray([_row[x]]) for _row in self._rows[y]])
-        if isinstance(x, slice):
-            return self._create_from_rows([self._rows[y][x]])
-        return self._rows[y][x]
+        if isinstance(y, slice) and y.step not in (None, 1):
+            view = self._stepped_rows(y)[:, x]
+            if isinstance(self._buffer, memoryview):
+                return view
+            return self._create_from_buffer(view._height, view._width, view._to_bytearray())
+        if isinstance(x, slice) and x.step not in (None, 1):
+            rows = [bytearray(_row)[x] for _row in self[y, :]._iter_rows()]
+            return self._create_from_buffer(
+                len(rows), len(rows[0]) if rows else 0, bytearray().join(rows)
+            )
+        if not isinstance(y, slice) and not isinstance(x, slice):
+            y0, _ = self._get_range(y, self._height)
+            x0, _ = self._get_range(x, self._width)
+            return self._buffer[self._offset + y0*self._pitch + x0]
+        y0, y1 = self._get_range(y, self._height)
+        x0, x1 = self._get_range(x, self._width)
+        if isinstance(self._buffer, memoryview):
+            # slices of views are views
+            return self._create_view(
+                y1 - y0, x1 - x0, self._pitch, self._buffer, self._offset + y0*self._pitch + x0
+            )
+        width = x1 - x0
+        if width == self._pitch:
+            start = self._offset + y0*self._pitch
+            data = self._buffer[start : start + (y1-y0)*width]
+        else:
+            buf = self._buffer
+            data = bytearray().join(
+                buf[_offs+x0 : _offs+x1] for _offs in self._row_offsets(y0, y1)
+            )
+        return self._create_from_buffer(y1 - y0, width, data)
 
     def __setitem__(self, index, value):
         """Set items by [y, x] indexing or slicing."""
         y, x = index
+        if isinstance(y, slice) and y.step not in (None, 1):
+            self._stepped_rows(y)[:, x] = value
+            return
+        y0, y1 = self._get_range(y, self._height)
+        x0, x1 = self._get_range(x, self._width)
+        width = x1 - x0
+        buf = self._buffer
         if isinstance(value, int):
-            if isinstance(x, slice):
-                if isinstance(y, slice):
-                    for row in self._rows[y]:
-                        row[x] = bytearray(value for _ in iterbytes(row[x]))
-                else:
-                    self._rows[y][x] = bytearray(value for _ in iterbytes(self._rows[y][x]))
+            if not isinstance(x, slice) and not isinstance(y, slice):
+                buf[self._offset + y0*self._pitch + x0] = value
+                return
+            if width == self._pitch:
+                # whole rows: fill in one go
+                start = self._offset + y0*self._pitch
+                buf[start : start + (y1-y0)*width] = bytearray([value]) * ((y1-y0)*width)
             else:
-                if isinstance(y, slice):
-                    for row in self._rows[y]:
-                        row[x] = value
-                else:
-                    self._rows[y][x] = value
+                fill = bytearray([value]) * width
+                for offs in self._row_offsets(y0, y1):
+                    buf[offs+x0 : offs+x1] = fill
+            return
+        if isinstance(value, ByteMatrix):
+            # take a copy first, source and destination may overlap
+            src_width, src_height = value._width, value._height
+            src = value._to_bytearray()
+        elif type(value) == list:
+            src_height = len(value)
+            src_width = len(value[0]) if value else 0
+            src = bytearray().join(bytearray(_row) for _row in value)
         else:
-            if isinstance(value, ByteMatrix):
-                value = value._rows
-            elif type(value) not in (list, int):
-                raise TypeError(
-                    'Can only assign ByteMatrix, list of bytes-like or int, not %s.' % type(value)
-                )
-            if isinstance(y, slice):
-                if isinstance(x, slice):
-                    # this will fail if we're self-assigning a slice of a view to the original view
-                    # as we'll be overwriting the source while writing to the destination.
-                    # in those cases, we'll need to copy first
-                    for _dst, _src in zip(self._rows[y], value):
-                        # if x is a slice, this will copy too -> e.g. array[:] = another_array
-                        # but not if rhs is a view?
-                        _dst[x] = bytearray(_src)
-                else:
-                    for _dst, _src in zip(self._rows[y], value):
-                        # if x is a slice, this will copy too -> e.g. array[:] = another_array
-                        # but not if rhs is a view?
-                        _dst[x] = _src[0]
-            elif isinstance(x, slice):
-                assert len(value) == 1
-                self._rows[y][x] = value[0]
+            raise TypeError(
+                'Can only assign ByteMatrix, list of bytes-like or int, not %s.' % type(value)
+            )
+        # clip to the smaller of source and destination
+        height = min(y1-y0, src_height)
+        width = min(width, src_width)
+        if width <= 0 or height <= 0:
+            return
+        if width == self._pitch == src_width:
+            start = self._offset + y0*self._pitch
+            buf[start : start + height*width] = src[:height*width]
+        else:
+            for offs, src_offs in zip(
+                    self._row_offsets(y0, y0+height), xrange(0, height*src_width, src_width)
+                ):
+                buf[offs+x0 : offs+x0+width] = src[src_offs : src_offs+width]
 
     def __eq__(self, rhs):
         """Equality to other byte matrix."""
         # do quick checks first
-        return self.width == rhs.width and self.height == rhs.height and self._rows == rhs._rows
+        return (
+            self.width == rhs.width and self.height == rhs.height
+            and self._to_bytearray() == rhs._to_bytearray()
+        )
 
     def __ne__(self, rhs):
         """Non-equality to other byte matrix."""
         return not self.__eq__(rhs)
 
-    def _elementwise_list(self, rhs, oper):
-        """Helper for elementwise operations."""
+    def _elementwise_data(self, rhs, oper):
+        """Helper for elementwise operations, returns a contiguous bytearray."""
+        data = self._to_bytearray()
         if isinstance(rhs, int):
-            return [
-                bytearray(oper(_lbyte, rhs) for _lbyte in iterbytes(_lrow))
-                for _lrow in self._rows
-            ]
-        else:
-            assert self._height == rhs._height
-            assert self._width == rhs._width
-            return [
-                bytearray(
-                    oper(_lbyte, _rbyte)
-                    for _lbyte, _rbyte in zip(iterbytes(_lrow), iterbytes(_rrow))
-                )
-                for _lrow, _rrow in zip(self._rows, rhs._rows)
-            ]
+            # with a scalar operand, the operation is a translation of byte values
+            table = bytes(bytearray(oper(_byte, rhs) for _byte in xrange(256)))
+            return data.translate(table)
+        if not data:
+            # empty matrices combine with anything, as when clipping memory writes to the screen
+            return data
+        assert self._height == rhs._height
+        assert self._width == rhs._width
+        rhs_data = rhs._to_bytearray()
+        if oper in _WIDE_OPERATIONS:
+            return _wide_operation(data, rhs_data, oper)
+        if numpy is not None:
+            result = oper(
+                numpy.frombuffer(data, dtype=numpy.uint8),
+                numpy.frombuffer(rhs_data, dtype=numpy.uint8)
+            )
+            return bytearray(result.astype(numpy.uint8).tobytes())
+        return bytearray(
+            oper(_lbyte, _rbyte) for _lbyte, _rbyte in zip(iterbytes(data), iterbytes(rhs_data))
+        )
 
     def elementwise(self, rhs, oper):
         """Element-wise operation with another matrix or a scalar."""
-        return self._create_from_rows(self._elementwise_list(rhs, oper))
+        return self._create_from_buffer(self._height, self._width, self._elementwise_data(rhs, oper))
 
     def __or__(self, rhs):
         """Bitwise or."""
@@ -149,32 +246,34 @@ class ByteMatrix(object):
 
     def __lshift__(self, rhs):
         """Byte-masked left-shift."""
-        return self.elementwise(rhs, lambda _l, _r: (_l << _r) & 0xff)
+        return self.elementwise(rhs, _masked_lshift)
 
     def elementwise_inplace(self, rhs, oper):
         """In-place element-wise operation with another matrix or a scalar."""
-        self._rows = self._elementwise_list(rhs, oper)
+        self[:, :] = self._create_from_buffer(
+            self._height, self._width, self._elementwise_data(rhs, oper)
+        )
         return self
 
     def __ior__(self, rhs):
         """In-place bitwise or."""
-        return self.elementwise_inplace(rhs, operator.__ior__)
+        return self.elementwise_inplace(rhs, operator.__or__)
 
     def __iand__(self, rhs):
         """In-place bitwise and."""
-        return self.elementwise_inplace(rhs, operator.__iand__)
+        return self.elementwise_inplace(rhs, operator.__and__)
 
     def __ixor__(self, rhs):
         """In-place bitwise exclusive or."""
-        return self.elementwise_inplace(rhs, operator.__ixor__)
+        return self.elementwise_inplace(rhs, operator.__xor__)
 
     def __irshift__(self, rhs):
         """In-place right-shift."""
-        return self.elementwise_inplace(rhs, operator.__irshift__)
+        return self.elementwise_inplace(rhs, operator.__rshift__)
 
     def __ilshift__(self, rhs):
         """In-place left-shift."""
-        return self.elementwise_inplace(rhs, lambda _l, _r: (_l << _r) & 0xff)
+        return self.elementwise_inplace(rhs, _masked_lshift)
 
     @property
     def width(self):
@@ -187,18 +286,27 @@ class ByteMatrix(object):
         return self._height
 
     @classmethod
-    def _create_from_rows(cls, data):
-        """Construct byte matrix from rows of bytearrays."""
+    def _create_from_buffer(cls, height, width, data):
+        """Construct byte matrix owning a contiguous bytearray."""
         new = cls()
-        if not data:
-            new._height = len(data)
-            new._width = 0
-            new._rows = [bytearray()]
-        else:
-            new._height = len(data)
-            new._width = len(data[0])
-            new._rows = data
-        assert len(set(len(_r) for _r in new._rows)) == 1, 'ByteMatrix rows must all be same length'
+        if height and width:
+            assert len(data) == height * width, 'ByteMatrix buffer must match its size'
+            new._height, new._width, new._pitch = height, width, width
+            new._buffer = bytearray(data) if not isinstance(data, bytearray) else data
+        elif height:
+            # zero-width matrix
+            new._height = height
+        return new
+
+    @classmethod
+    def _create_view(cls, height, width, pitch, buffer, offset=0):
+        """Construct byte matrix as a view on a buffer."""
+        new = cls()
+        if not height:
+            return new
+        new._height, new._width, new._pitch = height, width, pitch
+        new._offset = offset
+        new._buffer = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
         return new
 
     @classmethod
@@ -210,16 +318,18 @@ class ByteMatrix(object):
         width = len(packed) // height
         if not width:
             return cls(0, 0)
-        return cls._create_from_rows([
-            unpack_bytes(packed[_offs : _offs+width], items_per_byte)
-            for _offs in xrange(0, len(packed), width)
-        ])
+        # rows are byte-aligned, so we can unpack all of them in one go
+        return cls._create_from_buffer(
+            height, width * items_per_byte, unpack_bytes(packed[:width*height], items_per_byte)
+        )
 
     def packed(self, items_per_byte):
         """Pack into packed-bits representation, byte aligned on rows."""
-        return bytearray().join(
-            pack_bytes(_r, items_per_byte) for _r in self._rows
-        )
+        padding = -self._width % items_per_byte
+        if padding and self._height > 1:
+            # pad the rows so that we can pack all of them in one go
+            return self.hextend(padding).packed(items_per_byte)
+        return pack_bytes(self._to_bytearray(), items_per_byte)
 
     @classmethod
     def fromhex(cls, hex, height, items_per_byte):
@@ -232,70 +342,90 @@ class ByteMatrix(object):
 
     def render(self, back, fore):
         """Set attributes on bit matrix."""
-        return self._create_from_rows([
-            bytearray(fore if _c else back for _c in _row)
-            for _row in self._rows
-        ])
+        table = bytes(bytearray([back] + [fore] * 255))
+        return self._create_from_buffer(
+            self._height, self._width, self._to_bytearray().translate(table)
+        )
 
     def hextend(self, by_width, fill=0):
         """Extend width by given number of bytes."""
-        new_row = bytearray([fill])*by_width
-        return self._create_from_rows([_row + new_row for _row in self._rows])
+        new = ByteMatrix(self._height, self._width + by_width, fill)
+        new[:, :self._width] = self
+        return new
 
     def vextend(self, by_height, fill=0):
         """Extend height by given number of bytes."""
-        return self._create_from_rows(
-            self._rows
-            + [bytearray([fill])*self._width for _ in range(by_height)]
+        return self._create_from_buffer(
+            self._height + by_height, self._width,
+            self._to_bytearray() + bytearray([fill]) * (self._width * by_height)
         )
 
     def hrepeat(self, times=1):
         """Multiply width by byte repetition (00 11 22 ...)."""
-        return self._create_from_rows([
-            bytearray(_byte for _byte in _row for _ in range(times))
-            for _row in self._rows
-        ])
+        data = self._to_bytearray()
+        repeated = bytearray(len(data) * times)
+        for i in xrange(times):
+            repeated[i::times] = data
+        return self._create_from_buffer(self._height, self._width * times, repeated)
 
     def vrepeat(self, times=1):
         """Multiply height by row repetition."""
-        return self._create_from_rows([
-            bytearray(_row) for _row in self._rows
-            for _ in range(times)
-        ])
+        return self._create_from_buffer(
+            self._height * times, self._width,
+            bytearray().join(bytearray(_row) * times for _row in self._iter_rows())
+        )
 
     def htile(self, times=1):
         """Multiply width by tiling (012 012 ...)."""
-        return self._create_from_rows([
-            bytearray(_row*times)
-            for _row in self._rows
-        ])
+        return self._create_from_buffer(
+            self._height, self._width * times,
+            bytearray().join(bytearray(_row) * times for _row in self._iter_rows())
+        )
 
     def vtile(self, times=1):
         """Multiply height by row tiling."""
-        return self._create_from_rows([
-            bytearray(_row)
-            for _ in range(times)
-            for _row in self._rows
-        ])
+        return self._create_from_buffer(
+            self._height * times, self._width, self._to_bytearray() * times
+        )
 
     def move(self, sy0, sy1, sx0, sx1, ty0, tx0):
         """Move a submatrix, replacing with attribute 0."""
+        height, width = sy1 - sy0, sx1 - sx0
+        if (
+                sx0 == tx0 == 0 and width == self._pitch
+                and 0 <= sy0 <= sy1 <= self._height and 0 <= ty0 <= self._height - height
+            ):
+            # whole rows: move in one go and clear what is left uncovered
+            view = self._buffer
+            if not isinstance(view, memoryview):
+                view = memoryview(view)
+            src = self._offset + sy0*self._pitch
+            dst = self._offset + ty0*self._pitch
+            size = height * self._pitch
+            view[dst:dst+size] = view[src:src+size]
+            if ty0 < sy0:
+                self[max(sy0, ty0+height):sy1, :] = 0
+            elif ty0 > sy0:
+                self[sy0:min(sy1, ty0), :] = 0
+            return
         # copy or this won't work on a view
         clip = self[sy0:sy1, sx0:sx1].copy()
-        height, width = sy1 - sy0, sx1 - sx0
         self[sy0:sy1, sx0:sx1] = 0
         self[ty0 : ty0+height, tx0 : tx0+width] = clip
 
+    def get_row_buffer(self, y):
+        """Get the underlying buffer and the offset of row y in it, for fast searches along a row."""
+        return self._buffer, self._offset + y*self._pitch
+
     def to_bytes(self):
         """Convert to a bytes object (contiguous rows)."""
-        # we need the bytearray cast - only in case we're a view
-        return b''.join(bytes(bytearray(_row)) for _row in self._rows)
+        return bytes(self._to_bytearray())
 
     def to_rows(self):
         """Convert to tuple of tuples of int."""
         return tuple(
             tuple(_i for _i in iterbytes(bytearray(_row)))
-            for _row in self._rows
+            for _row in self._iter_rows()
         )
 
     # views
@@ -306,26 +436,35 @@ class ByteMatrix(object):
         Create a bytematrixview of the current bytematrix.
         Use bm.view[yslice, xslice]
         """
-        return self._create_from_rows([
-            memoryview(_row) for _row in self._rows
-        ])
+        return self._create_view(
+            self._height, self._width, self._pitch, self._buffer, self._offset
+        )
 
     def copy(self):
         """
         Create a copy of the current bytematrix or view - as slicing views produces views.
         Use bm[yslice, xslice].copy()
         """
-        return self._create_from_rows([
-            bytearray(_row) for _row in self._rows
-        ])
+        return self._create_from_buffer(self._height, self._width, self._to_bytearray())
 
     @classmethod
     def view_from_buffer(cls, height, width, pitch, buffer):
         """Create a byte matrix as a view on a contiguous row-major buffer."""
-        return cls._create_from_rows([
-            memoryview(buffer)[_offset:_offset+width]
-            for _offset in xrange(0, height*pitch, pitch)
-        ])
+        return cls._create_view(height, width, pitch, buffer)
+
+
+def _masked_lshift(lhs, rhs):
+    """Byte-masked left-shift."""
+    return (lhs << rhs) & 0xff
+
+
+# bitwise operations that act on each byte separately, so that we can apply them to whole buffers
+_WIDE_OPERATIONS = (operator.__or__, operator.__and__, operator.__xor__)
+
+def _wide_operation(lhs, rhs, oper):
+    """Apply a bytewise bitwise operation to equal-length buffers, treated as big integers."""
+    result = oper(int_from_bytes(lhs), int_from_bytes(rhs))
+    return bytearray(int_to_bytes(result, len(lhs)))
 
 
 ##############################################################################
@@ -334,44 +473,56 @@ class ByteMatrix(object):
 def hstack(matrices):
     """Horizontally concatenate matrices."""
     matrices = list(matrices)
-    return ByteMatrix._create_from_rows([
-        bytearray().join(_rows)
-        for _rows in zip(*(_mat._rows for _mat in matrices))
-    ])
+    return ByteMatrix._create_from_buffer(
+        matrices[0].height, sum(_mat.width for _mat in matrices),
+        bytearray().join(chain.from_iterable(zip(*(_mat._iter_rows() for _mat in matrices))))
+    )
 
 def vstack(matrices):
     """Vertically concatenate matrices."""
-    return ByteMatrix._create_from_rows([
-        _row for _mat in matrices for _row in _mat._rows
-    ])
+    matrices = list(matrices)
+    return ByteMatrix._create_from_buffer(
+        sum(_mat.height for _mat in matrices), matrices[0].width,
+        bytearray().join(_mat._to_bytearray() for _mat in matrices)
+    )
 
 
 ##############################################################################
 # bytearray functions
 
-def unpack_bytes(packed, items_per_byte):
-    """Unpack from packed-bits representation."""
+def _build_unpack_table(items_per_byte):
+    """Unpacked items for every value of a packed byte."""
     bpp = 8 // items_per_byte
     mask = (1 << bpp) - 1
     shifts = [8 - bpp - _sh for _sh in range(0, 8, bpp)]
-    return bytearray(
-        (_byte >> _shift) & mask
-        for _byte in iterbytes(packed)
-        for _shift in shifts
-    )
+    return [
+        bytes(bytearray((_byte >> _shift) & mask for _shift in shifts))
+        for _byte in range(256)
+    ]
+
+def _build_pack_table(items_per_byte):
+    """Translation of item values to digits in base 2**bits_per_pixel."""
+    base = 1 << (8 // items_per_byte)
+    return bytes(bytearray(bytearray(b'0123456789abcdef')[_item % base] for _item in range(256)))
+
+# lookup tables by number of items per byte
+_UNPACK_TABLES = {_n: _build_unpack_table(_n) for _n in (2, 4, 8)}
+_PACK_TABLES = {_n: _build_pack_table(_n) for _n in (2, 4, 8)}
+
+def unpack_bytes(packed, items_per_byte):
+    """Unpack from packed-bits representation."""
+    if items_per_byte == 1:
+        return bytearray(packed)
+    return bytearray().join(map(_UNPACK_TABLES[items_per_byte].__getitem__, bytearray(packed)))
 
 def pack_bytes(unpacked, items_per_byte):
     """Pack into packed-bits representation."""
-    bpp = 8 // items_per_byte
-    mask = (1 << bpp) - 1
-    shifts = [8 - bpp - _sh for _sh in range(0, 8, bpp)]
-    # ceildiv(a,b) == -(floordiv(-a,b))
-    packed_width = -(-len(unpacked) // items_per_byte)
-    prepacked = [
-        (_byte & mask) << _shift
-        for _byte, _shift in zip(iterbytes(unpacked), shifts*packed_width)
-    ]
-    return bytearray([
-        sum(prepacked[_offs : _offs+items_per_byte])
-        for _offs in xrange(0, len(prepacked), items_per_byte)
-    ])
+    if items_per_byte == 1:
+        return bytearray(unpacked)
+    # write the items as digits of a big number, padded to a whole number of bytes
+    padding = -len(unpacked) % items_per_byte
+    digits = bytes(bytearray(unpacked).translate(_PACK_TABLES[items_per_byte])) + b'0' * padding
+    if not digits:
+        return bytearray()
+    number = int(digits, 1 << (8 // items_per_byte))
+    return bytearray(int_to_bytes(number, len(digits) // items_per_byte))
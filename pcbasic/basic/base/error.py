@@ -100,6 +100,16 @@ class Reset(Exit):
     message = b'Reset'
 
 
+class InputClosed(Exit):
+    """Exit emulator because the input stream has run out."""
+    message = b'Input closed'
+
+
+class WaitForInput(Interrupt):
+    """Statement needs input that isn't there yet; redo it when it is."""
+    message = b'Waiting for input'
+
+
 class Break(Interrupt):
     """Program interrupt."""
 
@@ -61,6 +61,8 @@ VIDEO_UPDATE = 'update'
 VIDEO_SET_CAPTION = 'set_caption'
 # clipboard copy reply
 VIDEO_SET_CLIPBOARD_TEXT = 'set_clipboard_text'
+# list of video signals collected over a frame
+VIDEO_BATCH = 'batch'
 
 
 # input queue signals
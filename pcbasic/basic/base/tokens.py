@@ -516,3 +516,9 @@ class TokenKeywordDict(object):
             self.to_keyword[NOISE] = KW_NOISE
             self.to_keyword[TERM] = KW_TERM
         self.to_token = dict((reversed(item) for item in iteritems(self.to_keyword)))
+        # keyword trie, flattened: all leading substrings of keywords
+        self.prefixes = set(
+            _kw[:_i]
+            for _kw in self.to_token
+            for _i in range(1, len(_kw)+1)
+        )
@@ -216,6 +216,10 @@ class EventHandler(object):
         """Stub for event checker."""
         return False
 
+    def time_to_trigger(self):
+        """Seconds until the event may trigger without input; None if it needs input."""
+        return None
+
 
 class PlayHandler(EventHandler):
     """Manage PLAY (music queue) events."""
@@ -240,6 +244,10 @@ class PlayHandler(EventHandler):
         self.last = play_now
         return False
 
+    def time_to_trigger(self):
+        """Seconds until the music queue next gets shorter."""
+        return self._sound.time_to_next_expiry()
+
     def set_trigger(self, n):
         """Set PLAY trigger to n notes."""
         self.trig = n
@@ -268,6 +276,10 @@ class TimerHandler(EventHandler):
             self.trigger()
         return False
 
+    def time_to_trigger(self):
+        """Seconds until the timer runs out."""
+        return max(0, self.start + self.period - self.clock.get_time_ms()) / 1000.
+
 
 class ComHandler(EventHandler):
     """Manage COM-port events."""
@@ -287,6 +299,10 @@ class ComHandler(EventHandler):
     def triggered(self, value):
         pass
 
+    def time_to_trigger(self):
+        """The port needs to be polled."""
+        return 0
+
 
 class KeyHandler(EventHandler):
     """Manage KEY events."""
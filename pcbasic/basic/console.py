@@ -6,6 +6,7 @@ Console and interactive environment
 This file is released under the GNU GPL version 3 or later.
 """
 
+import re
 import logging
 
 from ..compat import iterchar, int2byte
@@ -16,6 +17,9 @@ from .base import scancode
 from .base.eascii import as_bytes as ea
 
 
+# non-printing or position-dependent characters in console output
+_CONTROL_CHARS = re.compile(b'([\t\n\r\a\x0B\x0C\x1C\x1D\x1E\x1F])')
+
 # alt+key macros for interactive mode
 # these happen at a higher level (in the console) than F-key macros (in the keyboard buffer)
 ALT_KEY_REPLACE = {
@@ -164,7 +168,7 @@ class Console(object):
                 d = self._keyboard.get_fullchar_block()
                 if not d:
                     # input stream closed
-                    raise error.Exit()
+                    raise error.InputClosed()
                 if d in (
                         ea.UP, ea.CTRL_6, ea.DOWN, ea.CTRL_MINUS,  ea.RIGHT, ea.CTRL_BACKSLASH,
                         ea.LEFT, ea.CTRL_RIGHTBRACKET, ea.HOME, ea.CTRL_k, ea.END, ea.CTRL_n
@@ -271,52 +275,47 @@ class Console(object):
             return
         if do_echo:
             # CR -> CRLF, CRLF -> CRLF LF
-            self._io_streams.write(b''.join([(b'\r\n' if c == b'\r' else c) for c in iterchar(s)]))
-        last = b''
+            self._io_streams.write(bytes(s).replace(b'\r', b'\r\n'))
         # if our line wrapped at the end before, it doesn't anymore
         self._text_screen.set_wrap(self.current_row, False)
-        out_chars = []
-        for c in iterchar(s):
-            if c in b'\t\n\r\a\x0B\x0C\x1C\x1D\x1E\x1F':
-                # non-printing or position-dependent chars, dump buffer first
-                self._text_screen.write_chars(b''.join(out_chars), do_scroll_down=False)
-                out_chars = []
-                row, col = self.current_row, self.current_col
-                if c == b'\t':
-                    # TAB
-                    num = (8 - (col - 1 - 8 * int((col-1) // 8)))
-                    self._text_screen.write_chars(b' ' * num, do_scroll_down=False)
-                elif c == b'\n' or c == b'\r':
-                    # CR or LF
-                    # note that a PRINTed LF chr$(10) does not cause a wrapped/connected line
-                    # in contrast to a typed Ctrl+J
-                    self._text_screen.newline(wrap=False)
-                elif c == b'\a':
-                    # BEL
-                    self._sound.beep()
-                elif c == b'\x0B':
-                    # HOME
-                    self._text_screen.set_pos(1, 1, scroll_ok=False)
-                elif c == b'\x0C':
-                    # CLS
-                    self._text_screen.clear_view()
-                elif c == b'\x1C':
-                    # RIGHT
-                    self._text_screen.set_pos(row, col + 1, scroll_ok=False)
-                elif c == b'\x1D':
-                    # LEFT
-                    self._text_screen.set_pos(row, col - 1, scroll_ok=False)
-                elif c == b'\x1E':
-                    # UP
-                    self._text_screen.set_pos(row - 1, col, scroll_ok=False)
-                elif c == b'\x1F':
-                    # DOWN
-                    self._text_screen.set_pos(row + 1, col, scroll_ok=False)
-            else:
-                # includes \b, \0, and non-control chars
-                out_chars.append(c)
-            last = c
-        self._text_screen.write_chars(b''.join(out_chars), do_scroll_down=False)
+        # split into runs of printable chars and single control chars
+        # printable includes \b, \0, and non-control chars
+        for i, run in enumerate(_CONTROL_CHARS.split(bytes(s))):
+            if not i % 2:
+                self._text_screen.write_chars(run, do_scroll_down=False)
+                continue
+            # non-printing or position-dependent chars
+            row, col = self.current_row, self.current_col
+            if run == b'\t':
+                # TAB
+                num = (8 - (col - 1 - 8 * int((col-1) // 8)))
+                self._text_screen.write_chars(b' ' * num, do_scroll_down=False)
+            elif run == b'\n' or run == b'\r':
+                # CR or LF
+                # note that a PRINTed LF chr$(10) does not cause a wrapped/connected line
+                # in contrast to a typed Ctrl+J
+                self._text_screen.newline(wrap=False)
+            elif run == b'\a':
+                # BEL
+                self._sound.beep()
+            elif run == b'\x0B':
+                # HOME
+                self._text_screen.set_pos(1, 1, scroll_ok=False)
+            elif run == b'\x0C':
+                # CLS
+                self._text_screen.clear_view()
+            elif run == b'\x1C':
+                # RIGHT
+                self._text_screen.set_pos(row, col + 1, scroll_ok=False)
+            elif run == b'\x1D':
+                # LEFT
+                self._text_screen.set_pos(row, col - 1, scroll_ok=False)
+            elif run == b'\x1E':
+                # UP
+                self._text_screen.set_pos(row - 1, col, scroll_ok=False)
+            elif run == b'\x1F':
+                # DOWN
+                self._text_screen.set_pos(row + 1, col, scroll_ok=False)
 
     def write_line(self, s=b'', do_echo=True):
         """Write a string to the screen and end with a newline."""
@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import struct
+import re
 
 from ...compat import int2byte
 
@@ -15,6 +16,27 @@ from ..base.tokens import DIGITS, ALPHANUMERIC
 from .. import values
 
 
+# bytes that need attention inside literals and comments: the rest is copied verbatim
+_LITERAL_RUN = re.compile(
+    b'[^' + b''.join(
+        b'\\x%02x' % (ord(_c),) for _c in (b'\0', b'"') + tk.NUMBER + tk.LINE_NUMBER
+    ) + b']+'
+)
+# bytes that are copied verbatim outside literals and comments:
+# controls that do not double as tokens and printable ASCII, except for the quote
+_PLAIN_RUN = re.compile(b'[\\x01-\\x09\\x20\\x21\\x23-\\x7e]+')
+
+# tokens that are not separated from a preceding letter or number
+_NO_SPACE_BEFORE = frozenset(tk.OPERATOR)
+# tokens that are not separated from a following token or number
+_NO_SPACE_AFTER = frozenset(tk.OPERATOR + tk.COMMENT + (tk.TAB, tk.SPC, tk.USR, tk.FN))
+# characters that are not separated from a preceding token
+_NO_SPACE_BEFORE_CHAR = frozenset(tk.END_LINE + tk.OPERATOR + (
+    tk.O_REM, b'"', b',', b';', b' ', b':', b'(', b')', b'$',
+    b'%', b'!', b'#', b'_', b'@', b'~', b'|', b'`'
+))
+
+
 class Lister(object):
     """BASIC detokeniser."""
 
@@ -25,26 +47,56 @@ class Lister(object):
 
     def detokenise_line(self, ins):
         """Convert a tokenised program line to ascii text."""
-        current_line = self.detokenise_line_number(ins)
+        current_line, output, pos, text_positions = self._detokenise_line_at(
+            ins.getvalue(), ins.tell(), track_positions=True
+        )
+        ins.seek(pos)
+        return current_line, output, text_positions
+
+    def detokenise_lines(self, code, positions):
+        """Iterate over the text of the program lines starting at the given bytecode positions."""
+        for pos in positions:
+            # skip the \x00 line separator
+            _, output, _, _ = self._detokenise_line_at(code, pos + 1)
+            yield output
+
+    def detokenise_program(self, code, max_line=65535):
+        """Iterate over line numbers and text of the program lines, in stored order."""
+        # skip first \x00 in bytecode
+        pos = 1
+        while True:
+            current_line, output, pos, _ = self._detokenise_line_at(code, pos)
+            if current_line == -1 or current_line > max_line:
+                break
+            yield current_line, output
+
+    def _detokenise_line_at(self, code, pos, track_positions=False):
+        """Convert the program line at a position in the bytecode to ascii text."""
+        current_line = self.token_to_line_number(code[pos:pos+4])
         if current_line < 0:
-            # detokenise_line_number has returned -1 and left us at: .. 00 | _00_ 00 1A
             # stream ends or end of file sequence \x00\x00\x1A
-            return -1, b'', 0
-        elif current_line == 0 and ins.peek() == b' ':
+            # leave pointer at start of line number C0 DE or 00 00
+            return -1, b'', pos, 0
+        pos += 4
+        if current_line == 0 and code[pos:pos+1] == b' ':
             # ignore up to one space after line number 0
-            ins.read(1)
-        linum = bytearray(b'%d' % (current_line,))
+            pos += 1
+        linum = b'%d' % (current_line,)
         # write one extra whitespace character after line number
         # unless first char is TAB
-        if ins.peek() != b'\t':
-            linum += bytearray(b' ')
-        text_positions = [(ins.tell(), 0)]
-        line, line_text_positions = self.detokenise_compound_statement(ins)
-        line_text_positions = [
+        if code[pos:pos+1] != b'\t':
+            linum += b' '
+        if not track_positions:
+            line, pos = self._detokenise_compound_statement_at(code, pos)
+            return current_line, linum + line, pos, None
+        text_positions = [(pos, 0)]
+        line_text_positions = []
+        line, pos = self._detokenise_compound_statement_at(code, pos, line_text_positions)
+        text_positions.extend(
             (_bytepos, _textpos+len(linum) + 1)
             for _bytepos, _textpos in line_text_positions
-        ]
-        return current_line, linum + line, text_positions + line_text_positions
+        )
+        return current_line, linum + line, pos, text_positions
 
     def detokenise_line_number(self, ins):
         """Parse line number and leave pointer at first char of line."""
@@ -63,13 +115,36 @@ class Lister(object):
 
     def detokenise_compound_statement(self, ins):
         """Detokenise tokens until end of line."""
-        litstring, comment = False, False
         text_positions = []
+        output, pos = self._detokenise_compound_statement_at(
+            ins.getvalue(), ins.tell(), text_positions
+        )
+        ins.seek(pos)
+        return output, text_positions
+
+    def _detokenise_compound_statement_at(self, code, pos, text_positions=None):
+        """Detokenise tokens from a bytecode position until end of line."""
+        litstring, comment = False, False
         output = bytearray()
         while True:
-            s = ins.read(1)
-            # keep track of matching text and binary positions
-            text_positions.append((ins.tell(), len(output)))
+            # copy runs of bytes that pass unchanged in one go
+            if comment or litstring:
+                run = _LITERAL_RUN.match(code, pos)
+            else:
+                run = _PLAIN_RUN.match(code, pos)
+            if run:
+                end = run.end()
+                if text_positions is not None:
+                    # keep track of matching text and binary positions
+                    offset = len(output) - pos - 1
+                    text_positions.extend((_p, _p + offset) for _p in range(pos+1, end+1))
+                output += code[pos:end]
+                pos = end
+            s = code[pos:pos+1]
+            pos += len(s)
+            if text_positions is not None:
+                # keep track of matching text and binary positions
+                text_positions.append((pos, len(output)))
             if s in tk.END_LINE:
                 # \x00 ends lines and comments when listed,
                 # if not inside a number constant
@@ -83,7 +158,10 @@ class Lister(object):
                 output += s
                 litstring = not litstring
             elif s in tk.NUMBER or s in tk.LINE_NUMBER:
-                output += self._detokenise_number(ins, s)
+                ntrail = tk.PLUS_BYTES.get(s, 0)
+                trail = code[pos:pos+ntrail]
+                pos += len(trail)
+                output += self._detokenise_number(s, trail)
             elif comment or litstring or (b'\x20' <= s <= b'\x7E'):
                 # honest ASCII
                 output += s
@@ -94,28 +172,26 @@ class Lister(object):
                 # controls that do not double as tokens
                 output += s
             else:
-                token = self._detokenise_keyword_into(ins, s, output)
+                token, pos = self._detokenise_keyword_into(code, pos, s, output)
                 comment = token in tk.COMMENT
-        return output[:255], text_positions
+        return bytes(output[:255]), pos
 
-    def _detokenise_keyword_into(self, ins, lead, output):
+    def _detokenise_keyword_into(self, code, pos, lead, output):
         """Convert a one- or two-byte keyword token to ascii."""
         # try for single-byte token or two-byte token
         # if no match, first char is passed unchanged
         token = lead
-        try:
-            keyword = self._token_to_keyword[token]
-        except KeyError:
-            token += ins.peek()
-            try:
-                keyword = self._token_to_keyword[token]
-                ins.read(1)
-            except KeyError:
-                output += token[:1]
-                return False
+        keyword = self._token_to_keyword.get(token)
+        if keyword is None:
+            token += code[pos:pos+1]
+            keyword = self._token_to_keyword.get(token)
+            if keyword is None:
+                output += lead
+                return False, pos
+            pos += 1
         # letter or number followed by token is separated by a space
         if (
-                token not in tk.OPERATOR
+                token not in _NO_SPACE_BEFORE
                 and output and bytes(output[-1:]) in ALPHANUMERIC
                 # we need to check again for FN and USR, but not SPC( and TAB(
                 # because we check the converted output, not the previous token
@@ -127,10 +203,10 @@ class Lister(object):
         #   [:REM']   ->  [']
         # we need to read one ahead at REM, or tk_O_REM would be transcribed as part of the comment
         # and the replacement code would not work
-        next_char = ins.peek(1)
+        next_char = code[pos:pos+1]
         if token == tk.REM and next_char == tk.O_REM and output and bytes(output[-1:]) == b':':
-            ins.read(1)
-            output[:] = output[:-1] + tk.KW_O_REM
+            pos += 1
+            output[-1:] = tk.KW_O_REM
         #   [WHILE+]  ->  [WHILE]
         elif token == tk.O_PLUS and len(output) >= 5 and bytes(output[-5:]) == tk.KW_WHILE:
             # ignore the +
@@ -143,26 +219,18 @@ class Lister(object):
                 # special case at start of line, lone ELSE (not :ELSE) becomes LSE
                 output += keyword[1:]
             else:
-                output[:] = output[:-1] + keyword
+                output[-1:] = keyword
         else:
             output += keyword
         # token followed by token or number is separated by a space,
         # except operator tokens, comment tokens and SPC(, TAB(, FN, USR
-        if (
-                token not in tk.OPERATOR + tk.COMMENT + (tk.TAB, tk.SPC, tk.USR, tk.FN)
-                and next_char not in tk.END_LINE + tk.OPERATOR + (
-                    tk.O_REM, b'"', b',', b';', b' ', b':', b'(', b')', b'$',
-                    b'%', b'!', b'#', b'_', b'@', b'~', b'|', b'`'
-                )
-            ):
+        if token not in _NO_SPACE_AFTER and next_char not in _NO_SPACE_BEFORE_CHAR:
             # excluding TAB( SPC( and FN. \xD9 is ', \xD1 is FN, \xD0 is USR.
             output += b' '
-        return token
+        return token, pos
 
-    def _detokenise_number(self, ins, lead):
+    def _detokenise_number(self, lead, trail):
         """Convert number token to Python bytes string."""
-        ntrail = tk.PLUS_BYTES.get(lead, 0)
-        trail = ins.read(ntrail)
         if lead == tk.T_OCT:
             return b'&O' + self._values.from_bytes(trail).to_oct()
         elif lead == tk.T_HEX:
@@ -7,7 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import struct
-import io
+import re
 
 from ..base import tokens as tk
 from ..base.tokens import DIGITS, LETTERS
@@ -15,39 +15,22 @@ from ..base import codestream
 from .. import values
 
 
-class PlainTextStream(codestream.CodeStream):
-    """Stream of plain-text BASIC code."""
+# whitespace in plain-text code
+BLANKS = b' \t\n'
+# line end characters for plain-text code
+END_LINE = b'\0\r'
 
-    end_line = (b'\0', b'\r')
+# bulk scanners over the plain-text line
+_BLANKS_RUN = re.compile(b'[ \t\n]*')
+_DIGITS_RUN = re.compile(b'[0-9]*')
+_NAME_CHARS_RUN = re.compile(b'[A-Za-z0-9.]*')
+_END_STRING = re.compile(b'["\0\r]')
+_END_REM = re.compile(b'[\0\r]')
+_END_DATA = re.compile(b'[\0\r:"]')
 
-    def read_line_number(self):
-        """Read a line or jump number, return as int."""
-        word = bytearray()
-        ndigits, nblanks = 0, 0
-        # don't read more than 5 digits
-        while (ndigits < 5):
-            c = self.peek()
-            if not c:
-                break
-            elif c in DIGITS:
-                word += self.read(1)
-                nblanks = 0
-                ndigits += 1
-                if int(word) > 6552:
-                    # note: anything >= 65530 is illegal in GW-BASIC
-                    # in loading an ASCII file, GWBASIC would interpret these as
-                    # '6553 1' etcetera, generating a syntax error on load.
-                    break
-            elif c in self.blanks:
-                self.read(1)
-                nblanks += 1
-            else:
-                break
-        # don't claim trailing w/s
-        self.seek(-nblanks, 1)
-        if word:
-            return int(word)
-        return None
+# characters that may continue a decimal literal after a run of digits
+# anything else terminates the number and we can take the digits as they are
+_DEC_CONTINUE = b'.EeDd!#%\x1c\x1d\x1f' + BLANKS
 
 
 class Tokeniser(object):
@@ -60,6 +43,9 @@ class Tokeniser(object):
         tk.KW_DELETE, tk.KW_RUN, tk.KW_RESUME, tk.KW_AUTO,
         tk.KW_ERL, tk.KW_RESTORE, tk.KW_RETURN)
 
+    # keywords that are tokenised even if followed by name characters
+    _prefix_words = (tk.KW_FN, tk.KW_SPC, tk.KW_TAB, tk.KW_USR)
+
     # operator symbols
     _ascii_operators = b'+-=/\\^*<>'
 
@@ -67,18 +53,23 @@ class Tokeniser(object):
         """Initialise tokeniser."""
         self._values = values
         self._keyword_to_token = keyword_dict.to_token
+        # once a word drops out of this set, it can only be a name
+        self._keyword_prefixes = keyword_dict.prefixes
 
     def tokenise_line(self, line):
         """Convert an ascii program line to tokenised form."""
-        ins = PlainTextStream(line)
+        line = bytes(line)
+        # keywords and names are matched case-insensitively
+        upper = line.upper()
         outs = codestream.TokenisedStream()
         # skip whitespace at start of line
-        d = ins.skip_blank()
-        if d == b'':
+        pos = _BLANKS_RUN.match(line).end()
+        if pos == len(line):
             # empty line at EOF
             return outs
+        out = []
         # read the line number
-        self._tokenise_line_number(ins, outs)
+        pos = self._tokenise_line_number(line, pos, out)
         # expect line number
         allow_jumpnum = False
         # expect number (6553 6 -> the 6 is encoded as \x17)
@@ -88,60 +79,58 @@ class Tokeniser(object):
         # parse through elements of line
         while True:
             # peek next character
-            c = ins.peek()
-            # anything after NUL is ignored till EOL
-            if c == b'\0':
-                ins.read(1)
-                ins.read_to((b'', b'\r'))
-                break
-            # end of line
-            elif c in (b'', b'\r'):
+            c = line[pos:pos+1]
+            # end of line; anything after NUL is ignored till EOL
+            if not c or c in END_LINE:
                 break
             # handle whitespace
-            elif c in ins.blanks:
-                ins.read(1)
-                outs.write(c)
+            elif c in BLANKS:
+                end = _BLANKS_RUN.match(line, pos).end()
+                out.append(line[pos:end])
+                pos = end
             # handle string literals
-            elif ins.peek() == b'"':
-                outs.write(ins.read_string())
+            elif c == b'"':
+                end = self._find_string_end(line, pos)
+                out.append(line[pos:end])
+                pos = end
             # handle jump numbers
             elif allow_number and allow_jumpnum and c in DIGITS + b'.':
-                self._tokenise_jump_number(ins, outs)
+                pos = self._tokenise_jump_number(line, pos, out)
             # handle numbers
             # numbers following var names with no operator or token in between
             # should not be parsed, eg OPTION BASE 1
             # note we don't include leading signs, encoded as unary operators
             # number starting with & are always parsed
-            elif c in (b'&', ) or (
+            elif c == b'&' or (
                     allow_number and not allow_jumpnum and c in DIGITS + b'.'
                 ):
-                outs.write(self._tokenise_number(ins))
+                word, pos = self._read_number(upper, pos)
+                out.append(self._tokenise_number(word))
             # operator keywords ('+', '-', '=', '/', '\\', '^', '*', '<', '>'):
             elif c in self._ascii_operators:
-                ins.read(1)
+                pos += 1
                 # operators don't affect line number mode - can do line number
                 # arithmetic and RENUM will do the strangest things
                 # this allows for 'LIST 100-200' etc.
-                outs.write(self._keyword_to_token[c])
+                out.append(self._keyword_to_token[c])
                 allow_number = True
             # special case ' -> :REM'
             elif c == b"'":
-                ins.read(1)
-                outs.write(b':' + tk.REM + tk.O_REM)
-                self._tokenise_rem(ins, outs)
+                out.append(b':' + tk.REM + tk.O_REM)
+                pos = self._tokenise_rem(line, pos+1, out)
             # special case ? -> PRINT
             elif c == b'?':
-                ins.read(1)
-                outs.write(tk.PRINT)
+                pos += 1
+                out.append(tk.PRINT)
                 allow_number = True
             # keywords & variable names
             elif c in LETTERS:
-                word = self._tokenise_word(ins, outs)
+                word, pos = self._tokenise_word(line, upper, pos, out)
                 # handle non-parsing modes
                 if word in (tk.KW_REM, b"'"):
-                    self._tokenise_rem(ins, outs)
+                    pos = self._tokenise_rem(line, pos, out)
                 elif word == tk.KW_DATA:
-                    self._tokenise_data(ins, outs)
+                    pos = self._tokenise_data(line, pos, out)
                 else:
                     allow_jumpnum = (word in self._linenum_words)
                     # numbers can follow tokenised keywords
@@ -150,7 +139,7 @@ class Tokeniser(object):
                     if word in (tk.KW_SPC, tk.KW_TAB):
                         spc_or_tab = True
             else:
-                ins.read(1)
+                pos += 1
                 if c in (b',', b'#', b';'):
                     # can separate numbers as well as jumpnums
                     allow_number = True
@@ -166,27 +155,80 @@ class Tokeniser(object):
                     allow_jumpnum, allow_number = False, False
                 # replace all other nonprinting chars by spaces;
                 # HOUSE 0x7f is allowed.
-                outs.write(c if ord(c) >= 32 and ord(c) <= 127 else b' ')
+                out.append(c if ord(c) >= 32 and ord(c) <= 127 else b' ')
+        outs.write(b''.join(out))
         outs.seek(0)
         return outs
 
-    def _tokenise_rem(self, ins, outs):
+    def _find_string_end(self, line, pos):
+        """Find the end of a string literal starting at pos."""
+        # while tokenised numbers inside a string literal will be printed as tokenised numbers,
+        # they don't actually execute as such:
+        # a \00 character, even if inside a tokenised number, will break a string literal
+        # and make the parser expect a line number afterwards, etc. We follow this.
+        match = _END_STRING.search(line, pos+1)
+        if not match:
+            return len(line)
+        end = match.start()
+        if line[end:end+1] == b'"':
+            end += 1
+        return end
+
+    def _tokenise_rem(self, line, pos, out):
         """Pass anything after REM as is till EOL."""
-        outs.write(ins.read_to((b'', b'\r', b'\0')))
+        match = _END_REM.search(line, pos)
+        end = match.start() if match else len(line)
+        out.append(line[pos:end])
+        return end
 
-    def _tokenise_data(self, ins, outs):
+    def _tokenise_data(self, line, pos, out):
         """Pass DATA as is, till end of statement, except for literals."""
         while True:
-            outs.write(ins.read_to((b'', b'\r', b'\0', b':', b'"')))
-            if ins.peek() == b'"':
+            match = _END_DATA.search(line, pos)
+            end = match.start() if match else len(line)
+            out.append(line[pos:end])
+            pos = end
+            if line[pos:pos+1] == b'"':
                 # string literal in DATA
-                outs.write(ins.read_string())
+                end = self._find_string_end(line, pos)
+                out.append(line[pos:end])
+                pos = end
             else:
+                return pos
+
+    def _read_line_number(self, line, pos):
+        """Read a line or jump number, return as int and new position."""
+        word = b''
+        ndigits, nblanks = 0, 0
+        # don't read more than 5 digits
+        while (ndigits < 5):
+            c = line[pos:pos+1]
+            if not c:
                 break
+            elif c in DIGITS:
+                word += c
+                pos += 1
+                nblanks = 0
+                ndigits += 1
+                if int(word) > 6552:
+                    # note: anything >= 65530 is illegal in GW-BASIC
+                    # in loading an ASCII file, GWBASIC would interpret these as
+                    # '6553 1' etcetera, generating a syntax error on load.
+                    break
+            elif c in BLANKS:
+                pos += 1
+                nblanks += 1
+            else:
+                break
+        # don't claim trailing w/s
+        pos -= nblanks
+        if word:
+            return int(word), pos
+        return None, pos
 
-    def _tokenise_line_number(self, ins, outs):
+    def _tokenise_line_number(self, line, pos, out):
         """Convert an ascii line number to tokenised start-of-line."""
-        linenum = ins.read_line_number()
+        linenum, pos = self._read_line_number(line, pos)
         if linenum is not None:
             # NUL terminates last line and fills up the first char in the buffer
             # (that would be the magic number when written to file)
@@ -194,94 +236,178 @@ class Tokeniser(object):
             # starts with a NUL
             # next two bytes are for internal use and at this point
             # can be anything nonzero; we use this.
-            outs.write(b'\x00\xC0\xDE' + struct.pack('<H', linenum))
+            out.append(b'\x00\xC0\xDE' + struct.pack('<H', linenum))
             # ignore single whitespace after line number, if any,
             # unless line number is zero (as does GW)
-            if ins.peek() == b' ' and linenum != 0:
-                ins.read(1)
+            if line[pos:pos+1] == b' ' and linenum != 0:
+                pos += 1
         else:
             # direct line; internally, we need an anchor for the program pointer,
             # so we encode a ':'
-            outs.write(b':')
+            out.append(b':')
+        return pos
 
-    def _tokenise_jump_number(self, ins, outs):
+    def _tokenise_jump_number(self, line, pos, out):
         """Convert an ascii line number pointer to tokenised form."""
-        linum = ins.read_line_number()
+        linum, pos = self._read_line_number(line, pos)
         if linum is not None:
-            outs.write(tk.T_UINT + struct.pack('<H', linum))
-        elif ins.peek() == b'.':
-            ins.read(1)
-            outs.write(b'.')
+            out.append(tk.T_UINT + struct.pack('<H', linum))
+        elif line[pos:pos+1] == b'.':
+            pos += 1
+            out.append(b'.')
+        return pos
 
-    def _tokenise_word(self, ins, outs):
+    def _tokenise_word(self, line, upper, pos, out):
         """Convert a keyword or name to tokenised form."""
         word = b''
         while True:
-            c = ins.read(1)
-            word += c.upper()
+            c = upper[pos:pos+1]
+            pos += len(c)
+            word += c
             if word == b'GO':
                 # deal with special cases 'GO     TO' -> 'GOTO', 'GO SUB' -> 'GOSUB'
-                word, allow_name_chars = self._tokenise_wide_goto_gosub(ins)
+                word, allow_name_chars, pos = self._tokenise_wide_goto_gosub(upper, pos)
             else:
                 allow_name_chars = False
             if word in self._keyword_to_token:
                 # ignore if part of a longer name, except FN, SPC(, TAB(, USR, GO SUB and GO   TO
-                if word not in (tk.KW_FN, tk.KW_SPC, tk.KW_TAB, tk.KW_USR) and not allow_name_chars:
-                    nxt = ins.peek()
+                if word not in self._prefix_words and not allow_name_chars:
+                    nxt = line[pos:pos+1]
                     if nxt and nxt in tk.NAME_CHARS:
                         continue
                 token = self._keyword_to_token[word]
                 # handle special case ELSE -> :ELSE
                 if word == tk.KW_ELSE:
-                    outs.write(b':' + token)
+                    out.append(b':' + token)
                 # handle special case WHILE -> WHILE+
                 elif word == tk.KW_WHILE:
-                    outs.write(token + tk.O_PLUS)
+                    out.append(token + tk.O_PLUS)
                 else:
-                    outs.write(token)
+                    out.append(token)
                 break
             # allowed names: letter + (letters, numbers, .)
             elif not c:
-                outs.write(word)
+                out.append(word)
                 break
             elif c not in tk.NAME_CHARS:
                 word = word[:-1]
-                ins.seek(-1, 1)
-                outs.write(word)
+                pos -= 1
+                out.append(word)
                 break
-        return word
+            elif word not in self._keyword_prefixes:
+                # no keyword starts with this word, so the rest of the name follows in one go
+                end = _NAME_CHARS_RUN.match(upper, pos).end()
+                word += upper[pos:end]
+                pos = end
+                out.append(word)
+                break
+        return word, pos
 
-    def _tokenise_wide_goto_gosub(self, ins):
+    def _tokenise_wide_goto_gosub(self, upper, pos):
         """Special cases 'GO     TO' -> 'GOTO', 'GO SUB' -> 'GOSUB'."""
         word = b'GO'
         allow_name_chars = False
-        next_four = ins.peek(4).upper()
+        next_four = upper[pos:pos+4]
         # GO SUB allows 1 space, allows text after
         if next_four == b' SUB':
             word = tk.KW_GOSUB
-            ins.read(4)
+            pos += 4
             allow_name_chars = True
         # GO TO with single space, does not allow text or numbers after
         elif next_four[:3] == b' TO' and next_four[3:4] not in tk.NAME_CHARS:
             word = tk.KW_GOTO
-            ins.read(3)
+            pos += 3
         # GO  TO allows more than 1 spaces, but not \t or \n
         # and *then* allows text after
         elif next_four[:2] == b'  ':
-            pos = ins.tell()
-            while ins.peek(1) == b' ':
-                ins.read(1)
-            next_two = ins.read(2).upper()
-            if next_two == b'TO':
+            end = pos
+            while upper[end:end+1] == b' ':
+                end += 1
+            if upper[end:end+2] == b'TO':
                 word = tk.KW_GOTO
                 allow_name_chars = True
+                pos = end + 2
+        return word, allow_name_chars, pos
+
+    def _read_number(self, upper, pos):
+        """Read numeric literal, return representation and new position."""
+        if upper[pos:pos+1] == b'&':
+            # handle hex or oct constants
+            pos += 1
+            if upper[pos:pos+1] == b'H':
+                # hex literal; hex literals must not be interrupted by whitespace
+                pos += 1
+                start = pos
+                while upper[pos:pos+1] and upper[pos:pos+1] in tk.HEXDIGITS:
+                    pos += 1
+                return b'&H' + upper[start:pos], pos
             else:
-                ins.seek(pos)
-        return word, allow_name_chars
+                # octal literal
+                # O is optional, could also be &777 instead of &O777
+                if upper[pos:pos+1] == b'O':
+                    pos += 1
+                start = pos
+                # oct literals may be interrupted by whitespace
+                while upper[pos:pos+1] and upper[pos:pos+1] in tk.OCTDIGITS + BLANKS:
+                    pos += 1
+                return b'&O' + upper[start:pos], pos
+        # decimal literal: fast path for plain runs of digits
+        end = _DIGITS_RUN.match(upper, pos).end()
+        nxt = upper[end:end+1]
+        if end > pos and (not nxt or nxt not in _DEC_CONTINUE):
+            return upper[pos:end], end
+        return self._read_dec(upper, pos)
+
+    def _read_dec(self, upper, pos):
+        """Read decimal literal, return representation and new position."""
+        have_exp = False
+        have_point = False
+        word = b''
+        while True:
+            c = upper[pos:pos+1]
+            if not c:
+                break
+            pos += 1
+            if c == b'.' and not have_point and not have_exp:
+                have_point = True
+                word += c
+            elif c in b'ED' and not have_exp:
+                # there's a special exception for number followed by EL or EQ
+                # presumably meant to protect ELSE and maybe EQV ?
+                if c == b'E' and upper[pos:pos+1] in (b'L', b'Q'):
+                    pos -= 1
+                    break
+                else:
+                    have_exp = True
+                    word += c
+            elif c in b'-+' and (not word or word[-1:] in b'ED'):
+                # must be first character or in exponent
+                word += c
+            elif c in DIGITS + BLANKS + b'\x1c\x1d\x1f':
+                # '\x1c\x1d\x1f' are ASCII separators
+                # - these cause string representations to evaluate to zero
+                # we'll remove blanks later but need to keep it for now
+                # so we can reposition on removing trailing whitespace
+                word += c
+            elif c in b'!#' and not have_exp:
+                word += c
+                # must be last character
+                break
+            elif c == b'%':
+                # swallow a %, but break parsing
+                break
+            else:
+                pos -= 1
+                break
+        # don't claim trailing whitespace
+        trimword = word.rstrip(BLANKS)
+        pos -= len(word) - len(trimword)
+        # remove all internal whitespace
+        word = trimword.strip(BLANKS)
+        return word, pos
 
-    def _tokenise_number(self, ins):
+    def _tokenise_number(self, word):
         """Convert Python-string number representation to number token."""
-        word = ins.read_number()
         if word[:2] == b'&H':
             # hex constant
             return self._values.new_integer().from_hex(word[2:]).to_token_hex()
@@ -25,6 +25,9 @@ def nullstream():
 TYPE_TO_MAGIC = {b'B': b'\xFF', b'P': b'\xFE', b'M': b'\xFD'}
 MAGIC_TO_TYPE = {b'\xFF': b'B', b'\xFE': b'P', b'\xFD': b'M'}
 
+# characters that do not advance the column
+NONPRINTING = bytes(bytearray(range(32)))
+
 
 
 ############################################################################
@@ -328,19 +331,16 @@ class TextFileBase(RawFile):
             ):
             self.write_line()
             self.col = 1
-        for c in iterchar(s):
-            # don't replace CR or LF with CRLF when writing to files
-            if c == b'\r':
-                self._fhandle.write(c)
-                self.col = 1
-            else:
-                self._fhandle.write(c)
-                # nonprinting characters including tabs are not counted for WIDTH
-                if c >= b' ':
-                    self.col += 1
-                    # col-1 is a byte that wraps
-                    if self.col == 257:
-                        self.col = 1
+        # don't replace CR or LF with CRLF when writing to files
+        self._fhandle.write(s)
+        # column restarts after the last CR
+        last_cr = s.rfind(b'\r')
+        if last_cr >= 0:
+            self.col = 1
+            s = s[last_cr+1:]
+        # nonprinting characters including tabs are not counted for WIDTH
+        # col-1 is a byte that wraps
+        self.col = (self.col - 1 + len(s.translate(None, NONPRINTING))) % 256 + 1
 
     def write_line(self, s=b''):
         """Write string and follow with device-standard line break."""
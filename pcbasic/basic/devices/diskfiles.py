@@ -227,6 +227,9 @@ class FieldFile(TextFile):
             TextFile.write(self, bytestr, can_break)
         except ValueError:
             # can't modify size of memoryview
+            # fill up the buffer as far as it goes, as a bytewise write would have done
+            room = len(self._field.view_buffer()) - self._fhandle.tell()
+            self._fhandle.write(bytestr[:max(0, room)])
             raise error.BASICError(error.FIELD_OVERFLOW)
 
 
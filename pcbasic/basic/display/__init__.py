@@ -8,3 +8,4 @@ This file is released under the GNU GPL version 3 or later.
 
 from .display import Display
 from .screencopyhandler import ScreenCopyHandler
+from .font import build_fonts
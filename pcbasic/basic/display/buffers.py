@@ -15,6 +15,12 @@ from ..base import signals
 from ..base.bytematrix import ByteMatrix
 
 
+# maximum number of update events submitted in one flush of dirty rectangles
+_MAX_UPDATE_EVENTS = 4
+# fraction of the page above which a flush submits the whole page at once
+_FULL_UPDATE_FRACTION = 0.5
+
+
 class _TextRow(object):
     """Buffer for a single row of the screen."""
 
@@ -30,6 +36,26 @@ class _TextRow(object):
         self.wrap = False
 
 
+def _merge_rects(rects):
+    """Merge overlapping or touching (top, left, bottom, right) rectangles, in order of top row."""
+    merged = []
+    for top, left, bottom, right in sorted(rects):
+        if merged:
+            last_top, last_left, last_bottom, last_right = merged[-1]
+            if top <= last_bottom + 1 and left <= last_right + 1 and right >= last_left - 1:
+                merged[-1] = (
+                    last_top, min(left, last_left), max(bottom, last_bottom), max(right, last_right)
+                )
+                continue
+        merged.append((top, left, bottom, right))
+    return merged
+
+def _bounding_rect(rects):
+    """Smallest (top, left, bottom, right) rectangle containing all given rectangles."""
+    tops, lefts, bottoms, rights = zip(*rects)
+    return min(tops), min(lefts), max(bottoms), max(rights)
+
+
 class _PixelAccess(object):
     """
     Wrapper class to enable pixel indexing.
@@ -53,10 +79,17 @@ class _PixelAccess(object):
 
     def __getitem__(self, index):
         """Retrieve a copy of a pixel range."""
+        self._video_buffer.render()
         return self._pixels[index]
 
+    def get_row_buffer(self, y):
+        """Get the raw pixel buffer and the offset of row y in it, for reading."""
+        self._video_buffer.render()
+        return self._pixels.get_row_buffer(y)
+
     def __setitem__(self, index, data):
         """Set a pixel range, clear affected text buffers and submit to interface."""
+        self._video_buffer.render()
         self._pixels[index] = data
         # make sure the indices are slices so that __getattr__ returns a matrix
         yslice, xslice = index
@@ -72,7 +105,7 @@ class VideoBuffer(object):
 
     def __init__(
             self, queues, pixel_height, pixel_width, height, width,
-            colourmap, attr, font, codepage, do_fullwidth
+            colourmap, attr, font, codepage, do_fullwidth, text_only=False
         ):
         """Initialise the screen buffer to given dimensions."""
         self._rows = [_TextRow(attr, width) for _ in range(height)]
@@ -93,7 +126,15 @@ class VideoBuffer(object):
         # dirty rectangle collection
         self._dirty_left = {}
         self._dirty_right = {}
+        # bounding rect of pixel updates, in text coordinates
+        self._dirty_pixels = None
         self._locked = False
+        # in text-only mode, text is not drawn to the pixel buffer until the pixels are needed
+        self._text_only = text_only
+        # sections of text rows not yet drawn to the pixel buffer
+        self._unrendered = {}
+        # instrumentation: number of update events avoided by merging dirty rectangles
+        self.saved_updates = 0
         self._visible = False
 
     def set_visible(self, visible):
@@ -103,6 +144,12 @@ class VideoBuffer(object):
             if visible:
                 self.resubmit()
 
+    def set_text_only(self, text_only):
+        """Set whether to leave text out of the pixel buffer and the updates to the interface."""
+        self._text_only = text_only
+        if not text_only:
+            self.render()
+
     @property
     def pixels(self):
         """Pixel-buffer access."""
@@ -227,6 +274,8 @@ class VideoBuffer(object):
             dst_row.length = src_row.length
             dst_row.wrap = src_row.wrap
         self._dbcs_text[:] = src._dbcs_text
+        src.render()
+        self._unrendered = {}
         self._pixels[:, :] = src._pixels
         self._pixel_access = _PixelAccess(self)
         # resubmit to interface
@@ -240,11 +289,28 @@ class VideoBuffer(object):
         row0, col0, row1, col1 = self.pixel_to_text_area(left, top, right, bottom)
         # clear text area
         # we can't see or query the attribute in graphics mode - might as well set to zero
-        self._clear_text_area(
-            row0, col0, row1, col1, 0, adjust_end=False, clear_wrap=False
+        if row0 != row1 or col0 != col1 or not self._is_clear(row0, col0):
+            self._clear_text_area(
+                row0, col0, row1, col1, 0, adjust_end=False, clear_wrap=False
+            )
+        if not self._locked:
+            self._submit(row0, col0, row1, col1)
+        elif self._dirty_pixels is None:
+            self._dirty_pixels = row0, col0, row1, col1
+        else:
+            # merge with the pending update, to be submitted when the lock is released
+            top, left, bottom, right = self._dirty_pixels
+            self._dirty_pixels = (
+                min(top, row0), min(left, col0), max(bottom, row1), max(right, col1)
+            )
+
+    def _is_clear(self, row, col):
+        """Text cell holds a space with attribute zero."""
+        therow = self._rows[row-1]
+        return (
+            therow.chars[col-1] == b' ' and therow.attrs[col-1] == 0
+            and self._dbcs_text[row-1][col-1] == u' '
         )
-        rect = self._pixels[top:bottom+1, left:right+1]
-        self._submit(row0, col0, row1, col1)
 
     ##########################################################################
     # modify text
@@ -259,6 +325,17 @@ class VideoBuffer(object):
             self._rows[row-1].length = max(self._rows[row-1].length, col)
         self._update(row, col, col)
 
+    def put_chars_attr(self, row, col, chars, attr, adjust_end=False):
+        """Put a run of bytes on a row of the screen, with a single attribute."""
+        assert isinstance(chars, bytes), type(chars)
+        stop = col + len(chars) - 1
+        therow = self._rows[row-1]
+        therow.chars[col-1:stop] = list(iterchar(chars))
+        therow.attrs[col-1:stop] = [attr] * len(chars)
+        if adjust_end:
+            therow.length = max(therow.length, stop)
+        self._update(row, col, stop)
+
     def insert_char_attr(self, row, col, char, attr):
         """
         Insert a halfwidth character,
@@ -315,9 +392,14 @@ class VideoBuffer(object):
 
     def _refresh_dbcs(self, row, orig_start, orig_stop):
         """Update the DBCS buffer."""
-        raw = b''.join(self._rows[row-1].chars)
         # get a new converter each time so we don't share state between calls
         conv = self._codepage.get_converter(preserve=b'', use_substitutes=True)
+        if not self._codepage.dbcs:
+            # single-byte codepage: only the changed section needs converting
+            raw = b''.join(self._rows[row-1].chars[orig_start-1:orig_stop])
+            self._dbcs_text[row-1][orig_start-1:orig_stop] = conv.to_unicode_list(raw, flush=True)
+            return orig_start, orig_stop
+        raw = b''.join(self._rows[row-1].chars)
         sequences = conv.to_unicode_list(raw, flush=True)
         updated = [old != new for old, new in zip(self._dbcs_text[row-1], sequences)]
         self._dbcs_text[row-1] = sequences
@@ -344,8 +426,10 @@ class VideoBuffer(object):
             attrs = [_row.attrs[left-1:right] for _row in self._rows[top-1:bottom]]
             x0, y0 = self.text_to_pixel_pos(top, left)
             x1, y1 = self.text_to_pixel_pos(bottom+1, right+1)
+            # text-only interfaces get no pixels
+            sprite = None if self._text_only else self._pixels[y0:y1, x0:x1]
             self._queues.video.put(signals.Event(
-                signals.VIDEO_UPDATE, (top, left, text, attrs, y0, x0, self._pixels[y0:y1, x0:x1])
+                signals.VIDEO_UPDATE, (top, left, text, attrs, y0, x0, sprite)
             ))
 
     ###########################################################################
@@ -379,16 +463,49 @@ class VideoBuffer(object):
 
     def force_submit(self):
         """Update dbcs, write all dirty text rectangles to pixels and submit."""
+        rects = []
         for row in sorted(self._dirty_left):
             start, stop = self._refresh_dbcs(row, self._dirty_left[row], self._dirty_right[row])
-            self._draw_text(row, start, row, stop)
-            self._submit(row, start, row, stop)
+            if self._text_only:
+                self._defer_text(row, start, stop)
+            else:
+                self._draw_text(row, start, row, stop)
+            rects.append((row, start, row, stop))
         self._dirty_left = {}
         self._dirty_right = {}
+        if self._dirty_pixels is not None:
+            rects.append(self._dirty_pixels)
+            self._dirty_pixels = None
+        if not rects:
+            return
+        merged = _merge_rects(rects)
+        if len(merged) > _MAX_UPDATE_EVENTS:
+            merged = [_bounding_rect(merged)]
+        area = sum((_bottom-_top+1) * (_right-_left+1) for _top, _left, _bottom, _right in merged)
+        if area > _FULL_UPDATE_FRACTION * self._height * self._width:
+            merged = [(1, 1, self._height, self._width)]
+        if self._visible:
+            self.saved_updates += len(rects) - len(merged)
+        for rect in merged:
+            self._submit(*rect)
 
     ###########################################################################
     # text rendering
 
+    def _defer_text(self, row, start, stop):
+        """Mark a section of a text row as not yet drawn to the pixel buffer."""
+        if row in self._unrendered:
+            left, right = self._unrendered[row]
+            start, stop = min(start, left), max(stop, right)
+        self._unrendered[row] = start, stop
+
+    def render(self):
+        """Draw any text left out of the pixel buffer in text-only mode."""
+        unrendered, self._unrendered = self._unrendered, {}
+        for row in sorted(unrendered):
+            start, stop = unrendered[row]
+            self._draw_text(row, start, row, stop)
+
     def _draw_text(self, top, left, bottom, right):
         """Draw text in a rectangular screen section to pixel buffer."""
         for row in range(top, bottom+1):
@@ -421,7 +538,9 @@ class VideoBuffer(object):
         self._clear_text_area(
             start, 1, stop, self._width, attr, adjust_end=True, clear_wrap=True
         )
-        # clear pixels
+        # clear pixels, including any text not yet drawn
+        for row in range(start, stop+1):
+            self._unrendered.pop(row, None)
         x0, y0, x1, y1 = self.text_to_pixel_area(start, 1, stop, self._width)
         _, back, _, _ = self._colourmap.split_attr(attr)
         self._pixels[y0:y1+1, x0:x1+1] = back
@@ -495,6 +614,7 @@ class VideoBuffer(object):
         )
         tx0, ty0 = self.text_to_pixel_pos(from_row, 1)
         self._pixels.move(sy0, sy1+1, sx0, sx1+1, ty0, tx0)
+        self._shift_unrendered(from_row, to_row, -1)
 
     def scroll_down(self, from_row, to_row, attr):
         """Scroll down by one line, between from_row and to_row, filling empty row with attr."""
@@ -524,3 +644,18 @@ class VideoBuffer(object):
         )
         tx0, ty0 = self.text_to_pixel_pos(from_row+1, 1)
         self._pixels.move(sy0, sy1+1, sx0, sx1+1, ty0, tx0)
+        self._shift_unrendered(from_row, to_row, 1)
+
+    def _shift_unrendered(self, from_row, to_row, direction):
+        """Move the sections of text not yet drawn along with the scrolled pixels."""
+        if not self._unrendered:
+            return
+        shifted = {}
+        for row, section in self._unrendered.items():
+            if from_row <= row <= to_row:
+                row += direction
+                if not from_row <= row <= to_row:
+                    # scrolled out of the region
+                    continue
+            shifted[row] = section
+        self._unrendered = shifted
@@ -15,7 +15,6 @@ from ..base import error
 from .. import values
 from . import graphics
 from . import modes
-from . import font
 
 from .buffers import VideoBuffer
 from .textscreen import TextScreen
@@ -55,17 +54,8 @@ class Display(object):
         self.attr = self.mode.attr
         # border attribute
         self._border_attr = 0
-        # prepare fonts
-        self._fonts = {}
-        if fonts:
-            self._fonts = {
-                height: font.Font(height, font_dict, codepage)
-                for height, font_dict in iteritems(fonts) if font_dict
-            }
-        # we must have an 8-pixel font; use the default CP437 font if none provided
-        # but note that we interpret the characters through the codepage provided
-        if 8 not in self._fonts:
-            self._fonts[8] = font.Font(8, None, codepage)
+        # prepare fonts; copy them, as the 8-pixel memory font can be changed with POKE
+        self._fonts = {_height: _font.copy() for _height, _font in iteritems(fonts)}
         # copy as 8-pixel hardware BIOS font (for CGA textmodes)
         # as opposed to the loadable 8-pixel memory font used in graphics modes
         self._bios_font_8 = self._fonts[8].copy()
@@ -75,6 +65,8 @@ class Display(object):
         self.text_screen = TextScreen(self._values, self.mode, self.cursor, self._adapter)
         # page buffers, set by _set_mode
         self.pages = None
+        # leave text out of the pixel buffers until an interface needs pixels
+        self._text_only = True
         # screen aspect ratio: used to determine pixel aspect ratio, which is used by CIRCLE
         # all adapters including PCjr target 4x3, except Tandy
         if self._adapter == 'tandy':
@@ -225,6 +217,7 @@ class Display(object):
                 self.mode.height, self.mode.width,
                 self.colourmap, self.attr, font, self._codepage,
                 do_fullwidth=(self.mode.is_text_mode and self.mode.font_height >= 14),
+                text_only=self._text_only,
             )
             for _pagenum in range(self.mode.num_pages)
         ]
@@ -286,6 +279,12 @@ class Display(object):
         # apparently pcjr always drops to text when this is not a no-op
         self.screen(0, 0, 0, 0, force_reset=True)
 
+    def set_text_only(self, text_only):
+        """Set whether to draw text to the pixel buffers only when pixels are needed."""
+        self._text_only = text_only
+        for page in self.pages:
+            page.set_text_only(text_only)
+
     def rebuild(self):
         """Completely resubmit the screen to the interface."""
         # set the screen mode
@@ -7,8 +7,10 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import os
+import copy
 import logging
 import binascii
+from collections import OrderedDict
 
 from ...compat import iteritems, int2byte, zip
 
@@ -24,6 +26,9 @@ _CARRY_COL_9_BYTES = tuple(range(0xb0, 0xdf+1))
 # ascii codepoints for which to repeat row 8 in row 9 (box drawing)
 _CARRY_ROW_9_BYTES = tuple(range(0xb0, 0xdf+1))
 
+# maximum number of rendered glyph sprites kept in the atlas
+_ATLAS_SIZE = 2048
+
 
 class Font(object):
     """Single-height bitfont."""
@@ -45,6 +50,11 @@ class Font(object):
                 )
         self._fontdict = fontdict
         self._glyphs = {}
+        # glyphs of the 256 codepage characters by width and height, shared between copies
+        # as long as they don't change the font
+        self._glyph_sets = {}
+        # rendered glyph sprites by character, width and attributes, least recently used first
+        self._atlas = OrderedDict()
         self._carry_row_9_chars = [self._byte_to_char(_b) for _b in _CARRY_ROW_9_BYTES]
         self._carry_col_9_chars = [self._byte_to_char(_b) for _b in _CARRY_COL_9_BYTES]
 
@@ -56,20 +66,35 @@ class Font(object):
     def height(self):
         return self._height
 
+    def __getstate__(self):
+        """Pickle the font, without the glyph sets shared with other fonts."""
+        pickle_dict = self.__dict__.copy()
+        pickle_dict['_glyph_sets'] = {}
+        return pickle_dict
+
     def copy(self):
-        """Make a deep copy."""
-        copy = self.__class__(self._height, self._fontdict.copy(), self._codepage)
-        copy._width = self._width
-        return copy
+        """Make a copy that can be changed without changing this font."""
+        font = copy.copy(self)
+        font._fontdict = self._fontdict.copy()
+        font._glyphs = self._glyphs.copy()
+        font._glyph_sets = self._glyph_sets
+        font._atlas = OrderedDict()
+        return font
 
     def init_mode(self, width, height):
         """Preload SBCS glyphs at mode switch."""
         if self._width != width or self._height != height:
             self._width = width
             self._height = height
-            # build the basic 256 codepage characters
-            for _c in range(256):
-                self._build_glyph(self._byte_to_char(_c), fullwidth=False)
+            self._atlas.clear()
+            try:
+                self._glyphs = self._glyph_sets[width, height].copy()
+            except KeyError:
+                # build the basic 256 codepage characters
+                self._glyphs = {}
+                for _c in range(256):
+                    self._build_glyph(self._byte_to_char(_c), fullwidth=False)
+                self._glyph_sets[width, height] = self._glyphs.copy()
         return self
 
     def get_byte(self, byte, offset):
@@ -82,8 +107,11 @@ class Font(object):
         char = self._byte_to_char(byte)
         old = self._fontdict[char]
         self._fontdict[char] = old[:offset%8] + int2byte(byte_value) + old[offset%8+1:]
+        # our glyphs no longer match those of the fonts we share glyph sets with
+        self._glyph_sets = {}
         if char in self._glyphs:
             self._build_glyph(char, fullwidth=False)
+            self._atlas.clear()
 
     def _byte_to_char(self, byte):
         """Map single byte value to unicode character."""
@@ -127,9 +155,25 @@ class Font(object):
 
     def render_text(self, unicode_list, attr, back, underline):
         """Return a sprite, width and height for given row of text."""
-        sprite = self.get_glyphs(unicode_list).render(back, attr)
-        if underline:
-            sprite[-1:, :] = attr
+        fw_list = (not _next for _next in unicode_list[1:] + [True])
+        return bytematrix.hstack(
+            self._get_rendered_glyph(_c, _fw, attr, back, underline)
+            for _c, _fw in zip(unicode_list, fw_list) if _c
+        )
+
+    def _get_rendered_glyph(self, char, fullwidth, attr, back, underline):
+        """Retrieve a glyph rendered in the given attributes from the atlas, rendering if needed."""
+        key = char, fullwidth, attr, back, underline
+        try:
+            # move to the most recently used end
+            sprite = self._atlas.pop(key)
+        except KeyError:
+            sprite = self._get_glyph(char, fullwidth).render(back, attr)
+            if underline:
+                sprite[-1:, :] = attr
+            if len(self._atlas) >= _ATLAS_SIZE:
+                self._atlas.popitem(last=False)
+        self._atlas[key] = sprite
         return sprite
 
     def get_glyphs(self, unicode_list):
@@ -148,6 +192,18 @@ class Font(object):
         )
 
 
+def build_fonts(font_dicts, codepage):
+    """Build fonts from dictionaries by height; use the default 8-pixel font if none provided."""
+    fonts = {
+        _height: Font(_height, _font_dict, codepage)
+        for _height, _font_dict in iteritems(font_dicts or {}) if _font_dict
+    }
+    # we must have an 8-pixel font; use the default CP437 font if none provided
+    # but note that we interpret the characters through the codepage provided
+    if 8 not in fonts:
+        fonts[8] = Font(8, None, codepage)
+    return fonts
+
 def _extend_height(glyph, carry_last):
     """Extend the character height by a row."""
     if carry_last:
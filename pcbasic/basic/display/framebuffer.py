@@ -122,27 +122,14 @@ class PlanedSpriteBuilder(object):
 
     def pack(self, sprite):
         """Pack the sprite into bytearray."""
-        # extract colour planes
+        # extract colour planes and interlace them row-by-row
         # note that to get the plane this should be bit-masked - (s >> _p) & 1
         # but bytematrix.packbytes will do this for us
-        sprite_planes = (
-            (sprite >> _plane)  # & 1
-            for _plane in range(self._number_planes)
-        )
+        allplanes = bytematrix.ByteMatrix(sprite.height * self._number_planes, sprite.width)
+        for plane in range(self._number_planes):
+            allplanes[plane::self._number_planes, :] = sprite >> plane
         # pack the bits into bytes
-        #interval_to_bytes
-        packed_planes = list(
-            _sprite.packed(items_per_byte=8)
-            for _sprite in sprite_planes
-        )
-        # interlace row-by-row
-        row_bytes = (sprite.width + 7) // 8
-        length = sprite.height * self._number_planes * row_bytes
-        interlaced = bytearray().join(
-            _packed[_row_offs : _row_offs+row_bytes]
-            for _row_offs in range(0, length, row_bytes)
-            for _packed in packed_planes
-        )
+        interlaced = allplanes.packed(items_per_byte=8)
         size_record = struct.pack('<HH', sprite.width, sprite.height)
         return size_record + interlaced
 
@@ -364,6 +351,30 @@ class GraphicsMemoryMapper(_MemoryMapper):
                     yield page, 0, y, ofs, row_size
             offset += row_size
 
+    def _walk_memory_blocks(self, addr, num_bytes, factor=1):
+        """Iterate over graphical memory in blocks of rows that are contiguous in memory."""
+        # rows that follow each other in a bank are interleave_times scanlines apart
+        # yields page, x, y, offset, bytes per row, number of rows
+        block = None
+        for page, x, y, ofs, length in self._walk_memory(addr, num_bytes, factor):
+            if block:
+                block_page, block_x, block_y, block_ofs, block_length, height = block
+                if (
+                        page == block_page and x == block_x == 0 and length == block_length
+                        and y == block_y + height * self._interleave_times
+                        and ofs == block_ofs + height * block_length
+                    ):
+                    block = block_page, block_x, block_y, block_ofs, block_length, height + 1
+                    continue
+                yield block
+            block = page, x, y, ofs, length, 1
+        if block:
+            yield block
+
+    def _block_rows(self, y, height):
+        """Slice selecting the scanlines of a block."""
+        return slice(y, y + (height-1) * self._interleave_times + 1, self._interleave_times)
+
 
 class CGAMemoryMapper(GraphicsMemoryMapper):
     """Map between coordinates and locations in the CGA framebuffer."""
@@ -393,20 +404,18 @@ class CGAMemoryMapper(GraphicsMemoryMapper):
 
     def set_memory(self, display, addr, byte_array):
         """Set bytes in CGA memory."""
-        for page, x, y, ofs, length in self._walk_memory(addr, len(byte_array)):
-            #bytes_to_interval
+        for page, x, y, ofs, length, height in self._walk_memory_blocks(addr, len(byte_array)):
             pixarray = bytematrix.ByteMatrix.frompacked(
-                byte_array[ofs:ofs+length], height=1, items_per_byte=self._ppb
+                byte_array[ofs:ofs+length*height], height=height, items_per_byte=self._ppb
             )
-            display.pages[page].pixels[y, x:x+pixarray.width] = pixarray
+            display.pages[page].pixels[self._block_rows(y, height), x:x+pixarray.width] = pixarray
 
     def get_memory(self, display, addr, num_bytes):
         """Retrieve bytes from CGA memory."""
         byte_array = bytearray(num_bytes)
-        for page, x, y, ofs, length in self._walk_memory(addr, num_bytes):
-            #interval_to_bytes
-            pixarray = display.pages[page].pixels[y, x:x+length*self._ppb]
-            byte_array[ofs:ofs+length] = pixarray.packed(self._ppb)
+        for page, x, y, ofs, length, height in self._walk_memory_blocks(addr, num_bytes):
+            pixarray = display.pages[page].pixels[self._block_rows(y, height), x:x+length*self._ppb]
+            byte_array[ofs:ofs+length*height] = pixarray.packed(self._ppb)
         return byte_array
 
 
@@ -464,9 +473,9 @@ class EGAMemoryMapper(GraphicsMemoryMapper):
         byte_array = bytearray(num_bytes)
         if plane not in self._planes_used:
             return byte_array
-        for page, x, y, ofs, length in self._walk_memory(addr, num_bytes):
-            pixarray = display.pages[page].pixels[y, x:x+length*8]
-            byte_array[ofs:ofs+length] = (pixarray >> plane).packed(8)
+        for page, x, y, ofs, length, height in self._walk_memory_blocks(addr, num_bytes):
+            pixarray = display.pages[page].pixels[self._block_rows(y, height), x:x+length*8]
+            byte_array[ofs:ofs+length*height] = (pixarray >> plane).packed(8)
         return byte_array
 
     def set_memory(self, display, addr, byte_array):
@@ -479,15 +488,15 @@ class EGAMemoryMapper(GraphicsMemoryMapper):
         # return immediately for unused colour planes
         if mask == 0:
             return
-        for page, x, y, ofs, length in self._walk_memory(addr, len(byte_array)):
+        for page, x, y, ofs, length, height in self._walk_memory_blocks(addr, len(byte_array)):
             pixarray = (
                 bytematrix.ByteMatrix.frompacked(
-                    byte_array[ofs:ofs+length], height=1, items_per_byte=8
+                    byte_array[ofs:ofs+length*height], height=height, items_per_byte=8
                 ).render(0, mask)
             )
-            width = pixarray.width
-            substrate = display.pages[page].pixels[y, x:x+width] & ~mask
-            display.pages[page].pixels[y, x:x+width] = (pixarray & mask) | substrate
+            rows, cols = self._block_rows(y, height), slice(x, x+pixarray.width)
+            substrate = display.pages[page].pixels[rows, cols] & ~mask
+            display.pages[page].pixels[rows, cols] = (pixarray & mask) | substrate
 
 
 class Tandy6MemoryMapper(GraphicsMemoryMapper):
@@ -518,6 +527,19 @@ class Tandy6MemoryMapper(GraphicsMemoryMapper):
         y = bank + 4 * row
         return page, x, y
 
+    def _walk_plane_blocks(self, addr, num_bytes, plane_len):
+        """Iterate over memory blocks, clipped to the length of the data for one plane."""
+        # the walk counts 2-byte units but covers the whole length,
+        # so it runs on beyond the end of the half-length data
+        for page, x, y, ofs, length, height in self._walk_memory_blocks(addr, num_bytes, 2):
+            full_rows = min(height, max(0, plane_len - ofs) // length) if length else height
+            if full_rows:
+                yield page, x, y, ofs, length, full_rows
+            rest_ofs = ofs + full_rows * length
+            if full_rows < height and rest_ofs < plane_len:
+                rest_y = y + full_rows * self._interleave_times
+                yield page, x, rest_y, rest_ofs, plane_len - rest_ofs, 1
+
     def get_memory(self, display, addr, num_bytes):
         """Retrieve bytes from Tandy 640x200x4 """
         # 8 pixels per 2 bytes
@@ -526,10 +548,13 @@ class Tandy6MemoryMapper(GraphicsMemoryMapper):
         hbytes = bytearray(half_len), bytearray(half_len)
         for parity, byte_array in enumerate(hbytes):
             plane = parity ^ (addr % 2)
-            for page, x, y, ofs, length in self._walk_memory(addr, num_bytes, 2):
-                pixarray = display.pages[page].pixels[y, x : x + length*self._ppb*2]
-                #hbytes[parity][ofs:ofs+length] = interval_to_bytes(pixarray, self._ppb*2, plane)
-                byte_array[ofs:ofs+length] = (pixarray >> plane).packed(self._ppb * 2)
+            for page, x, y, ofs, length, height in self._walk_plane_blocks(
+                    addr, num_bytes, half_len
+                ):
+                pixarray = display.pages[page].pixels[
+                    self._block_rows(y, height), x : x + length*self._ppb*2
+                ]
+                byte_array[ofs:ofs+length*height] = (pixarray >> plane).packed(self._ppb * 2)
         # resulting array may be too long by one byte, so cut to size
         return [_item for _pair in zip(*hbytes) for _item in _pair] [:num_bytes]
 
@@ -541,14 +566,14 @@ class Tandy6MemoryMapper(GraphicsMemoryMapper):
         for parity, half in enumerate(hbytes):
             plane = parity ^ (addr % 2)
             mask = 2 ** plane
-            for page, x, y, ofs, length in self._walk_memory(addr, len(byte_array), 2):
-                #pixarray = bytes_to_interval(hbytes[parity][ofs:ofs+length], 2*self._ppb, mask)
+            for page, x, y, ofs, length, height in self._walk_plane_blocks(
+                    addr, len(byte_array), len(half)
+                ):
                 pixarray = (
                     bytematrix.ByteMatrix.frompacked(
-                        # what's the deal with the empty bytearrays here in some of the tests?
-                        half[ofs:ofs+length], height=1, items_per_byte=2*self._ppb
+                        half[ofs:ofs+length*height], height=height, items_per_byte=2*self._ppb
                     ) << plane
                 )
-                width = pixarray.width
-                substrate = display.pages[page].pixels[y, x:x+width] & ~mask
-                display.pages[page].pixels[y, x:x+width] = (pixarray & mask) | substrate
+                rows, cols = self._block_rows(y, height), slice(x, x+pixarray.width)
+                substrate = display.pages[page].pixels[rows, cols] & ~mask
+                display.pages[page].pixels[rows, cols] = (pixarray & mask) | substrate
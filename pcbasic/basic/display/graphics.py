@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import math
+import time
 import operator
 
 from itertools import islice
@@ -19,7 +20,8 @@ from .. import values
 from .. import mlparser
 
 
-ZERO_TILE = bytematrix.ByteMatrix(1, 8)
+# seconds between checks for keyboard interrupts while PAINT is running
+_PAINT_CHECK_INTERVAL = 0.05
 
 
 class GraphicsViewPort(object):
@@ -71,7 +73,13 @@ class GraphicsViewPort(object):
 
     def __setitem__(self, index, data):
         """Set pixels in viewport."""
-        self._pixels[self._convert_slice(index)] = data
+        yslice, xslice = self._convert_slice(index)
+        if isinstance(yslice, slice) and (
+                yslice.start >= yslice.stop or xslice.start >= xslice.stop
+            ):
+            # nothing to draw outside the viewport
+            return
+        self._pixels[yslice, xslice] = data
 
     def __getitem__(self, index):
         """Get pixels in viewport."""
@@ -82,6 +90,12 @@ class GraphicsViewPort(object):
             return self._pixels[y, x]
         return self._pixels[self._convert_slice(index)]
 
+    def get_row_buffer(self, y):
+        """Get the raw pixel buffer and the offset of viewport pixel (0, y) in it, for reading."""
+        x0, y0 = self._convert_coords(0, y)
+        buffer, offset = self._pixels.get_row_buffer(y0)
+        return buffer, offset + x0
+
     def get_bounds(self):
         """Return the graphics viewport bounds, in viewport coordinates."""
         if self._absolute:
@@ -185,6 +199,8 @@ class Graphics(object):
         self._draw_angle = None
         # screen aspect ratio: used to determine pixel aspect ratio, which is used by CIRCLE
         self._screen_aspect = aspect
+        # unpacked sprites by array name, with the array contents they were unpacked from
+        self._sprite_cache = {}
 
     def init_mode(self, mode, pages, colourmap):
         """Initialise for new graphics mode."""
@@ -194,6 +210,8 @@ class Graphics(object):
         self._num_attr = colourmap.num_attr
         # set graphics viewport
         self.graph_view = GraphicsViewPort(self._pages[0].pixels)
+        # sprite format depends on the mode
+        self._sprite_cache = {}
         self._unset_window()
         self.reset()
 
@@ -266,12 +284,13 @@ class Graphics(object):
         fill = self._get_attr_index(fill)
         border = self._get_attr_index(border)
         self.graph_view.unset()
-        if fill is not None:
-            self._draw_box_filled(x0, y0, x1, y1, fill)
-            self._last_attr = fill
-        if border is not None:
-            self._draw_box(x0-1, y0-1, x1+1, y1+1, border)
-            self._last_attr = border
+        with self._apage.collect_updates():
+            if fill is not None:
+                self._draw_box_filled(x0, y0, x1, y1, fill)
+                self._last_attr = fill
+            if border is not None:
+                self._draw_box(x0-1, y0-1, x1+1, y1+1, border)
+                self._last_attr = border
         self.graph_view.set(x0, y0, x1, y1, absolute)
         self._last_point = self.graph_view.get_mid()
         self._draw_current = None
@@ -431,12 +450,13 @@ class Graphics(object):
         self._last_point = x0, y0
         x1, y1 = self._get_window_physical(*coord1)
         attr = self._get_attr_index(attr_index)
-        if not shape:
-            self._draw_line(x0, y0, x1, y1, attr, pattern)
-        elif shape == b'B':
-            self._draw_box(x0, y0, x1, y1, attr, pattern)
-        elif shape == b'BF':
-            self._draw_box_filled(x0, y0, x1, y1, attr)
+        with self._apage.collect_updates():
+            if not shape:
+                self._draw_line(x0, y0, x1, y1, attr, pattern)
+            elif shape == b'B':
+                self._draw_box(x0, y0, x1, y1, attr, pattern)
+            elif shape == b'BF':
+                self._draw_box_filled(x0, y0, x1, y1, attr)
         self._last_point = x1, y1
         self._draw_current = None
         self._last_attr = attr
@@ -457,23 +477,23 @@ class Graphics(object):
             dx, dy = dy, dx
         sx = 1 if x1 > x0 else -1
         sy = 1 if y1 > y0 else -1
-        mask = 0x8000
-        line_error = dx // 2
-        x, y = x0, y0
-        for x in range(x0, x1+sx, sx):
-            if pattern & mask != 0:
+        # the error term starts at dx//2 and loses dy for each pixel along the major axis;
+        # the minor coordinate steps when it drops below zero, so that run n of pixels
+        # with the same minor coordinate ends at pixel (n*dx + dx//2) // dy
+        start = 0
+        for run in range(dy+1):
+            if run < dy:
+                stop = (run*dx + dx//2) // dy
+            else:
+                stop = dx
+            y = y0 + sy*run
+            for first, last in _pattern_runs(pattern, start, stop):
+                low, high = sorted((x0 + sx*first, x0 + sx*last))
                 if steep:
-                    # set point (y, x)
-                    self.graph_view[x, y] = attr
+                    self.graph_view[low:high+1, y] = attr
                 else:
-                    self.graph_view[y, x] = attr
-            mask >>= 1
-            if mask == 0:
-                mask = 0x8000
-            line_error -= dy
-            if line_error < 0:
-                y += sy
-                line_error += dx
+                    self.graph_view[y, low:high+1] = attr
+            start = stop + 1
 
     def _draw_box_filled(self, x0, y0, x1, y1, attr):
         """Draw a filled box between the given corner points."""
@@ -489,32 +509,31 @@ class Graphics(object):
         """Draw an empty box between the given corner points."""
         x0, y0 = self.graph_view.cutoff_coord(x0, y0)
         x1, y1 = self.graph_view.cutoff_coord(x1, y1)
-        mask = 0x8000
-        mask = self._draw_straight(x1, y1, x0, y1, attr, pattern, mask)
-        mask = self._draw_straight(x1, y0, x0, y0, attr, pattern, mask)
+        # the line pattern continues from side to side
+        phase = 0
+        phase = self._draw_straight(x1, y1, x0, y1, attr, pattern, phase)
+        phase = self._draw_straight(x1, y0, x0, y0, attr, pattern, phase)
         # verticals always drawn top to bottom
         if y0 < y1:
             y0, y1 = y1, y0
-        mask = self._draw_straight(x1, y1, x1, y0, attr, pattern, mask)
-        mask = self._draw_straight(x0, y1, x0, y0, attr, pattern, mask)
+        phase = self._draw_straight(x1, y1, x1, y0, attr, pattern, phase)
+        phase = self._draw_straight(x0, y1, x0, y0, attr, pattern, phase)
 
-    def _draw_straight(self, x0, y0, x1, y1, attr, pattern, mask):
-        """Draw a horizontal or vertical line."""
+    def _draw_straight(self, x0, y0, x1, y1, attr, pattern, phase):
+        """Draw a horizontal or vertical line, starting at the given pattern phase."""
         if x0 == x1:
-            p0, p1, q, direction = y0, y1, x0, 'y'
+            p0, p1, q, horizontal = y0, y1, x0, False
         else:
-            p0, p1, q, direction = x0, x1, y0, 'x'
+            p0, p1, q, horizontal = x0, x1, y0, True
         sp = 1 if p1 > p0 else -1
-        for p in range(p0, p1+sp, sp):
-            if pattern & mask != 0:
-                if direction == 'x':
-                    self.graph_view[q, p] = attr
-                else:
-                    self.graph_view[p, q] = attr
-            mask >>= 1
-            if mask == 0:
-                mask = 0x8000
-        return mask
+        length = abs(p1 - p0) + 1
+        for first, last in _pattern_runs(pattern, phase, phase + length - 1):
+            low, high = sorted((p0 + sp*(first-phase), p0 + sp*(last-phase)))
+            if horizontal:
+                self.graph_view[q, low:high+1] = attr
+            else:
+                self.graph_view[low:high+1, q] = attr
+        return phase + length
 
     ### CIRCLE: circle, ellipse, sectors
 
@@ -610,25 +629,26 @@ class Graphics(object):
         stop_octant, stop_coord, stop_line = -1, -1, False
         if stop is not None:
             stop_octant, stop_coord, stop_line = _get_octant(stop, rx, ry)
-        if aspect == 1.:
-            self._draw_circle(
-                x0, y0, rx, attr,
-                start_octant, start_coord, start_line,
-                stop_octant, stop_coord, stop_line
-            )
-        else:
-            startx, starty, stopx, stopy = -1, -1, -1, -1
-            if start is not None:
-                startx = abs(int(round(rx * math.cos(start))))
-                starty = abs(int(round(ry * math.sin(start))))
-            if stop is not None:
-                stopx = abs(int(round(rx * math.cos(stop))))
-                stopy = abs(int(round(ry * math.sin(stop))))
-            self._draw_ellipse(
-                x0, y0, rx, ry, attr,
-                start_octant//2, startx, starty, start_line,
-                stop_octant//2, stopx, stopy, stop_line
-            )
+        with self._apage.collect_updates():
+            if aspect == 1.:
+                self._draw_circle(
+                    x0, y0, rx, attr,
+                    start_octant, start_coord, start_line,
+                    stop_octant, stop_coord, stop_line
+                )
+            else:
+                startx, starty, stopx, stopy = -1, -1, -1, -1
+                if start is not None:
+                    startx = abs(int(round(rx * math.cos(start))))
+                    starty = abs(int(round(ry * math.sin(start))))
+                if stop is not None:
+                    stopx = abs(int(round(rx * math.cos(stop))))
+                    stopy = abs(int(round(ry * math.sin(stop))))
+                self._draw_ellipse(
+                    x0, y0, rx, ry, attr,
+                    start_octant//2, startx, starty, start_line,
+                    stop_octant//2, stopx, stopy, stop_line
+                )
         self._last_attr = attr
         self._last_point = x0, y0
         self._draw_current = None
@@ -650,35 +670,12 @@ class Graphics(object):
         # if oct1==oct0:
         # ----|.....|--- : coo1 lt coo0 : print if y in [0,coo1] or in [coo0, r]
         # ....|-----|... ; coo1 gte coo0: print if y in [coo0,coo1]
+        # trace the first octant
+        points = []
         x, y = r, 0
         bres_error = 1-r
         while x >= y:
-            for octant in range(0, 8):
-                if octant in hide_oct:
-                    continue
-                elif oct0 != oct1 and octant == oct0 and _octant_gt(oct0, coo0, y):
-                    continue
-                elif oct0 != oct1 and octant == oct1 and _octant_gt(oct1, y, coo1):
-                    continue
-                elif oct0 == oct1 and octant == oct0:
-                    # if coo1 >= coo0
-                    if _octant_gte(oct0, coo1, coo0):
-                        # if y > coo1 or y < coo0
-                        # (don't draw if y is outside coo's)
-                        if _octant_gt(oct0, y, coo1) or _octant_gt(oct0, coo0,y):
-                            continue
-                    else:
-                        # if coo0 > y > c001
-                        # (don't draw if y is between coo's)
-                        if _octant_gt(oct0, y, coo1) and _octant_gt(oct0, coo0, y):
-                            continue
-                oct_x, oct_y = _octant_coord(octant, x0, y0, x, y)
-                self.graph_view[oct_y, oct_x] = attr
-            # remember endpoints for pie sectors
-            if y == coo0:
-                coo0x = x
-            if y == coo1:
-                coo1x = x
+            points.append((x, y))
             # bresenham error step
             y += 1
             if bres_error < 0:
@@ -686,6 +683,39 @@ class Graphics(object):
             else:
                 x -= 1
                 bres_error += 2*(y-x+1)
+        # remember endpoints for pie sectors
+        coo0x = coo1x = None
+        for x, y in points:
+            if y == coo0:
+                coo0x = x
+            if y == coo1:
+                coo1x = x
+        for octant in range(0, 8):
+            if octant in hide_oct:
+                continue
+            elif oct0 != oct1 and octant == oct0:
+                visible = [_p for _p in points if not _octant_gt(oct0, coo0, _p[1])]
+            elif oct0 != oct1 and octant == oct1:
+                visible = [_p for _p in points if not _octant_gt(oct1, _p[1], coo1)]
+            elif oct0 == oct1 and octant == oct0:
+                # if coo1 >= coo0
+                if _octant_gte(oct0, coo1, coo0):
+                    # if y > coo1 or y < coo0
+                    # (don't draw if y is outside coo's)
+                    visible = [
+                        _p for _p in points
+                        if not (_octant_gt(oct0, _p[1], coo1) or _octant_gt(oct0, coo0, _p[1]))
+                    ]
+                else:
+                    # if coo0 > y > c001
+                    # (don't draw if y is between coo's)
+                    visible = [
+                        _p for _p in points
+                        if not (_octant_gt(oct0, _p[1], coo1) and _octant_gt(oct0, coo0, _p[1]))
+                    ]
+            else:
+                visible = points
+            self._draw_spans((_octant_coord(octant, x0, y0, _x, _y) for _x, _y in visible), attr)
         # draw pie-slice lines
         if line0:
             self._draw_line(x0, y0, *_octant_coord(oct0, x0, y0, coo0x, coo0), attr=attr)
@@ -713,25 +743,11 @@ class Graphics(object):
         ddx = 32 * ry * ry
         # error for first step
         err = dx + dy
+        # trace the first quadrant
+        points = []
         x, y = rx, 0
         while True:
-            for quadrant in range(0,4):
-                # skip invisible arc sectors
-                if quadrant in hide_qua:
-                    continue
-                elif qua0 != qua1 and quadrant == qua0 and _quadrant_gt(qua0, x0, y0, x, y):
-                    continue
-                elif qua0 != qua1 and quadrant == qua1 and _quadrant_gt(qua1, x, y, x1, y1):
-                    continue
-                elif qua0 == qua1 and quadrant == qua0:
-                    if _quadrant_gte(qua0, x1, y1, x0, y0):
-                        if _quadrant_gt(qua0, x, y, x1, y1) or _quadrant_gt(qua0, x0, y0, x, y):
-                            continue
-                    else:
-                        if _quadrant_gt(qua0, x, y, x1, y1) and _quadrant_gt(qua0, x0, y0, x, y):
-                            continue
-                quad_x, quad_y = _quadrant_coord(quadrant, cx, cy, x, y)
-                self.graph_view[quad_y, quad_x] = attr
+            points.append((x, y))
             # bresenham error step
             e2 = 2 * err
             if (e2 <= dy):
@@ -745,18 +761,50 @@ class Graphics(object):
             # NOTE - err changes sign at the change from y increase to x increase
             if (x < 0):
                 break
+        for quadrant in range(0, 4):
+            # skip invisible arc sectors
+            if quadrant in hide_qua:
+                continue
+            elif qua0 != qua1 and quadrant == qua0:
+                visible = [_p for _p in points if not _quadrant_gt(qua0, x0, y0, *_p)]
+            elif qua0 != qua1 and quadrant == qua1:
+                visible = [_p for _p in points if not _quadrant_gt(qua1, _p[0], _p[1], x1, y1)]
+            elif qua0 == qua1 and quadrant == qua0:
+                if _quadrant_gte(qua0, x1, y1, x0, y0):
+                    visible = [
+                        _p for _p in points
+                        if not (
+                            _quadrant_gt(qua0, _p[0], _p[1], x1, y1)
+                            or _quadrant_gt(qua0, x0, y0, *_p)
+                        )
+                    ]
+                else:
+                    visible = [
+                        _p for _p in points
+                        if not (
+                            _quadrant_gt(qua0, _p[0], _p[1], x1, y1)
+                            and _quadrant_gt(qua0, x0, y0, *_p)
+                        )
+                    ]
+            else:
+                visible = points
+            self._draw_spans((_quadrant_coord(quadrant, cx, cy, _x, _y) for _x, _y in visible), attr)
         # too early stop of flat vertical ellipses
         # finish tip of ellipse
-        while (y < ry):
-            self.graph_view[cy+y, cx] = attr
-            self.graph_view[cy-y, cx] = attr
-            y += 1
+        if y < ry:
+            self.graph_view[cy+y:cy+ry, cx] = attr
+            self.graph_view[cy-ry+1:cy-y+1, cx] = attr
         # draw pie-slice lines
         if line0:
             self._draw_line(cx, cy, *_quadrant_coord(qua0, cx, cy, x0, y0), attr=attr)
         if line1:
             self._draw_line(cx, cy, *_quadrant_coord(qua1, cx, cy, x1, y1), attr=attr)
 
+    def _draw_spans(self, points, attr):
+        """Draw a sequence of points, joining neighbours on the same row into horizontal runs."""
+        for y, left, right in _spans(points):
+            self.graph_view[y, left:right+1] = attr
+
     ### PAINT: Flood fill
 
     def paint_(self, args):
@@ -828,119 +876,85 @@ class Graphics(object):
         # paint nothing if we start on border attrib
         if self.graph_view[y, x] == border_attr:
             return
-        while len(line_seed) > 0:
-            # consider next interval
-            x_start, x_stop, y, ydir = line_seed.pop()
-            # extend interval as far as it goes to left and right
-            x_left = x_start - self._scanline_until(border_attr, y, x_start-1, bound_x0-1).width
-            x_right = x_stop + self._scanline_until(border_attr, y, x_stop+1, bound_x1+1).width
-            # check next scanlines and add intervals to the list
-            if ydir == 0:
-                if y + 1 <= bound_y1:
-                    line_seed = self._check_scanline(
-                        line_seed, x_left, x_right, y+1, tile, is_solid, bg_tile, border_attr, 1
-                    )
-                if y - 1 >= bound_y0:
-                    line_seed = self._check_scanline(
-                        line_seed, x_left, x_right, y-1, tile, is_solid, bg_tile, border_attr, -1
-                    )
-            else:
-                # check the same interval one scanline onward in the same direction
-                if y+ydir <= bound_y1 and y+ydir >= bound_y0:
-                    line_seed = self._check_scanline(
-                        line_seed, x_left, x_right, y+ydir, tile, is_solid, bg_tile, border_attr, ydir
-                    )
-                # check any bit of the interval that was extended one scanline backward
-                # this is where the flood fill goes around corners.
-                if y-ydir <= bound_y1 and y-ydir >= bound_y0:
-                    line_seed = self._check_scanline(
-                        line_seed, x_left, x_start-1, y-ydir, tile, is_solid, bg_tile, border_attr, -ydir
-                    )
-                    line_seed = self._check_scanline(
-                        line_seed, x_stop+1, x_right, y-ydir, tile, is_solid, bg_tile, border_attr, -ydir
+        # tile and background rows repeated across the viewport, so that they can be indexed by x
+        fill = _PaintTiles(tile, bg_tile, is_solid, bound_x1 + 1)
+        border = int2byte(border_attr)
+        next_check = time.time() + _PAINT_CHECK_INTERVAL
+        with self._apage.collect_updates():
+            while len(line_seed) > 0:
+                # consider next interval
+                x_start, x_stop, y, ydir = line_seed.pop()
+                # extend interval as far as it goes to left and right
+                buffer, offset = self.graph_view.get_row_buffer(y)
+                x_left = buffer.rfind(border, offset + bound_x0, offset + x_start)
+                x_left = bound_x0 if x_left < 0 else x_left - offset + 1
+                x_right = buffer.find(border, offset + x_stop + 1, offset + bound_x1 + 1)
+                x_right = bound_x1 if x_right < 0 else x_right - offset - 1
+                # check next scanlines and add intervals to the list
+                if ydir == 0:
+                    if y + 1 <= bound_y1:
+                        self._check_scanline(line_seed, x_left, x_right, y+1, fill, border, 1)
+                    if y - 1 >= bound_y0:
+                        self._check_scanline(line_seed, x_left, x_right, y-1, fill, border, -1)
+                else:
+                    # check the same interval one scanline onward in the same direction
+                    if y+ydir <= bound_y1 and y+ydir >= bound_y0:
+                        self._check_scanline(
+                            line_seed, x_left, x_right, y+ydir, fill, border, ydir
+                        )
+                    # check any bit of the interval that was extended one scanline backward
+                    # this is where the flood fill goes around corners.
+                    if y-ydir <= bound_y1 and y-ydir >= bound_y0:
+                        self._check_scanline(
+                            line_seed, x_left, x_start-1, y-ydir, fill, border, -ydir
+                        )
+                        self._check_scanline(
+                            line_seed, x_stop+1, x_right, y-ydir, fill, border, -ydir
+                        )
+                # draw the pixels for the current interval
+                if is_solid:
+                    self.graph_view[y, x_left:x_right+1] = fill_attr
+                else:
+                    self.graph_view[y, x_left:x_right+1] = bytematrix.ByteMatrix(
+                        1, x_right - x_left + 1, fill.get_row(y)[x_left:x_right+1]
                     )
-            # draw the pixels for the current interval
-            if is_solid:
-                self.graph_view[y, x_left:x_right+1] = tile[0, 0]
-            else:
-                # convert tile to a list of attributes
-                tilerow = tile[y % tile.height, :]
-                n_tiles = 1 + (x_right+1) // tile.width - (x_left // tile.width)
-                tiles = bytematrix.hstack((tilerow,) * n_tiles)
-                interval = tiles[
-                    :,
-                    (x_left%tile.width) : (x_left%tile.width) + x_right - x_left + 1
-                ]
-                # put to screen
-                self.graph_view[y, x_left:x_right+1] = interval
-            # allow interrupting the paint
-            if y % 4 == 0:
-                self._input_methods.wait()
+                # allow interrupting the paint
+                if time.time() >= next_check:
+                    self._input_methods.wait()
+                    next_check = time.time() + _PAINT_CHECK_INTERVAL
         self._last_attr = fill_attr
 
-    def _scanline_until(self, element, y, x0, x1):
-        """Get row until given element."""
-        if x0 == x1:
-            return bytematrix.ByteMatrix()
-        elif x1 > x0:
-            row = self.graph_view[y, x0:x1]
-            try:
-                # python2 won't do bytearray.index(int)
-                index = row.to_bytes().index(int2byte(element))
-                return row[:, :index]
-            except ValueError:
-                return row
-        else:
-            row = self.graph_view[y, x1+1:x0+1]
-            try:
-                index = 1 + row.to_bytes().rindex(int2byte(element))
-                return row[:, index:]
-            except ValueError:
-                return row
-
-    def _check_scanline(
-            self, line_seed, x_start, x_stop, y,
-            tile, is_solid, bg_tile, border_attr, ydir
-        ):
+    def _check_scanline(self, line_seed, x_start, x_stop, y, fill, border, ydir):
         """Append all subintervals between border colours to the scanning stack."""
-        if x_stop < x_start:
-            return line_seed
-        max_width = x_stop - x_start + 1
-        # repeat row ceildiv + 1 times to ensure we can start in the middle of the first tile
-        rtile = tile[y % tile.height, :]
-        repeated_tile = rtile.htile(1 - (-max_width // rtile.width))
-        if bg_tile:
-            # bg_tile is only one row
-            repeated_back = bg_tile.htile(1 - (-max_width // bg_tile.width))
+        buffer, offset = self.graph_view.get_row_buffer(y)
+        tile_row = fill.get_row(y)
         x = x_start
         while x <= x_stop:
             # scan horizontally until border colour found, then append interval & continue scanning
-            pattern = self._scanline_until(border_attr, y, x, x_stop+1)
-            if pattern.width > 0:
+            end = buffer.find(border, offset + x, offset + x_stop + 1)
+            end = x_stop + 1 if end < 0 else end - offset
+            if end > x:
+                pixels = buffer[offset+x : offset+end]
                 # check if scanline pattern matches fill pattern
-                tile_x = x % rtile.width
                 has_same_pattern = (
                     # don't match zero row unless pattern is solid (special case)
                     # - avoid breaking off pattern filling on zero rows
                     # - but also don't loop forever on solid background fills
                     # - if the fill attribute is not 0, the behaviour differs:
                     #   here, the fill breaks off on encountering the matching solid line
-                    (is_solid or rtile != ZERO_TILE[0, :rtile.width])
-                    and pattern == repeated_tile[0, tile_x : tile_x+pattern.width]
+                    fill.can_match(y) and pixels == tile_row[x:end]
                 )
                 # background tile specified: don't stop if we match the background tile (fully!)
-                if bg_tile:
-                    has_same_pattern = has_same_pattern and (
-                        pattern.width < bg_tile.width
-                        or pattern != repeated_back[0, tile_x : tile_x+pattern.width]
+                if has_same_pattern and fill.bg_width:
+                    has_same_pattern = (
+                        end - x < fill.bg_width or pixels != fill.bg_row[x:end]
                     )
                 # we've reached a border colour, append our interval & start a new one
                 # don't append if same fill colour/pattern,
                 # to avoid infinite loops over bits already painted (eg. 00 shape)
                 if not has_same_pattern:
-                    line_seed.append([x, x + pattern.width - 1, y, ydir])
-            x += pattern.width + 1
-        return line_seed
+                    line_seed.append([x, end - 1, y, ydir])
+            x = end + 1
 
     ### PUT and GET: Sprite operations
 
@@ -958,8 +972,7 @@ class Graphics(object):
             raise error.BASICError(error.TYPE_MISMATCH)
         x0, y0 = self._get_window_physical(x0, y0)
         self._last_point = x0, y0
-        packed_sprite = self._memory.arrays.view_full_buffer(array_name)
-        sprite = self._mode.sprite_builder.unpack(packed_sprite)
+        sprite = self._get_sprite(array_name)
         x1, y1 = x0 + sprite.width - 1, y0 + sprite.height - 1
         # the whole sprite must fit or it's IFC
         error.throw_if(not self.graph_view.contains(x0, y0))
@@ -979,6 +992,16 @@ class Graphics(object):
         self.graph_view[y0:y1+1, x0:x1+1] = rect
         self._draw_current = None
 
+    def _get_sprite(self, array_name):
+        """Unpack the sprite stored in an array, reusing the last result if the array is unchanged."""
+        packed_sprite = self._memory.arrays.view_full_buffer(array_name)
+        contents = packed_sprite.tobytes()
+        cached_contents, sprite = self._sprite_cache.get(array_name, (None, None))
+        if contents != cached_contents:
+            sprite = self._mode.sprite_builder.unpack(packed_sprite)
+            self._sprite_cache[array_name] = contents, sprite
+        return sprite
+
     def get_(self, args):
         """GET: Read a sprite from the screen."""
         if self._mode.is_text_mode:
@@ -1023,7 +1046,9 @@ class Graphics(object):
         if self._mode.is_text_mode:
             raise error.BASICError(error.IFC)
         gml = values.next_string(args)
-        self._draw(gml)
+        # collect pixel updates and submit them in one go
+        with self._apage.collect_updates():
+            self._draw(gml)
         list(args)
 
     def _draw(self, gml):
@@ -1240,6 +1265,68 @@ class Graphics(object):
 
 
 
+###############################################################################
+# flood fill
+
+class _PaintTiles(object):
+    """Fill and background tile rows, repeated so that they can be indexed by x coordinate."""
+
+    def __init__(self, tile, bg_tile, is_solid, width):
+        """Repeat the tile rows to cover the given width."""
+        reps = width // tile.width + 1
+        self._rows = [bytearray(tile[_y, :].to_bytes()) * reps for _y in range(tile.height)]
+        # a row of zeros only stops the fill if the fill pattern is solid
+        self._can_match = [is_solid or any(_row) for _row in self._rows]
+        if bg_tile is None:
+            self.bg_width, self.bg_row = 0, None
+        else:
+            self.bg_width = bg_tile.width
+            self.bg_row = bytearray(bg_tile.to_bytes()) * (width // bg_tile.width + 1)
+
+    def get_row(self, y):
+        """Fill pattern for row y."""
+        return self._rows[y % len(self._rows)]
+
+    def can_match(self, y):
+        """Whether an interval equal to the fill pattern on row y stops the fill."""
+        return self._can_match[y % len(self._can_match)]
+
+
+###############################################################################
+# line patterns
+
+def _pattern_runs(pattern, start, stop):
+    """Split a range of pixel indices into the runs that are set in a 16-bit line pattern."""
+    pattern &= 0xffff
+    if pattern == 0xffff:
+        return [(start, stop)]
+    runs = []
+    first = None
+    for index in range(start, stop+1):
+        if pattern & (0x8000 >> (index & 15)):
+            if first is None:
+                first = index
+        elif first is not None:
+            runs.append((first, index-1))
+            first = None
+    if first is not None:
+        runs.append((first, stop))
+    return runs
+
+
+def _spans(points):
+    """Group a sequence of (x, y) points into (y, left, right) runs of adjacent pixels on a row."""
+    spans = []
+    for x, y in points:
+        if spans:
+            row, left, right = spans[-1]
+            if row == y and left-1 <= x <= right+1:
+                spans[-1] = row, min(left, x), max(right, x)
+                continue
+        spans.append((y, x, x))
+    return spans
+
+
 ###############################################################################
 # octant logic for CIRCLE
 
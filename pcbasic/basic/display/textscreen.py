@@ -163,10 +163,33 @@ class TextScreen(object):
     # basic text buffer operations
 
     def write_chars(self, chars, do_scroll_down):
-        """Put one character at the current position."""
+        """Put characters at the current position."""
         with self.collect_updates():
-            for char in iterchar(chars):
-                self.write_char(char, do_scroll_down)
+            while chars:
+                # write the run of characters that fits on the row before the last column at once
+                run_length = self._fitting_run_length(len(chars))
+                if run_length:
+                    self._apage.put_chars_attr(
+                        self.current_row, self.current_col, chars[:run_length],
+                        self._attr, adjust_end=True
+                    )
+                    self.current_col += run_length
+                    chars = chars[run_length:]
+                else:
+                    # characters that wrap, scroll or overflow go one by one
+                    self.write_char(chars[:1], do_scroll_down)
+                    chars = chars[1:]
+
+    def _fitting_run_length(self, max_length):
+        """Number of characters that can be written without wrapping, scrolling or overflow."""
+        if self.overflow or not 1 <= self.current_col < self.mode.width:
+            return 0
+        if self._bottom_row_allowed:
+            if self.current_row != self.mode.height:
+                return 0
+        elif not self.scroll_area.top <= self.current_row <= self.scroll_area.bottom:
+            return 0
+        return min(max_length, self.mode.width - self.current_col)
 
     def write_char(self, char, do_scroll_down):
         """Put one character at the current position."""
@@ -70,20 +70,87 @@ class NullQueue(object):
     def put_nowait(self, item):
         pass
     def get(self, block=False, timeout=False):
-        # we're ignoring block
+        # nothing ever arrives, but don't make a caller that waits for input spin
+        if block and timeout:
+            time.sleep(timeout)
         raise queue.Empty
     def task_done(self):
         pass
     def join(self):
         pass
+    def flush(self, force=False):
+        pass
+
+
+class FrameBatcher(object):
+    """Collect video signals and hand them to the interface in batches, once per frame."""
+
+    # seconds between handoffs
+    frame_interval = 1 / 60.
+    # number of batches the interface may have outstanding before we hold on to the next
+    max_batches = 2
+    # number of signals at which we wait for the interface to catch up
+    max_batch_length = 2000
+
+    def __init__(self, video_queue):
+        """Wrap the interface's video queue."""
+        self._queue = video_queue
+        self._signals = []
+        # index in batch of update for each rectangle
+        self._updates = {}
+        self._last_handoff = 0
+        # number of updates replaced by a later update of the same rectangle
+        self.coalesced = 0
+
+    def put(self, signal, block=True, timeout=None):
+        """Add a signal to the batch, replacing any earlier update of the same rectangle."""
+        if signal.event_type == signals.VIDEO_UPDATE:
+            top, left, text, _, _, _, _ = signal.params
+            # the sprite may be left out for text-only interfaces, so measure the text
+            rect = top, left, len(text), max(len(_row) for _row in text) if text else 0
+            index = self._updates.get(rect)
+            if index is not None:
+                self._signals[index] = None
+                self.coalesced += 1
+            self._updates[rect] = len(self._signals)
+        elif signal.event_type in (
+                signals.VIDEO_SET_MODE, signals.VIDEO_SCROLL, signals.VIDEO_CLEAR_ROWS
+            ):
+            # earlier updates are moved or wiped, so we can't replace them any more
+            self._updates = {}
+        self._signals.append(signal)
+
+    def put_nowait(self, signal):
+        """Add a signal to the batch."""
+        self.put(signal)
+
+    def flush(self, force=False):
+        """Hand the batch to the interface if a frame has passed and the interface has room."""
+        if not self._signals:
+            return
+        if not force:
+            if time.time() - self._last_handoff < self.frame_interval:
+                return
+            # only wait for the interface if it has fallen far behind
+            while self._queue.qsize() >= self.max_batches:
+                if len(self._signals) < self.max_batch_length:
+                    return
+                time.sleep(EventQueues.tick)
+        batch = [_signal for _signal in self._signals if _signal is not None]
+        self._signals = []
+        self._updates = {}
+        self._last_handoff = time.time()
+        self._queue.put(signals.Event(signals.VIDEO_BATCH, (batch,)))
 
 
 class EventQueues(object):
     """Manage interface queues."""
 
     tick = 0.006
-    max_video_qsize = 200
     #max_audio_qsize = 20
+    # longest time to block for input while idle
+    # we wake up now and then to poll anything that doesn't come through the input queue
+    max_idle_wait = 0.1
 
     def __init__(self, ctrl_c_is_break, inputs=None, video=None, audio=None):
         """Initialise; default is NullQueues."""
@@ -97,12 +164,18 @@ class EventQueues(object):
         self._ctrl_c_is_break = ctrl_c_is_break
         # F12 replacement events
         self._f12_active = False
+        # callables giving the time in seconds until something other than input is due
+        self._deadlines = []
+        # don't sleep or block, but leave waits for between statements
+        self.nonblocking = False
+        # condition we're waiting for between statements in nonblocking mode, or None
+        self.deferred = None
         self.set(inputs, video, audio)
 
     def set(self, inputs=None, video=None, audio=None):
         """Set; default is NullQueues."""
         self.inputs = inputs or NullQueue()
-        self.video = video or NullQueue()
+        self.video = FrameBatcher(video) if video else NullQueue()
         self.audio = audio or NullQueue()
 
     def __getstate__(self):
@@ -111,6 +184,8 @@ class EventQueues(object):
         pickle_dict['inputs'] = None
         pickle_dict['video'] = None
         pickle_dict['audio'] = None
+        # conditions are usually lambdas; just go on after resuming
+        pickle_dict['deferred'] = None
         return pickle_dict
 
     def __setstate__(self, pickle_dict):
@@ -122,15 +197,58 @@ class EventQueues(object):
         """Add an input handler."""
         self._handlers.append(handler)
 
+    def add_deadline(self, deadline):
+        """Add a callable giving the seconds until something is due, or None if nothing is."""
+        self._deadlines.append(deadline)
+
     def set_basic_event_handlers(self, event_check_input):
         """Set the handlers for BASIC events."""
         self._basic_handlers = tuple(event_check_input)
 
     def wait(self):
         """Wait and check events."""
-        time.sleep(self.tick)
+        if not self.nonblocking:
+            time.sleep(self.tick)
+        self.check_events()
+
+    def idle(self, timeout=None):
+        """Block until input arrives, something is due or the timeout in seconds has passed."""
+        # bring the screen up to date before we go quiet
+        self.video.flush(force=True)
+        deadlines = [self.max_idle_wait, timeout] + [_d() for _d in self._deadlines] + [
+            _e.time_to_trigger() for _e in self._basic_handlers
+        ]
+        timeout = max(self.tick, min(_d for _d in deadlines if _d is not None))
+        try:
+            signal = self.inputs.get(True, timeout)
+        except queue.Empty:
+            pass
+        else:
+            self.inputs.task_done()
+            self._handle_input(signal)
         self.check_events()
 
+    def wait_for_input(self):
+        """Block until input arrives or something is due; in nonblocking mode, end the time slice."""
+        if self.nonblocking:
+            # the program is only waiting; go on in the next slice
+            self.deferred = lambda: True
+        else:
+            self.idle()
+
+    def wait_until(self, condition, timeout=None):
+        """
+        Wait until condition() holds, blocking for input in the meantime.
+        timeout() gives the seconds until the condition may hold without any input coming in,
+        or None if only input can make it hold.
+        In nonblocking mode, don't wait but leave the condition for between statements.
+        """
+        if self.nonblocking:
+            self.deferred = condition
+            return
+        while not condition():
+            self.idle(timeout() if timeout else None)
+
     def check_events(self):
         """Main event cycle."""
         # sleep(0) is needed for responsiveness, e.g. event trapping in programs with tight loops
@@ -153,11 +271,8 @@ class EventQueues(object):
         # (perhaps with numba, nuitka, cython, pypy or jython)
         # but note that the video queue is a Python object so may require the GIL
         # or if it held the GIL for a full cycle
-        # wait to for the queue to drain if it excceds a threshold value
-        # this allows the interface to catch up with video updates
-        if self.video.qsize() > self.max_video_qsize:
-            while self.video.qsize():
-                time.sleep(self.tick)
+        # hand over video updates once per frame
+        self.video.flush()
         self._check_input()
 
     def _check_input(self):
@@ -176,17 +291,21 @@ class EventQueues(object):
                         e.check_input(signals.Event(None))
                     break
             self.inputs.task_done()
-            # effect replacements
-            self._replace_inputs(signal)
-            # handle input events
-            for handle_input in (
-                    [self._handle_non_trappable_interrupts] +
-                    [e.check_input for e in self._basic_handlers] +
-                    [self._handle_trappable_interrupts] +
-                    [e.check_input for e in self._handlers]
-                ):
-                if handle_input(signal):
-                    break
+            self._handle_input(signal)
+
+    def _handle_input(self, signal):
+        """Handle an input event."""
+        # effect replacements
+        self._replace_inputs(signal)
+        # handle input events
+        for handle_input in (
+                [self._handle_non_trappable_interrupts] +
+                [e.check_input for e in self._basic_handlers] +
+                [self._handle_trappable_interrupts] +
+                [e.check_input for e in self._handlers]
+            ):
+            if handle_input(signal):
+                break
 
     def _handle_non_trappable_interrupts(self, signal):
         """Handle non-trappable interrupts (before BASIC events)."""
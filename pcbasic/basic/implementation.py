@@ -46,6 +46,26 @@ GREETING = (
     % tuple(s.encode('ascii') for s in (NAME, VERSION, COPYRIGHT))
 )
 
+# session status after a time slice
+# still running, call run() again to go on
+RUNNING = 'running'
+# waiting for input or for time to pass
+WAITING = 'waiting'
+# at the direct mode prompt, ready for the next command
+ENDED = 'ended'
+# the program or command stopped with an error
+ERROR = 'error'
+
+
+class Template(object):
+    """Parts of a session that don't change, built once and shared read-only between sessions."""
+
+    def __init__(self, syntax=u'advanced', codepage=None, box_protect=True, font=None, **kwargs):
+        """Build the keyword tables, codepage and fonts; other session parameters are ignored."""
+        self.token_keyword = tk.TokenKeywordDict(syntax)
+        self.codepage = cp.Codepage(codepage, box_protect)
+        self.fonts = display.build_fonts(font, self.codepage)
+
 
 class Implementation(object):
     """Interpreter session, implementation class."""
@@ -62,9 +82,12 @@ class Implementation(object):
             peek_values=None, allow_code_poke=False, rebuild_offsets=True,
             max_memory=65534, reserved_memory=3429, video_memory=262144,
             serial_buffer_size=128, max_reclen=128, max_files=3,
-            extension=()
+            large_heap=False, extension=(), template=None
         ):
         """Initialise the interpreter session."""
+        # keyword tables, codepage and fonts; share them if built already
+        if template is None:
+            template = Template(syntax, codepage, box_protect, font)
         ######################################################################
         # session-level members
         ######################################################################
@@ -84,7 +107,7 @@ class Implementation(object):
         # set up variables and memory model state
         # initialise the data segment
         self.memory = memory.DataSegment(
-            max_memory, reserved_memory, max_reclen, max_files, double
+            max_memory, reserved_memory, max_reclen, max_files, double, large_heap
         )
         # values and variables
         self.strings = self.memory.strings
@@ -92,9 +115,8 @@ class Implementation(object):
         self.scalars = self.memory.scalars
         self.arrays = self.memory.arrays
         # prepare tokeniser
-        token_keyword = tk.TokenKeywordDict(syntax)
-        self.tokeniser = converter.Tokeniser(self.values, token_keyword)
-        self.lister = converter.Lister(self.values, token_keyword)
+        self.tokeniser = converter.Tokeniser(self.values, template.token_keyword)
+        self.lister = converter.Lister(self.values, template.token_keyword)
         # initialise the program
         bytecode = codestream.TokenisedStream(self.memory.code_start)
         self.program = program.Program(
@@ -107,7 +129,7 @@ class Implementation(object):
         # console
         ######################################################################
         # prepare codepage
-        self.codepage = cp.Codepage(codepage, box_protect)
+        self.codepage = template.codepage
         # set up input event handler
         # no interface yet; use dummy queues
         self.queues = eventcycle.EventQueues(ctrl_c_is_break, inputs=queue.Queue())
@@ -121,7 +143,7 @@ class Implementation(object):
         self.display = display.Display(
             self.queues, self.values, self.queues,
             self.memory, text_width, video_memory, video, monitor,
-            self.codepage, font
+            self.codepage, template.fonts
         )
         self.text_screen = self.display.text_screen
         self.graphics = self.display.graphics
@@ -183,6 +205,8 @@ class Implementation(object):
         self.queues.add_handler(self.keyboard)
         self.queues.add_handler(self.pen)
         self.queues.add_handler(self.stick)
+        # don't stay idle while the sound queue runs dry
+        self.queues.add_deadline(self.sound.time_to_last_tone)
         # set up BASIC event handlers
         self.basic_events = basicevents.BasicEvents(
             self.sound, self.clock, self.files, self.program, num_fn_keys, tandy_fn_keys
@@ -198,8 +222,8 @@ class Implementation(object):
         self.parser = parser.Parser(self.values, self.memory, syntax)
         # initialise the interpreter
         self.interpreter = interpreter.Interpreter(
-            self.queues, self.console, self.display.cursor, self.files, self.sound,
-            self.values, self.memory, self.program, self.parser, self.basic_events
+            self.queues, self.console, self.keyboard, self.display.cursor, self.files,
+            self.sound, self.values, self.memory, self.program, self.parser, self.basic_events
         )
         ######################################################################
         # callbacks
@@ -234,6 +258,8 @@ class Implementation(object):
 
     def attach_interface(self, interface=None):
         """Attach interface to interpreter session."""
+        # text interfaces ignore pixels, so only draw text to pixels when they are asked for
+        self.display.set_text_only(not interface or not getattr(interface, 'needs_pixels', True))
         if interface:
             self.queues.set(*interface.get_queues())
             # rebuild the screen
@@ -323,6 +349,54 @@ class Implementation(object):
                     line = self.console.read_line(is_input=False)
                     self._prompt = not self._store_line(line)
 
+    def run(self, max_statements=None, max_time=None, command=None):
+        """Run for at most a number of statements and seconds without blocking; return status."""
+        self.queues.nonblocking = True
+        self.interpreter.set_time_slice(max_statements, max_time)
+        status = ENDED
+        try:
+            with self._handle_exceptions():
+                try:
+                    if command is not None:
+                        # as with execute, don't show a prompt when the command is done
+                        self._store_line(command)
+                        self._prompt = False
+                    status = self._run_slice()
+                except error.BASICError:
+                    status = ERROR
+                    raise
+        finally:
+            self.queues.nonblocking = False
+            self.interpreter.set_time_slice()
+        return status
+
+    def _run_slice(self):
+        """Go on with the interactive session until the time slice is used up or we need input."""
+        if self.queues.deferred is not None:
+            if not self.queues.deferred():
+                return WAITING
+            self.queues.deferred = None
+        while True:
+            try:
+                if not self.interpreter.loop():
+                    return WAITING if self.queues.deferred is not None else RUNNING
+            except error.WaitForInput:
+                return WAITING
+            try:
+                if self._auto_mode:
+                    # don't show the line number until the line is there
+                    self.keyboard.require_input(line=True)
+                    self._auto_step()
+                else:
+                    self._show_prompt()
+                    # don't show the prompt again while we wait for the line
+                    self._prompt = False
+                    self.keyboard.require_input(line=True)
+                    line = self.console.read_line(is_input=False)
+                    self._prompt = not self._store_line(line)
+            except error.WaitForInput:
+                return ENDED
+
     def close(self):
         """Close the session."""
         # close files if we opened any
@@ -330,6 +404,8 @@ class Implementation(object):
         self.files.close_devices()
         # kill the iostreams threads so windows doesn't run out
         self.io_streams.close()
+        # hand over any remaining screen updates
+        self.queues.video.flush(force=True)
 
     def _show_prompt(self):
         """Show the Ok or EDIT prompt, unless suppressed."""
@@ -421,6 +497,9 @@ class Implementation(object):
             self._handle_error(e)
         except error.Exit:
             raise
+        finally:
+            # don't leave the last frame waiting for the next event check
+            self.queues.video.flush(force=True)
 
     def _handle_error(self, e):
         """Handle a BASIC error through error message."""
@@ -780,6 +859,11 @@ class Implementation(object):
                     # good old Redo!
                     self.console.write_line(b'?Redo from start')
                     readvar = var
+                    if self.queues.nonblocking:
+                        # start over, so that we wait for the next line before the statement starts
+                        self.interpreter.redo_statement()
+                        varlist = []
+                        break
                 else:
                     varlist = [r + [v] for r, v in zip(var, values)]
                     break
@@ -845,6 +929,10 @@ class Implementation(object):
                 except error.BASICError as e:
                     if e.err != error.IFC:
                         raise
+                    if self.queues.nonblocking:
+                        # start over, so that we wait for the next line before the statement starts
+                        self.interpreter.redo_statement()
+                        return
                 else:
                     break
             # seed entered on prompt is rounded to int
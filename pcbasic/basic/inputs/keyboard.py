@@ -108,6 +108,10 @@ class KeyboardBuffer(object):
         except IndexError:
             return b''
 
+    def keys(self):
+        """Keystrokes waiting in the buffer as eascii/codepage."""
+        return [_c for _c, _ in self._buffer[self._start:]]
+
     def _ring_index(self, index):
         """Get index for ring position."""
         diff = len(self._buffer) % self._ring_length - index
@@ -328,7 +332,25 @@ class Keyboard(object):
                     keyboard_only or (not self._input_closed and not self._stream_buffer)
                 )
             ):
-            self._queues.wait()
+            # in nonblocking mode, statements only start once the input they need is in
+            # but if they read more than we could tell beforehand, we have to block halfway
+            self._queues.idle()
+
+    def require_input(self, num_chars=1, line=False):
+        """In nonblocking mode, raise WaitForInput if the input we're going to read isn't there."""
+        if not self._queues.nonblocking or self._input_closed:
+            return
+        # pick up any keystrokes that have come in, but don't wait for more
+        self._queues.check_events()
+        keys = self._expansion_vessel + self.buf.keys() + list(self._stream_buffer)
+        if line:
+            # function keys may expand to a macro that ends the line
+            macros = [self._key_replace[FUNCTION_KEY[_c]] for _c in keys if _c in FUNCTION_KEY]
+            if b'\r' in keys or any(b'\r' in _macro for _macro in macros):
+                return
+        elif len(keys) >= num_chars:
+            return
+        raise error.WaitForInput()
 
     def _read_kybd_byte(self, expand=True):
         """Read one byte from keyboard buffer, expanding macros if required."""
@@ -357,6 +379,7 @@ class Keyboard(object):
     def read_byte(self):
         """Read one byte from keyboard or stream; nonblocking."""
         # wait a tick to reduce load in loops
+        # we don't block here: the program may well be doing something useful between polls
         self._queues.wait()
         inkey = self._read_kybd_byte()
         if not inkey and self._stream_buffer:
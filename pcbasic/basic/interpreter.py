@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import struct
+import time
 
 from .base import error
 from .base import tokens as tk
@@ -19,11 +20,12 @@ class Interpreter(object):
     """BASIC interpreter."""
 
     def __init__(
-            self, queues, console, cursor, files, sound,
+            self, queues, console, keyboard, cursor, files, sound,
             values, memory, program, parser, basic_events
         ):
         """Initialise interpreter."""
         self._queues = queues
+        self._keyboard = keyboard
         self._basic_events = basic_events
         self._values = values
         self._memory = memory
@@ -56,6 +58,8 @@ class Interpreter(object):
         self.set_parse_mode(False)
         # additional operations on program step (debugging)
         self.step = lambda token: None
+        # limits of the current time slice
+        self.set_time_slice()
 
     def __getstate__(self):
         """Pickle."""
@@ -87,9 +91,28 @@ class Interpreter(object):
         # pointer to error trap
         self.on_error = None
 
+    def set_time_slice(self, max_statements=None, max_time=None):
+        """Limit the number of statements and the seconds to run before parse() returns."""
+        self._sliced = max_statements is not None or max_time is not None
+        self._statements_left = max_statements
+        self._slice_end = None if max_time is None else time.time() + max_time
+
+    def _slice_used(self):
+        """Check whether we need to stop at this statement to keep to the time slice."""
+        if self._queues.deferred is not None:
+            # we're waiting for something; go on in the next slice
+            return True
+        if self._statements_left is not None:
+            if self._statements_left <= 0:
+                return True
+            self._statements_left -= 1
+        return self._slice_end is not None and time.time() >= self._slice_end
+
     def parse(self):
-        """Parse from the current pointer in current codestream."""
+        """Parse from the current pointer in current codestream; False if stopped at a time slice."""
         while True:
+            if self._sliced and self._slice_used():
+                return False
             # update what basic events need to be handled
             self._queues.set_basic_event_handlers(self._basic_events.enabled)
             # check input and BASIC events. may raise Break, Reset or Exit
@@ -112,25 +135,116 @@ class Interpreter(object):
                             raise error.BASICError(error.NO_RESUME, ins.tell()-len(token)-2)
                         # stream has ended
                         self.set_pointer(False)
-                        return
+                        return True
+                elif c not in (b':', tk.THEN, tk.ELSE, tk.GOTO):
+                    # new statement or branch of an IF statement allowed, nothing else
+                    raise error.BASICError(error.STX)
+                # in nonblocking mode, don't start on the statement until its input is there
+                self._require_input(ins)
+                if c in tk.END_LINE:
                     if self.tron:
                         linenum = struct.unpack_from('<H', token, 2)
                         self._console.write(b'[%i]' % linenum)
                     self.step(token)
-                elif c not in (b':', tk.THEN, tk.ELSE, tk.GOTO):
-                    # new statement or branch of an IF statement allowed, nothing else
-                    raise error.BASICError(error.STX)
+                    if self._is_idle_loop(ins, token):
+                        # nothing will change until a key is pressed or something is due
+                        self._queues.wait_for_input()
                 self.parser.parse_statement(ins)
             except error.BASICError as e:
                 self.trap_error(e)
+            except error.WaitForInput:
+                # nothing has been done yet; start on the statement when the input is there
+                ins.seek(self.current_statement)
+                raise
+
+    def _require_input(self, ins):
+        """In nonblocking mode, raise WaitForInput if the statement's keyboard input isn't there."""
+        if not self._queues.nonblocking:
+            return
+        start = ins.tell()
+        num_chars, line = 0, False
+        ins.skip_blank()
+        keyword = ins.read_keyword_token()
+        if keyword == tk.LINE:
+            keyword = ins.skip_blank_read_if((tk.INPUT,))
+        if keyword == tk.INPUT:
+            # INPUT and LINE INPUT read a line from the console, unless they read from a file
+            line = ins.skip_blank() != b'#'
+        elif keyword == tk.RANDOMIZE:
+            # RANDOMIZE without a seed asks for one
+            line = ins.skip_blank() in tk.END_EXPRESSION
+        elif keyword != tk.DATA:
+            ins.seek(start)
+            while ins.skip_to_read((tk.INPUT, tk.THEN, tk.ELSE) + tk.END_STATEMENT) == tk.INPUT:
+                if ins.peek() == b'$':
+                    ins.read(1)
+                    num_chars += self._count_input_chars(ins)
+        ins.seek(start)
+        if line or num_chars:
+            self._keyboard.require_input(num_chars, line=line)
+
+    def _count_input_chars(self, ins):
+        """Number of characters INPUT$ reads from the keyboard; at least one if we can't tell."""
+        ins.skip_blank_read_if((b'(',))
+        ins.skip_blank()
+        token = ins.read_number_token()
+        num = None
+        if token and ins.skip_blank() in (b')', b','):
+            num = int(self._values.from_token(token).to_value())
+        # find the end of the arguments, or a file number
+        depth = 0
+        while True:
+            c = ins.skip_to_read((b'(', b')', b',', tk.THEN, tk.ELSE) + tk.END_STATEMENT)
+            if c == b'(':
+                depth += 1
+            elif c == b')' and depth:
+                depth -= 1
+            elif c == b',' and not depth:
+                # INPUT$(n, #f) reads from a file
+                return 0
+            else:
+                break
+        if num is None:
+            return 1
+        # out-of-range lengths raise an error without reading anything
+        return num if 1 <= num <= 255 else 0
+
+    def _is_idle_loop(self, ins, token):
+        """Check if the line is IF INKEY$="" GOTO to itself, which only polls for a key."""
+        if ins.skip_blank() != tk.IF:
+            return False
+        start = ins.tell()
+        try:
+            if not (
+                    ins.skip_blank_read_if((tk.IF,))
+                    and ins.skip_blank_read_if((tk.INKEY,))
+                    and ins.skip_blank_read_if((tk.O_EQ,))
+                    and ins.skip_blank_read_if((b'""',), 2)
+                ):
+                return False
+            # IF ... GOTO n, IF ... THEN n or IF ... THEN GOTO n
+            then = ins.skip_blank_read_if((tk.THEN,))
+            if not ins.skip_blank_read_if((tk.GOTO,)) and not then:
+                return False
+            if not ins.skip_blank_read_if((tk.T_UINT,)):
+                return False
+            # the line number is the last part of the line token
+            return ins.read(2) == token[2:4] and ins.skip_blank() in tk.END_LINE
+        finally:
+            ins.seek(start)
+
+    def redo_statement(self):
+        """Run the current statement again from its start."""
+        self.get_codestream().seek(self.current_statement)
 
     def loop(self):
-        """Run commands until control returns to user."""
+        """Run commands until control returns to user; False if stopped at a time slice."""
         if not self.parse_mode:
-            return
+            return True
         try:
             # parse until break or end
-            self.parse()
+            if not self.parse():
+                return False
         except error.Break as e:
             self._sound.stop_all_sound()
             self._handle_break(e)
@@ -138,6 +252,7 @@ class Interpreter(object):
         self.set_pointer(False, 0)
         # return control to user
         self.set_parse_mode(False)
+        return True
 
     def set_parse_mode(self, on):
         """Enter or exit parse mode."""
@@ -261,8 +261,11 @@ class MachinePorts(object):
             xorer = values.to_int(xorer)
         error.range_check(0, 255, xorer)
         list(args)
-        while (self.inp(addr) ^ xorer) & ander == 0:
-            self._queues.wait()
+        self._queues.wait_until(
+            lambda: (self.inp(addr) ^ xorer) & ander != 0,
+            # the keyboard port only changes on input; check other ports every tick
+            None if addr == 0x60 else lambda: 0
+        )
 
 
 ###############################################################################
@@ -113,7 +113,7 @@ class Arrays(object):
 
     def _buffer_size(self, name, dimensions):
         """Calculate size of array buffer in bytes."""
-        return self.flat_length(dimensions) * values.size_bytes(name)
+        return self.flat_length(dimensions) * self._values.size_bytes(name)
 
     def memory_size(self, name, dimensions):
         """Calculate size of array record and buffer in bytes."""
@@ -193,7 +193,7 @@ class Arrays(object):
         """Return a memoryview to an array element."""
         dimensions, lst = self.check_dim(name, index)
         bigindex = self.index(index, dimensions)
-        bytesize = values.size_bytes(name)
+        bytesize = self._values.size_bytes(name)
         return memoryview(lst)[bigindex*bytesize:(bigindex+1)*bytesize]
 
     def get(self, name, index):
@@ -205,6 +205,8 @@ class Arrays(object):
     def set(self, name, index, value):
         """Assign a value to an array element."""
         if isinstance(value, values.String):
+            # temporaries must be in string space before they are made permanent
+            value.store()
             self._memory.strings.fix_temporaries()
         # copy value into array
         self.view_buffer(name, index)[:] = values.to_type(name[-1:], value).to_bytes()
@@ -217,7 +219,7 @@ class Arrays(object):
         # arrays are kept at the end of the var list
         return (
             self._memory.var_current() + array_ptr +
-            values.size_bytes(name) * self.index(indices, dimensions)
+            self._values.size_bytes(name) * self.index(indices, dimensions)
         )
 
     def dereference(self, address):
@@ -233,7 +235,7 @@ class Arrays(object):
             return None
         lst = self._buffers[name]
         offset = address - found_addr
-        return self._values.from_bytes(lst[offset : offset+values.size_bytes(name)])
+        return self._values.from_bytes(lst[offset : offset+self._values.size_bytes(name)])
 
     def get_memory(self, address):
         """Retrieve data from data memory: array space """
@@ -261,9 +263,10 @@ class Arrays(object):
                 return get_name_in_memory(the_arr, offset)
             else:
                 offset -= max(3, len(the_arr))+1
+                # in large-heap mode, only the low 16 bits of the record length are shown
                 data_rep = struct.pack(
                     '<HB',
-                    self._buffer_size(the_arr, dimensions) + 1 + 2*len(dimensions),
+                    (self._buffer_size(the_arr, dimensions) + 1 + 2*len(dimensions)) & 0xffff,
                     len(dimensions)
                 )
                 for d in dimensions:
@@ -272,11 +275,12 @@ class Arrays(object):
 
     def get_strings(self):
         """Return a list of views of string array elements."""
+        size = self._values.size_bytes(values.STR)
         return [
-            memoryview(buf)[i:i+3]
+            memoryview(buf)[i:i+size]
             for name, buf in iteritems(self._buffers)
             if name[-1:] == values.STR
-            for i in range(0, len(buf), 3)
+            for i in range(0, len(buf), size)
         ]
 
 
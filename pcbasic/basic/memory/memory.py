@@ -41,6 +41,9 @@ from . import arrays
 # 65022     512         BASIC stack (size determined by CLEAR)
 # NOTE - the last two sections may be the other way around (2 bytes at end)
 # 65534                 total size (determined by CLEAR)
+#
+# In large-heap mode, the total size can be up to 4 GiB and the string space and stack
+# sit at the top of that. String pointers then hold a 4-byte address.
 
 
 ############################################################################
@@ -73,11 +76,11 @@ class Field(object):
             raise error.BASICError(error.FIELD_OVERFLOW)
         # create a string pointer
         str_addr = self._address + offset
-        str_sequence = struct.pack('<BH', length, str_addr)
+        str_pointer = self._memory.values.new_string().from_pointer(length, str_addr)
         # assign the string ptr to the variable name
         # desired side effect: if we re-assign this string variable through LET,
         # it's no longer connected to the FIELD.
-        self._memory.set_variable(name, indices, self._memory.values.from_bytes(str_sequence))
+        self._memory.set_variable(name, indices, str_pointer)
 
 
 class DataSegment(object):
@@ -90,7 +93,9 @@ class DataSegment(object):
     # protection flag
     protection_flag_addr = 1450
 
-    def __init__(self, total_memory, reserved_memory, max_reclen, max_files, double):
+    def __init__(
+            self, total_memory, reserved_memory, max_reclen, max_files, double, large_heap=False
+        ):
         """Initialise memory."""
         # BASIC stack (determined by CLEAR)
         # Initially, the stack space should be set to 512 bytes,
@@ -113,8 +118,10 @@ class DataSegment(object):
         self.deftype = [values.SNG]*26
         # string space
         self.strings = values.StringSpace(self)
+        # large-heap mode: data segment may exceed 64 KiB, addresses are 32-bit
+        self.large_heap = large_heap
         # prepare string and number handler
-        self.values = values.Values(self.strings, double)
+        self.values = values.Values(self.strings, double, large_heap)
         # scalar space
         self.scalars = scalars.Scalars(self, self.values)
         # array space
@@ -221,10 +228,11 @@ class DataSegment(object):
                 for name, value in iteritems(common_scalars)
                 if name[-1:] == values.STR
             }
+            str_size = self.values.size_bytes(values.STR)
             array_strings = {
-                (name, _i): struct.unpack('<BH', value[1][_i:_i+3])
+                (name, _i): self.values.create(value[1][_i:_i+str_size]).to_pointer()
                 for name, value in iteritems(common_arrays)
-                for _i in range(0, len(value[1]), 3)
+                for _i in range(0, len(value[1]), str_size)
                 if name[-1:] == values.STR
             }
             # sort by pointer address - items will be (name, (length, address))
@@ -242,7 +250,9 @@ class DataSegment(object):
                 # but address is ignored for zero length
                 length, address = self.strings.copy_to(string_store, *pointer)
                 # modify the stored bytearray
-                common_arrays[name][1][offset:offset+3] = struct.pack('<BH', length, address)
+                common_arrays[name][1][offset:offset+str_size] = (
+                    self.values.new_string().from_pointer(length, address).to_bytes()
+                )
             yield
             # check if there is sufficient memory
             scalar_size = sum(self.scalars.memory_size(name) for name in common_scalars)
@@ -277,6 +287,7 @@ class DataSegment(object):
         if not self._allow_collect:
             return
         # find all strings that are actually referenced
+        # this stores any temporary slices in the space reserved for them
         stack_strings = [value.view() for stack in self._stack for value in stack if isinstance(value, values.String)]
         temp_strings = [value.view() for value in self.temp_values if isinstance(value, values.String)]
         string_ptrs = self.scalars.get_strings() + self.arrays.get_strings() + stack_strings + temp_strings
@@ -394,11 +405,12 @@ class DataSegment(object):
         if addr < 4:
             # sentinel value, used by some programs to identify GW-BASIC
             return (0, 0, 0x10, 0x82)[addr]
+        # in large-heap mode, these pointers only hold the low 16 bits
         # DS:2c, DS:2d  end of memory available to BASIC
         elif addr == 0x2C:
             return self.total_memory % 256
         elif addr == 0x2D:
-            return self.total_memory // 256
+            return (self.total_memory // 256) % 256
         # DS:30, DS:31: pointer to start of program, excluding initial \0
         elif addr == 0x30:
             return (self.code_start+1) % 256
@@ -408,17 +420,17 @@ class DataSegment(object):
         elif addr == 0x358:
             return self.var_start() % 256
         elif addr == 0x359:
-            return self.var_start() // 256
+            return (self.var_start() // 256) % 256
         # DS:35A, DS:35B: start of array space
         elif addr == 0x35A:
             return self.var_current() % 256
         elif addr == 0x35B:
-            return self.var_current() // 256
+            return (self.var_current() // 256) % 256
         # DS:35C, DS:35D: end of array space
         elif addr == 0x35C:
             return (self.var_current() + self.arrays.current) % 256
         elif addr == 0x35D:
-            return (self.var_current() + self.arrays.current) // 256
+            return ((self.var_current() + self.arrays.current) // 256) % 256
         elif addr == self.protection_flag_addr:
             return self.program.protected * 254
         return -1
@@ -522,6 +534,9 @@ class DataSegment(object):
                 # pre-allocate array elements, but not scalars which instead throw IFC if undefined
                 self.arrays.check_dim(name, indices)
             var_ptr = self.varptr(name, indices)
+        if var_ptr > 0xffff:
+            # large-heap mode: 32-bit virtual address does not fit an integer
+            return self.values.new_double().from_int(var_ptr)
         return self.values.new_integer().from_int(var_ptr, unsigned=True)
 
     def varptr_str_(self, args):
@@ -535,6 +550,8 @@ class DataSegment(object):
             # pre-allocate array elements, but not scalars which instead throw IFC if undefined
             self.arrays.check_dim(name, indices)
         var_ptr = self.varptr(name, indices)
+        # large-heap mode: addresses beyond 64 KiB can't be represented in VARPTR$
+        error.throw_if(var_ptr > 0xffff)
         vps = struct.pack('<BH', values.size_bytes(self.complete_name(name)), var_ptr)
         return self.values.new_string().from_str(vps)
 
@@ -50,19 +50,19 @@ class Scalars(object):
         # first two bytes: chars of name or 0 if name is one byte long
         return max(3, len(name)) + 1
 
-    @staticmethod
-    def _buffer_size(name):
+    def _buffer_size(self, name):
         """Calculate size of scalar buffer in bytes."""
-        return values.size_bytes(name)
+        return self._values.size_bytes(name)
 
-    @staticmethod
-    def memory_size(name):
+    def memory_size(self, name):
         """Calculate size of scalar record and buffer in bytes."""
-        return Scalars._record_size(name) + Scalars._buffer_size(name)
+        return self._record_size(name) + self._buffer_size(name)
 
     def set(self, name, value=None):
         """Assign a value to a variable."""
         if isinstance(value, values.String):
+            # temporaries must be in string space before they are made permanent
+            value.store()
             self._memory.strings.fix_temporaries()
         type_char = name[-1:]
         if value is not None:
@@ -135,7 +135,7 @@ class Scalars(object):
             return -1
         if address >= var_addr:
             offset = address - var_addr
-            if offset >= values.size_bytes(the_var): # pragma: no cover
+            if offset >= self._buffer_size(the_var): # pragma: no cover
                 return -1
             var_rep = self._vars[the_var]
             return var_rep[offset]
@@ -382,15 +382,14 @@ class Program(object):
             converter.protect(self.bytecode, g)
         else:
             # ascii mode
-            while True:
-                current_line, output, _ = self.lister.detokenise_line(self.bytecode)
-                if current_line == -1 or (current_line > self.max_list_line):
-                    break
-                g.write_line(bytes(output))
+            for _, line in self.lister.detokenise_program(
+                    self.bytecode.getvalue(), self.max_list_line
+                ):
+                g.write_line(line)
         self.bytecode.seek(current)
 
     def list_lines(self, from_line, to_line):
-        """List line range."""
+        """List line range; returns an iterator over the text of the lines."""
         from_line, to_line = self.explicit_lines(from_line, to_line)
         if self.protected:
             # don't list protected files
@@ -408,12 +407,7 @@ class Program(object):
         listable = sorted([self.line_numbers[num] for num in numbers])
         if numbers:
             self.last_stored = max(numbers)
-        lines = []
-        for pos in listable:
-            self.bytecode.seek(pos + 1)
-            _, line, _ = self.lister.detokenise_line(self.bytecode)
-            lines.append(bytes(line))
-        return lines
+        return self.lister.detokenise_lines(self.bytecode.getvalue(), listable)
 
     def get_memory(self, offset):
         """Retrieve data from program code."""
@@ -209,8 +209,10 @@ class Sound(object):
     def _wait(self, wait_length):
         """Wait until queue is shorter than or equal to given length."""
         # top of queue is the currently playing tone or gap
-        while max(len(queue) for queue in self._voice_queue) > wait_length:
-            self._queues.wait()
+        self._queues.wait_until(
+            lambda: max(len(queue) for queue in self._voice_queue) <= wait_length,
+            self.time_to_next_expiry
+        )
 
     def stop_all_sound(self):
         """Terminate all sounds immediately."""
@@ -244,6 +246,14 @@ class Sound(object):
         """Return max number of tones waiting in queues."""
         return max(self._voice_queue[voice].tones_waiting() for voice in range(3))
 
+    def time_to_next_expiry(self):
+        """Seconds until the next tone or gap in any queue ends; None if none will."""
+        return _earliest(_q.time_to_expiry(0) for _q in self._voice_queue)
+
+    def time_to_last_tone(self):
+        """Seconds until the last tone in any queue starts playing; None if all have started."""
+        return _earliest(_q.time_to_expiry(-2) for _q in self._voice_queue)
+
     def emit_synch(self):
         """Synchronise the three tone voices."""
         # on Tandy/PCjr, align voices (excluding noise) at the end of each PLAY statement
@@ -411,6 +421,12 @@ class Sound(object):
             self._wait_background()
 
 
+def _earliest(times):
+    """Shortest of a number of times in seconds, ignoring None; None if all are None."""
+    times = [_t for _t in times if _t is not None]
+    return min(times) if times else None
+
+
 class PlayState(object):
     """State variables of the PLAY command."""
 
@@ -509,6 +525,17 @@ class TimedQueue(object):
         except IndexError:
             return datetime.datetime.now()
 
+    def time_to_expiry(self, index):
+        """Seconds until the item at the given index expires; None if not there or looping."""
+        self._check_expired()
+        try:
+            expiry = self._deque[index][1]
+        except IndexError:
+            return None
+        if expiry is None:
+            return None
+        return max(0, (expiry - datetime.datetime.now()).total_seconds())
+
     def items(self):
         """Iterate over each item and its duration."""
         self._check_expired()
@@ -21,47 +21,119 @@ class String(numbers.Value):
 
     sigil = b'$'
     size = 3
+    # 1-byte length, 2-byte address
+    _pointer = struct.Struct('<BH')
 
     def __init__(self, buffer, values):
         """Initialise the pointer."""
         numbers.Value.__init__(self, buffer, values)
         self._stringspace = values.stringspace
+        # temporary string with space reserved but not yet stored: view on its contents
+        self._slice = None
+
+    def __getstate__(self):
+        """Pickle."""
+        # can't pickle memoryview
+        pickle_dict = dict(numbers.Value.__getstate__(self))
+        if self._slice is not None:
+            pickle_dict['_slice'] = self._slice.tobytes()
+        return pickle_dict
+
+    def __setstate__(self, pickle_dict):
+        """Unpickle."""
+        numbers.Value.__setstate__(self, pickle_dict)
+        if self._slice is not None:
+            self._slice = memoryview(self._slice)
 
     def length(self):
         """String length."""
+        if self._slice is not None:
+            return len(self._slice)
         return bytearray(self._buffer)[0]
 
     def address(self):
         """Pointer address."""
-        return struct.unpack_from('<H', self._buffer, 1)[0]
+        self.store()
+        return self._pointer.unpack(self._buffer)[1]
 
     def dereference(self):
         """String value pointed to."""
-        length, address = struct.unpack('<BH', self._buffer)
+        if self._slice is not None:
+            return self._slice.tobytes()
+        length, address = self._pointer.unpack(self._buffer)
         return self._stringspace.view(length, address).tobytes()
 
     def from_str(self, python_str):
         """Set to value of python str."""
         assert isinstance(python_str, bytes), type(python_str)
-        self._buffer[:] = struct.pack('<BH', *self._stringspace.store(python_str))
+        self._slice = None
+        self._buffer[:] = self._pointer.pack(*self._stringspace.store(python_str))
         return self
 
     def from_pointer(self, length, address):
         """Set buffer to string pointer."""
-        self._buffer[:] = struct.pack('<BH', length, address)
+        self._slice = None
+        self._buffer[:] = self._pointer.pack(length, address)
         return self
 
     def to_pointer(self):
         """Get length and address."""
-        return struct.unpack('<BH', self._buffer)
+        self.store()
+        return self._pointer.unpack(self._buffer)
+
+    def from_slice(self, view):
+        """Set to a temporary that refers to string contents; reserve its space but don't store it."""
+        self._buffer[:] = self._pointer.pack(*self._stringspace.reserve(len(view)))
+        self._slice = view
+        return self
+
+    def view_slice(self):
+        """Get a view of the string contents; this does not store a temporary."""
+        if self._slice is not None:
+            return self._slice
+        return self._stringspace.view(*self._pointer.unpack(self._buffer))
+
+    def store(self):
+        """Store a temporary slice in the string space reserved for it."""
+        if self._slice is not None:
+            length, address = self._pointer.unpack(self._buffer)
+            self._stringspace.store(self._slice.tobytes(), address, reserved=True)
+            self._slice = None
+        return self
 
     from_value = from_str
     to_value = dereference
     to_str = dereference
 
+    def clone(self):
+        """Create a copy."""
+        # the copy shares the pointer, and so the reserved space, of a temporary slice
+        return self.new().copy_from(self)
+
+    def copy_from(self, other):
+        """Copy another value into this one."""
+        numbers.Value.copy_from(self, other)
+        self._slice = other._slice
+        return self
+
+    def to_bytes(self):
+        """Get a copy of the byte representation."""
+        self.store()
+        return numbers.Value.to_bytes(self)
+
+    def from_bytes(self, in_bytes):
+        """Copy a new byte representation into the value."""
+        self._slice = None
+        return numbers.Value.from_bytes(self, in_bytes)
+
+    def view(self):
+        """Get a reference to the storage space."""
+        self.store()
+        return numbers.Value.view(self)
+
     def add(self, right):
         """Concatenate strings. In-place for the pointer."""
-        return self.new().from_str(self.dereference() + right.dereference())
+        return self.new().from_slice(memoryview(self.dereference() + right.dereference()))
 
     def eq(self, right):
         """This string equals the right-hand side."""
@@ -152,6 +224,14 @@ class String(numbers.Value):
         return self.new().from_str(b' ' * num)
 
 
+class LongString(String):
+    """String pointer with a 32-bit address, used in large-heap mode."""
+
+    size = 5
+    # 1-byte length, 4-byte address
+    _pointer = struct.Struct('<BL')
+
+
 class StringSpace(object):
     """Table of strings accessible by their length and address."""
 
@@ -159,6 +239,8 @@ class StringSpace(object):
         """Initialise empty string space."""
         self._memory = memory
         self._strings = {}
+        # length of strings with space reserved, but not stored yet
+        self._reserved = {}
         self._temp = None
         self.clear()
 
@@ -172,6 +254,7 @@ class StringSpace(object):
     def clear(self):
         """Empty string space."""
         self._strings.clear()
+        self._reserved.clear()
         # strings are placed at the top of string memory, just below the stack
         self.current = self._memory.stack_start()
 
@@ -179,6 +262,7 @@ class StringSpace(object):
         """Rebuild from stored copy."""
         self.clear()
         self._strings.update(stringspace._strings)
+        self._reserved.update(stringspace._reserved)
         self.current = stringspace.current
 
     def copy_to(self, string_space, length, address):
@@ -217,33 +301,47 @@ class StringSpace(object):
             length, address = self.store(self.view(length, address).tobytes())
         return length, address
 
-    def store(self, in_str, address=None, check_free=True):
-        """Store a new string and return the string pointer."""
-        length = len(in_str)
+    def reserve(self, length, check_free=True):
+        """Reserve space for a new string and return the string pointer."""
         # don't store overlong strings
         if length > 255:
             raise error.BASICError(error.STRING_TOO_LONG)
-        # don't store if address is provided (code or FIELD strings)
+        # reserve string space; collect garbage if necessary
+        if check_free:
+            self._memory.check_free(length, error.OUT_OF_STRING_SPACE)
+        # find new string address
+        self.current -= length
+        address = self.current + 1
+        if length > 0:
+            self._reserved[address] = length
+        return length, address
+
+    def store(self, in_str, address=None, check_free=True, reserved=False):
+        """Store a new string and return the string pointer."""
+        length = len(in_str)
         if address is None:
-            # reserve string space; collect garbage if necessary
-            if check_free:
-                self._memory.check_free(length, error.OUT_OF_STRING_SPACE)
-            # find new string address
-            self.current -= length
-            address = self.current + 1
-            # don't store empty strings
-            if length > 0:
-                # copy and convert to bytearray
-                self._strings[address] = bytearray(in_str)
+            length, address = self.reserve(length, check_free)
+        elif not reserved:
+            # don't store if address is provided (code or FIELD strings)
+            if length > 255:
+                raise error.BASICError(error.STRING_TOO_LONG)
+            return length, address
+        # don't store empty strings
+        if length > 0:
+            # copy and convert to bytearray
+            self._strings[address] = bytearray(in_str)
+            self._reserved.pop(address, None)
         return length, address
 
     def _delete_last(self):
         """Delete the string provided if it is at the top of string space."""
         last_address = self.current + 1
         try:
-            length = len(self._strings[last_address])
+            if last_address in self._reserved:
+                length = self._reserved.pop(last_address)
+            else:
+                length = len(self._strings.pop(last_address))
             self.current += length
-            del self._strings[last_address]
         except KeyError: # pragma: no cover
             # maybe happens if we're called before an out-of-memory exception is handled
             # and the string wasn't allocated
@@ -258,7 +356,7 @@ class StringSpace(object):
         last_permanent = self._memory.stack_start()
         last_perm_view = None
         for view in string_ptrs:
-            length, addr = struct.unpack('<BH', view.tobytes())
+            length, addr = self._memory.values.create(view).to_pointer()
             # exclude empty elements of string arrays (len==0 and addr==0)
             # exclude strings is not located in memory (FIELD or code strings)
             if addr >= self._memory.var_start():
@@ -277,12 +375,12 @@ class StringSpace(object):
         for view, _, string in string_list:
             # re-allocate string space
             # update the original pointers supplied (these are memoryviews)
-            view[:] = struct.pack('<BH', *self.store(string, check_free=False))
+            self._memory.values.create(view).from_pointer(*self.store(string, check_free=False))
         # readdress  start of temporary strings
         if last_perm_view is None:
             self._temp = None
         elif self._temp is not None and self._temp != self._memory.stack_start():
-            self._temp = -1 + struct.unpack_from('<H', last_perm_view.tobytes(), 1)[0]
+            self._temp = -1 + self._memory.values.create(last_perm_view).address()
 
     def get_memory(self, address):
         """Retrieve data from data memory: string space """
@@ -23,6 +23,7 @@ from . import strings
 # Single (!) - stored as 4-byte Microsoft Binary Format
 # Double (#) - stored as 8-byte Microsoft Binary Format
 # String ($) - stored as 1-byte length plus 2-byte pointer to string space
+#              (4-byte pointer in large-heap mode)
 INT = numbers.Integer.sigil
 SNG = numbers.Single.sigil
 DBL = numbers.Double.sigil
@@ -37,6 +38,7 @@ SIZE_TO_CLASS = {
     2: numbers.Integer,
     3: strings.String,
     4: numbers.Single,
+    5: strings.LongString,
     8: numbers.Double
 }
 
@@ -197,12 +199,16 @@ class FloatErrorHandler(object):
 class Values(object):
     """Handles BASIC strings and numbers."""
 
-    def __init__(self, string_space, double_math):
+    def __init__(self, string_space, double_math, large_heap=False):
         """Setup values."""
         self.stringspace = string_space
         # double-precision EXP, SIN, COS, TAN, ATN, LOG
         self.double_math = double_math
         self.error_handler = None
+        # string pointers need 32-bit addresses in large-heap mode
+        self._type_to_class = dict(TYPE_TO_CLASS)
+        if large_heap:
+            self._type_to_class[STR] = strings.LongString
 
     def set_handler(self, handler):
         """Initialise the error message console."""
@@ -215,11 +221,15 @@ class Values(object):
 
     def new(self, sigil):
         """Return newly allocated value of the given type with zeroed buffer."""
-        return TYPE_TO_CLASS[sigil](None, self)
+        return self._type_to_class[sigil](None, self)
 
     def new_string(self):
         """Return newly allocated null string."""
-        return strings.String(None, self)
+        return self._type_to_class[STR](None, self)
+
+    def size_bytes(self, name):
+        """Return the storage size of a value type, by variable name or type char."""
+        return self._type_to_class[name[-1:]].size
 
     def new_integer(self):
         """Return newly allocated zero integer."""
@@ -239,11 +249,11 @@ class Values(object):
     @float_safe
     def from_value(self, python_val, typechar):
         """Convert Python value to BASIC value."""
-        return TYPE_TO_CLASS[typechar](None, self).from_value(python_val)
+        return self._type_to_class[typechar](None, self).from_value(python_val)
 
     def from_str_at(self, python_str, address):
         """Convert str to String at given address."""
-        return strings.String(None, self).from_pointer(
+        return self.new_string().from_pointer(
             *self.stringspace.store(python_str, address))
 
     def from_bool(self, boo):
@@ -628,13 +638,12 @@ class StringFunctions:
         num = next(args)
         s, num = pass_string(s), to_integer(num)
         list(args)
+        self._temp_values.remove(s)
         stop = num.to_integer().to_int()
         if stop == 0:
             return s.new()
         error.range_check(0, 255, stop)
-        result = s.new().from_str(s.to_str()[:stop])
-        self._temp_values.remove(s)
-        return result
+        return s.new().from_slice(s.view_slice()[:stop])
 
     def right_(self, args):
         """RIGHT$: get substring of num characters at the end of string."""
@@ -643,13 +652,12 @@ class StringFunctions:
         num = next(args)
         s, num = pass_string(s), to_integer(num)
         list(args)
+        self._temp_values.remove(s)
         stop = num.to_integer().to_int()
         if stop == 0:
             return s.new()
         error.range_check(0, 255, stop)
-        result = s.new().from_str(s.to_str()[-stop:])
-        self._temp_values.remove(s)
-        return result
+        return s.new().from_slice(s.view_slice()[-stop:])
 
     def mid_(self, args):
         """MID$: get substring."""
@@ -661,6 +669,7 @@ class StringFunctions:
         if num is not None:
             num = to_integer(num)
         list(args)
+        self._temp_values.remove(s)
         length = s.length()
         start = start.to_integer().to_int()
         if num is None:
@@ -673,9 +682,7 @@ class StringFunctions:
             return s.new()
         # BASIC's indexing starts at 1, Python's at 0
         start -= 1
-        result = s.new().from_str(s.to_str()[start:start+num])
-        self._temp_values.remove(s)
-        return result
+        return s.new().from_slice(s.view_slice()[start:start+num])
 
     def instr_(self, args):
         """INSTR: find substring in string."""
@@ -720,10 +727,7 @@ class StringFunctions:
             ascval = asc_value_or_char.to_integer().to_int()
             error.range_check(0, 255, ascval)
             char = int2byte(ascval)
-        self._temp_values.add(char)
-        result = strings.String(None, asc_value_or_char._values).from_str(char * num)
-        self._temp_values.remove(char)
-        return result
+        return asc_value_or_char._values.new_string().from_slice(memoryview(char * num))
 
 
 ##############################################################################
@@ -0,0 +1,126 @@
+"""
+PC-BASIC - batch.py
+Run independent BASIC jobs in a pool of worker processes
+
+(c) 2013--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import io
+import json
+import time
+import logging
+import multiprocessing
+
+from .basic.base import error
+from .basic import Session
+from .basic.api import WAITING, ENDED, ERROR
+from .compat import stdio
+
+
+# seconds a job runs before we check its timeout
+SLICE_TIME = 0.05
+# seconds to wait before looking again when a job waits for time to pass
+WAIT_TIME = 0.01
+
+# job status if the time ran out
+TIMEOUT = 'timeout'
+# job status if the job could not be run
+FAILED = 'failed'
+# job status if the program wanted more keyboard input than the input file holds
+INPUT = 'input'
+
+# session template held by the worker process
+_template = None
+# default timeout and memory limit for the worker's jobs
+_timeout = 0
+_max_memory = None
+
+
+def run_batch(job_file, workers, timeout, session_params):
+    """Run the jobs in a job file and write the results to standard output as JSON lines."""
+    with io.open(job_file, 'r', encoding='utf-8') as f:
+        jobs = [(_number, _line) for _number, _line in enumerate(f, 1) if _line.strip()]
+    # don't hand the workers our standard i/o
+    session_params = dict(session_params, input_streams=None, output_streams=None)
+    pool = multiprocessing.Pool(workers or None, _init_worker, (session_params, timeout))
+    try:
+        for result in pool.imap(_run_job, jobs):
+            stdio.stdout.write(u'%s\n' % (json.dumps(result),))
+            stdio.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _init_worker(session_params, timeout):
+    """Build the session template in the worker process."""
+    global _template, _timeout, _max_memory
+    _template = Session.template(**session_params)
+    _timeout, _max_memory = timeout, session_params['max_memory']
+
+
+def _run_job(numbered_line):
+    """Run a job in a fresh session and return a result record."""
+    number, line = numbered_line
+    result = {u'job': number}
+    start = time.time()
+    try:
+        job = _parse_job(line)
+        result[u'job'] = job.get(u'id', number)
+        result.update(_run_program(job))
+    except Exception as e:
+        logging.error(u'Job %s failed: %s', result[u'job'], e)
+        result.update({u'status': FAILED, u'message': u'%s' % (e,)})
+    result[u'time'] = round(time.time() - start, 3)
+    return result
+
+
+def _parse_job(line):
+    """Parse a job line: a program name, or a JSON object with at least the key `run`."""
+    line = line.strip()
+    if not line.startswith(u'{'):
+        return {u'run': line}
+    job = json.loads(line)
+    if not isinstance(job, dict) or not job.get(u'run'):
+        raise ValueError(u'No program to run.')
+    return job
+
+
+def _run_program(job):
+    """Run the job's program until it ends or times out."""
+    params = {}
+    if job.get(u'max-memory'):
+        # the job can lower the memory limit, but not raise it
+        params['max_memory'] = min(_max_memory, int(job[u'max-memory']))
+    timeout = float(job.get(u'timeout', _timeout) or 0)
+    deadline = time.time() + timeout if timeout else None
+    result = {u'run': job[u'run']}
+    # keyboard input comes from the input file; without one, the program can't wait for input
+    infile = io.open(job[u'input'], 'rb') if job.get(u'input') else io.BytesIO()
+    # screen output goes to the output file, or into the result
+    outfile = io.open(job[u'output'], 'wb') if job.get(u'output') else io.StringIO()
+    with infile, outfile:
+        with _template.clone(input_streams=infile, output_streams=outfile, **params) as session:
+            with session.bind_file(job[u'run']) as progfile:
+                try:
+                    status = session.run(max_time=SLICE_TIME, command=b'RUN "%s"' % (progfile,))
+                    while status not in (ENDED, ERROR):
+                        if deadline and time.time() > deadline:
+                            status = TIMEOUT
+                            break
+                        if status == WAITING:
+                            time.sleep(WAIT_TIME)
+                        status = session.run(max_time=SLICE_TIME)
+                except error.InputClosed:
+                    status = INPUT
+                except error.Exit:
+                    # SYSTEM
+                    status = ENDED
+            if status == ERROR:
+                result[u'error'] = int(session.evaluate(b'ERR'))
+                result[u'line'] = int(session.evaluate(b'ERL'))
+        if not job.get(u'output'):
+            result[u'output'] = outfile.getvalue()
+    result[u'status'] = status
+    return result
@@ -45,7 +45,7 @@ from .console import stdio, init_stdio
 
 
 if PY2: # pragma: no cover
-    from .python2 import add_str, iterchar
+    from .python2 import add_str, iterchar, int_from_bytes, int_to_bytes
     from .python2 import xrange, zip, iteritems, itervalues, iterkeys, iterbytes
     from .python2 import getcwdu, getenvu, setenvu, iterenvu
     from .python2 import configparser, queue, copyreg, which
@@ -63,7 +63,7 @@ else:
     from shutil import which
     from types import SimpleNamespace
     from tempfile import TemporaryDirectory
-    from .python3 import int2byte, add_str, iterchar, iterbytes
+    from .python3 import int2byte, add_str, iterchar, iterbytes, int_from_bytes, int_to_bytes
     from .python3 import xrange, zip, iteritems, itervalues, iterkeys
     from .python3 import getcwdu, getenvu, setenvu, iterenvu
     from .python3 import is_broken_pipe
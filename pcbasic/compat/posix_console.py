@@ -269,6 +269,8 @@ class PosixConsole(object):
         if curses:
             curses.setupterm()
         self._muffle = None
+        # output collected for a single write, or None if writing directly
+        self._frame = None
 
     ##########################################################################
     # terminal modes
@@ -326,8 +328,26 @@ class PosixConsole(object):
 
     def write(self, unicode_str):
         """Write (unicode) text to console."""
-        self._stdio.stdout.write(unicode_str)
-        self._stdio.stdout.flush()
+        if self._frame is not None:
+            self._frame.append(unicode_str)
+        else:
+            self._stdio.stdout.write(unicode_str)
+            self._stdio.stdout.flush()
+
+    @contextmanager
+    def collect_output(self):
+        """Collect output and write it to the terminal in one go."""
+        if self._frame is not None:
+            # nested call - only write at the outermost
+            yield
+            return
+        self._frame = []
+        try:
+            yield
+        finally:
+            frame, self._frame = u''.join(self._frame), None
+            if frame:
+                self.write(frame)
 
     def _emit_ti(self, capability, *args):
         """Emit escape code."""
@@ -338,16 +358,14 @@ class PosixConsole(object):
         except KeyError:
             pattern = curses.tigetstr(capability)
         if pattern:
-            ansistr = curses.tparm(pattern, *args).decode('ascii')
-            self._stdio.stdout.write(ansistr)
-            self._stdio.stdout.flush()
+            self.write(curses.tparm(pattern, *args).decode('ascii'))
             return True
         return False
 
     def set_caption(self, caption):
         """Set terminal caption."""
         if self._emit_ti('tsl'):
-            self._stdio.stdout.write(caption)
+            self.write(caption)
             self._emit_ti('fsl')
 
     def resize(self, height, width):
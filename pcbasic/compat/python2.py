@@ -22,6 +22,7 @@ import socket
 import errno
 import sys
 import os
+import binascii
 
 import ConfigParser as configparser
 import Queue as queue
@@ -59,6 +60,16 @@ def iterbytes(s):
         return (ord(_c) for _c in s)
     return s
 
+def int_from_bytes(s):
+    """Convert big-endian bytes to an unsigned integer."""
+    return int(binascii.hexlify(s) or b'0', 16)
+
+def int_to_bytes(value, length):
+    """Convert an unsigned integer to big-endian bytes of given length."""
+    if not length:
+        return b''
+    return binascii.unhexlify(b'%0*x' % (2 * length, value))
+
 def add_str(cls):
     """Decorator to implement the correct str() function."""
     try:
@@ -21,6 +21,14 @@ def is_broken_pipe(e):
 
 int2byte = struct.Struct(">B").pack
 
+def int_from_bytes(s):
+    """Convert big-endian bytes to an unsigned integer."""
+    return int.from_bytes(s, 'big')
+
+def int_to_bytes(value, length):
+    """Convert an unsigned integer to big-endian bytes of given length."""
+    return value.to_bytes(length, 'big')
+
 def add_str(cls):
     """Decorator to implement the correct str() function."""
     try:
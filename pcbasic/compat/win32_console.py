@@ -472,6 +472,11 @@ class Win32Console(object):
         """Write (unicode) text to the console."""
         _ConsoleWriter.write(self._hstdout, unistr)
 
+    @contextmanager
+    def collect_output(self):
+        """Console API calls take effect directly, so there is nothing to collect."""
+        yield
+
     def clear(self):
         """Clear the screen."""
         csbi = GetConsoleScreenBufferInfo(self._hstdout)
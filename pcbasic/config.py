@@ -51,6 +51,8 @@ PROGRAM_PATH = os.path.join(STATE_PATH, u'bundled_programs')
 
 # maximum memory size
 MAX_MEMORY_SIZE = 65534
+# maximum data segment size in large-heap mode, in kilobytes (4 GiB less one kilobyte)
+MAX_LARGE_HEAP_SIZE = 4194303
 
 # format for log files
 LOGGING_FORMAT = u'[%(asctime)s.%(msecs)04d] %(levelname)s: %(message)s'
@@ -257,7 +259,7 @@ ARGUMENTS = {
         u'type': u'string', u'default': u'',
         u'choices': (
             u'', u'none', u'cli', u'text', u'graphical',
-            u'ansi', u'curses', u'pygame', u'sdl2'
+            u'ansi', u'curses', u'pygame', u'sdl2', u'record'
         ),
     },
     u'sound': {
@@ -267,6 +269,9 @@ ARGUMENTS = {
     u'load': {u'type': u'string', u'default': u'', },
     u'run': {u'type': u'string', u'default': u'',  },
     u'convert': {u'type': u'string', u'default': u'', },
+    u'batch': {u'type': u'string', u'default': u'', },
+    u'workers': {u'type': u'int', u'default': 0, },
+    u'timeout': {u'type': u'int', u'default': 0, },
     u'help': {u'type': u'bool', u'default': False, },
     u'keys': {u'type': u'string', u'default': u'', },
     u'exec': {u'type': u'string', u'default': u'', },
@@ -328,6 +333,7 @@ ARGUMENTS = {
     # negative list length means 'optionally up to'
     u'max-memory': {u'type': u'int', u'list': -2, u'default': [MAX_MEMORY_SIZE, 4096], u'listcheck': _check_max_memory},
     u'allow-code-poke': {u'type': u'bool', u'default': False,},
+    u'large-heap': {u'type': u'int', u'default': 0,},
     u'reserved-memory': {u'type': u'int', u'default': 3429,},
     u'caption': {u'type': u'string', u'default': NAME,},
     u'text-width': {u'type': u'int', u'choices':(u'40', u'80'), u'default': 80,},
@@ -335,6 +341,8 @@ ARGUMENTS = {
     u'shell': {u'type': u'string', u'default': u'',},
     u'ctrl-c-break': {u'type': u'bool', u'default': True,},
     u'wait': {u'type': u'bool', u'default': False,},
+    u'process': {u'type': u'bool', u'default': False,},
+    u'record': {u'type': u'string', u'default': u'',},
     u'current-device': {u'type': u'string', u'default': ''},
     u'extension': {u'type': u'string', u'list': u'*', u'default': []},
     u'options': {u'type': u'string', u'default': ''},
@@ -541,6 +549,8 @@ class Settings(object):
         max_list = self.get('max-memory')
         max_list[1] = max_list[1]*16 if max_list[1] else max_list[0]
         max_list[0] = max_list[0] or max_list[1]
+        # large-heap mode overrides the GW-BASIC memory limits
+        large_heap = max(0, min(MAX_LARGE_HEAP_SIZE, self.get('large-heap')))
         # codepage parameters
         codepage_params = self.get('codepage').split(u':')
         codepage_dict = data.read_codepage(codepage_params[0])
@@ -577,8 +587,9 @@ class Settings(object):
             'hide_protected': self.get('hide-protected'),
             'allow_code_poke': self.get('allow-code-poke'),
             'rebuild_offsets': not self.convert,
-            # max available memory to BASIC (set by /m)
-            'max_memory': min(max_list) or 65534,
+            # max available memory to BASIC (set by /m, or by large-heap in kilobytes)
+            'max_memory': large_heap * 1024 if large_heap else (min(max_list) or 65534),
+            'large_heap': bool(large_heap),
             # maximum record length (-s)
             'max_reclen': max(1, min(32767, self.get('max-reclen'))),
             # number of file records
@@ -781,6 +792,7 @@ class Settings(object):
         iface_params = {
             'try_interfaces': iface_list,
             'audio_override': self.get('sound') not in ('true', 'interface') and self.get('sound'),
+            'process': self.get('process'),
         }
         iface_params.update(self._get_video_parameters())
         iface_params.update(self._get_audio_parameters())
@@ -799,6 +811,7 @@ class Settings(object):
             'mouse_clipboard': self.get('mouse-clipboard'),
             'icon': ICON,
             'wait': self.get('wait'),
+            'record_file': self.get('record'),
             }
 
     def _get_audio_parameters(self):
@@ -877,6 +890,11 @@ class Settings(object):
         name_out = self.get(1)
         return mode, name_in, name_out
 
+    @property
+    def batch_params(self):
+        """Get parameters for the batch runner."""
+        return self.get('batch'), self.get('workers'), self.get('timeout')
+
     @property
     def version(self):
         """Version operating mode."""
@@ -892,6 +910,11 @@ class Settings(object):
         """Converter operating mode."""
         return self.get('convert', get_default=False) is not None
 
+    @property
+    def batch(self):
+        """Batch operating mode."""
+        return bool(self.get('batch'))
+
     @property
     def debug(self):
         """Debugging mode."""
@@ -119,7 +119,7 @@ def _bluescreen(session, iface, argv, log_dir, exc_type, exc_value, exc_tracebac
     session_info = _debrief_session(session)
     # interface information
     if iface:
-        iface_name = u'%s, %s' % (type(iface._video).__name__, type(iface._audio).__name__)
+        iface_name = iface.plugin_names
     else:
         iface_name = u'--'
     # platform information
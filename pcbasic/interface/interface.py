@@ -8,6 +8,7 @@ This file is released under the GNU GPL version 3 or later.
 
 import sys
 import threading
+import multiprocessing
 import logging
 import traceback
 
@@ -16,21 +17,84 @@ from ..compat import queue
 from ..basic.base import signals
 from .base import InitFailed, video_plugins, audio_plugins, WAIT_MESSAGE
 from .audio import AudioPlugin
+from . import process
 
 
 # millisecond delay
 DELAY = 12
 
 
-class Interface(object):
+class _QueueInterface(object):
+    """Queue-based connection between session and interface."""
+
+    def get_queues(self):
+        """Retrieve interface queues."""
+        return self._input_queue, self._video_queue, self._audio_queue
+
+    def _thread_runner(self, target, *args, **kwargs):
+        """Session runner."""
+        try:
+            target(*args, interface=self, **kwargs)
+        finally:
+            if self._wait:
+                self.pause(WAIT_MESSAGE)
+            self.quit_output()
+
+    def pause(self, message):
+        """Pause and wait for a key."""
+        self._video_queue.put(signals.Event(signals.VIDEO_SET_CAPTION, (message,)))
+        self._video_queue.put(signals.Event(signals.VIDEO_SHOW_CURSOR, (False, False)))
+        while True:
+            signal = self._input_queue.get()
+            if signal.event_type in (signals.KEYB_DOWN, signals.QUIT):
+                self._video_queue.put(signals.Event(signals.VIDEO_SET_CAPTION, (u'',)))
+                return signal
+
+    def quit_output(self):
+        """Send signal through the output queues to quit plugins."""
+        self._video_queue.put(signals.Event(signals.QUIT))
+        self._audio_queue.put(signals.Event(signals.QUIT))
+
+
+class InterfaceProxy(_QueueInterface):
+    """Stand-in for the interface in an interpreter process, connected through pipes."""
+
+    def __init__(
+            self, plugin_names, needs_pixels, wait,
+            input_recv, video_send, ack_recv, audio_send, buffer_name
+        ):
+        """Connect to the interface process."""
+        self.plugin_names = plugin_names
+        self.needs_pixels = needs_pixels
+        self._wait = wait
+        self._input_queue = process.InputPipeQueue(input_recv)
+        # if the interface goes away, the interpreter gets a quit signal
+        disconnect = self._input_queue.disconnect
+        self._video_queue = process.VideoPipeQueue(video_send, ack_recv, buffer_name, disconnect)
+        self._audio_queue = process.PipeQueue(audio_send, disconnect)
+
+
+def _process_runner(target, plugin_names, needs_pixels, wait, process_args, args, kwargs):
+    """Session runner for interpreter process."""
+    InterfaceProxy(
+        plugin_names, needs_pixels, wait, *process_args
+    )._thread_runner(target, *args, **kwargs)
+
+
+class Interface(_QueueInterface):
     """User interface for PC-BASIC session."""
 
-    def __init__(self, try_interfaces=(), audio_override=None, wait=False, **kwargs):
+    def __init__(
+            self, try_interfaces=(), audio_override=None, wait=False, process=False, **kwargs
+        ):
         """Initialise interface."""
         self._input_queue = queue.Queue()
         self._video_queue = queue.Queue()
         self._audio_queue = queue.Queue()
         self._wait = wait
+        # run the session in a separate process
+        self._process = process
+        self._relay = None
         self._video, self._audio = None, None
         for video in try_interfaces:
             try:
@@ -57,16 +121,42 @@ class Interface(object):
             # audio fallback to no-plugin
             self._audio = AudioPlugin(self._audio_queue, **kwargs)
 
-    def get_queues(self):
-        """Retrieve interface queues."""
-        return self._input_queue, self._video_queue, self._audio_queue
+    @property
+    def plugin_names(self):
+        """Names of the video and audio plugins in use."""
+        return u'%s, %s' % (type(self._video).__name__, type(self._audio).__name__)
+
+    @property
+    def needs_pixels(self):
+        """The video plugin shows pixels, not just text."""
+        return self._video.needs_pixels
 
     def launch(self, target, *args, **kwargs):
-        """Start an interactive interpreter session."""
-        thread = threading.Thread(target=self._thread_runner, args=(target,) + args, kwargs=kwargs)
+        """Start an interactive interpreter session; target is called with the interface."""
+        if self._process:
+            self._relay = process.ProcessRelay(
+                self._input_queue, self._video_queue, self._audio_queue
+            )
+            worker = multiprocessing.Process(target=_process_runner, args=(
+                target, self.plugin_names, self.needs_pixels, self._wait,
+                self._relay.get_process_args(), args, kwargs
+            ))
+        else:
+            worker = threading.Thread(
+                target=self._thread_runner, args=(target,) + args, kwargs=kwargs
+            )
         try:
-            # launch the BASIC thread
-            thread.start()
+            # launch the BASIC thread or process
+            if self._process:
+                # multiprocessing closes standard input in a forked process
+                # but the interpreter may be reading from it, if it's redirected
+                stdin, sys.stdin = sys.stdin, None
+                try:
+                    worker.start()
+                finally:
+                    sys.stdin = stdin
+            else:
+                worker.start()
             # run the interface
             self.run()
         except Exception as e:
@@ -74,22 +164,23 @@ class Interface(object):
             logging.error(''.join(traceback.format_exception(*sys.exc_info())))
         finally:
             self.quit_input()
-            thread.join()
-
-    def _thread_runner(self, target, *args, **kwargs):
-        """Session runner."""
-        try:
-            target(*args, **kwargs)
-        finally:
-            if self._wait:
-                self.pause(WAIT_MESSAGE)
-            self.quit_output()
+            if self._relay:
+                # keep the pipes flowing until the interpreter process has received the signal
+                while worker.is_alive():
+                    self._relay.cycle()
+                    self._drain_output_queues()
+                    worker.join(DELAY / 1000.)
+                self._relay.close()
+                self._relay = None
+            worker.join()
 
     def run(self):
         """Start the main interface event loop."""
         with self._audio:
             with self._video:
                 while self._audio.alive or self._video.alive:
+                    if self._relay:
+                        self._relay.cycle()
                     # ensure both queues are drained
                     self._video.cycle()
                     self._audio.cycle()
@@ -97,19 +188,13 @@ class Interface(object):
                         # nothing to do, come back later
                         self._video.sleep(DELAY)
 
-    def pause(self, message):
-        """Pause and wait for a key."""
-        self._video_queue.put(signals.Event(signals.VIDEO_SET_CAPTION, (message,)))
-        self._video_queue.put(signals.Event(signals.VIDEO_SHOW_CURSOR, (False, False)))
-        while True:
-            signal = self._input_queue.get()
-            if signal.event_type in (signals.KEYB_DOWN, signals.QUIT):
-                self._video_queue.put(signals.Event(signals.VIDEO_SET_CAPTION, (u'',)))
-                return signal
-
     def quit_input(self):
         """Send signal through the input queue to quit BASIC."""
         self._input_queue.put(signals.Event(signals.QUIT))
+        self._drain_output_queues()
+
+    def _drain_output_queues(self):
+        """Discard waiting video and audio signals."""
         # drain video queue (joined in other thread)
         while not self._video_queue.empty():
             try:
@@ -124,8 +209,3 @@ class Interface(object):
             except queue.Empty:
                 continue
             self._audio_queue.task_done()
-
-    def quit_output(self):
-        """Send signal through the output queues to quit plugins."""
-        self._video_queue.put(signals.Event(signals.QUIT))
-        self._audio_queue.put(signals.Event(signals.QUIT))
@@ -0,0 +1,323 @@
+"""
+PC-BASIC - interface.process
+Signal pipes and shared pixel buffer for running the interpreter in a separate process
+
+(c) 2013--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import time
+import select
+import multiprocessing
+
+try:
+    from multiprocessing import shared_memory
+except ImportError: # pragma: no cover
+    # Python < 3.8: pixels are sent through the pipe
+    shared_memory = None
+
+from ..compat import queue
+from ..basic.base import signals
+from ..basic.base.bytematrix import ByteMatrix
+
+
+# size of the shared pixel buffer; pixels that don't fit are sent through the pipe
+SHARED_BUFFER_SIZE = 1024 * 1024
+# number of batches that can be in transit, each with its own part of the shared buffer
+_SLOTS = 2
+# seconds between checks that the interface is still there, while we wait for it
+_CHECK_INTERVAL = 0.1
+
+
+def _slot_range(slot):
+    """Start and end offset of a part of the shared buffer."""
+    size = SHARED_BUFFER_SIZE // _SLOTS
+    return slot * size, (slot + 1) * size
+
+
+def _interface_alive():
+    """The interface process is still running; assume it is if we can't tell."""
+    # Python < 3.8 can't tell
+    parent = getattr(multiprocessing, 'parent_process', lambda: None)()
+    return parent is None or parent.is_alive()
+
+
+def _wait(ready, timeout=None):
+    """
+    Wait until ready(seconds) holds or the timeout in seconds has passed; return whether it holds.
+    Raise EOFError if the interface process goes away while we wait.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        seconds = _CHECK_INTERVAL
+        if deadline is not None:
+            seconds = max(0., min(seconds, deadline - time.time()))
+        if ready(seconds):
+            return True
+        if deadline is not None and time.time() >= deadline:
+            return False
+        # the pipes don't see the interface go if the interpreter process has inherited both ends
+        if not _interface_alive():
+            raise EOFError('Interface process has gone away.')
+
+
+###############################################################################
+# interpreter end
+
+class PipeQueue(object):
+    """Send end of a signal pipe, with the part of the Queue interface used by the interpreter."""
+
+    def __init__(self, connection, disconnect=None):
+        """Wrap the connection; disconnect() is called if the interface goes away."""
+        self._connection = connection
+        self._disconnect = disconnect
+        self._closed = False
+
+    def put(self, signal, block=True, timeout=None):
+        """Send a signal; if the pipe is full, wait for the interface to catch up or raise Full."""
+        if self._closed:
+            return
+        try:
+            if not _wait(self._writable, timeout if block else 0):
+                raise queue.Full()
+            self._connection.send(signal)
+        except (EOFError, OSError):
+            self._close_pipe()
+
+    def put_nowait(self, signal):
+        """Send a signal if the pipe has room, or raise Full."""
+        self.put(signal, block=False)
+
+    def _writable(self, seconds):
+        """Wait until the pipe has room, for at most the given time; return whether it has."""
+        try:
+            return bool(select.select([], [self._connection], [], seconds)[1])
+        except (select.error, ValueError, TypeError):
+            # we can't select on pipes on Windows; sending will block until there's room
+            return True
+
+    def _close_pipe(self):
+        """The interface has gone away: drop further signals and tell the interpreter."""
+        self._closed = True
+        if self._disconnect:
+            self._disconnect()
+
+    def qsize(self):
+        """Signals are not counted; a full pipe blocks the sender instead."""
+        return 0
+
+    def empty(self):
+        """Signals are not counted."""
+        return True
+
+    def task_done(self):
+        """Signals are not counted."""
+
+    def join(self):
+        """Signals are not counted."""
+
+
+class VideoPipeQueue(PipeQueue):
+    """Send end of the video pipe, passing the pixels of each batch through the shared buffer."""
+
+    def __init__(self, connection, ack_connection, buffer_name, disconnect=None):
+        """Wrap the connections and attach to the shared buffer."""
+        PipeQueue.__init__(self, connection, disconnect)
+        self._ack_connection = ack_connection
+        self._shared = None
+        self._free_slots = []
+        if buffer_name and shared_memory:
+            self._shared = shared_memory.SharedMemory(buffer_name)
+            self._free_slots = list(range(_SLOTS))
+
+    def qsize(self):
+        """Number of batches the interface has not yet taken from the shared buffer."""
+        if not self._shared or self._closed:
+            return 0
+        try:
+            self._receive_acks()
+        except (EOFError, OSError):
+            self._close_pipe()
+            return 0
+        return _SLOTS - len(self._free_slots)
+
+    def put(self, signal, block=True, timeout=None):
+        """Send a signal, with batched update pixels moved to the shared buffer."""
+        if signal.event_type == signals.VIDEO_BATCH and self._shared and not self._closed:
+            start = time.time()
+            try:
+                # wait for the interface to release a part of the buffer
+                if not _wait(self._slot_free, timeout if block else 0):
+                    raise queue.Full()
+                self._receive_acks()
+            except (EOFError, OSError):
+                self._close_pipe()
+                return
+            if timeout is not None:
+                timeout = max(0., timeout - (time.time() - start))
+            slot = self._free_slots.pop(0)
+            batch, = signal.params
+            try:
+                PipeQueue.put(
+                    self, signals.Event(signals.VIDEO_BATCH, (self._stow(batch, slot), slot)),
+                    block, timeout
+                )
+            except queue.Full:
+                self._free_slots.append(slot)
+                raise
+            return
+        PipeQueue.put(self, signal, block, timeout)
+        if signal.event_type == signals.QUIT:
+            self.close()
+
+    def _receive_acks(self):
+        """Register the parts of the buffer released by the interface."""
+        while self._ack_connection.poll():
+            self._free_slots.append(self._ack_connection.recv())
+
+    def _slot_free(self, seconds):
+        """Wait for a free part of the buffer, for at most the given time; return whether one is."""
+        return bool(self._free_slots) or self._ack_connection.poll(seconds)
+
+    def _stow(self, batch, slot):
+        """Write update pixels to a part of the buffer and replace them by their location."""
+        offset, end = _slot_range(slot)
+        stowed = []
+        for signal in batch:
+            if signal.event_type == signals.VIDEO_UPDATE and signal.params[-1] is not None:
+                row, col, text, attrs, y0, x0, sprite = signal.params
+                size = sprite.height * sprite.width
+                if size and offset + size <= end:
+                    self._shared.buf[offset:offset+size] = sprite.to_bytes()
+                    signal = signals.Event(
+                        signals.VIDEO_UPDATE,
+                        (row, col, text, attrs, y0, x0, (offset, sprite.height, sprite.width))
+                    )
+                    offset += size
+            stowed.append(signal)
+        return stowed
+
+    def close(self):
+        """Detach from the shared buffer."""
+        if self._shared:
+            self._shared.close()
+            self._shared = None
+
+
+class InputPipeQueue(queue.Queue):
+    """Input queue that also receives the signals sent by the interface through a pipe."""
+
+    def __init__(self, connection):
+        """Wrap the connection."""
+        queue.Queue.__init__(self)
+        self._connection = connection
+        self._closed = False
+
+    def get(self, block=True, timeout=None):
+        """Retrieve a signal from the queue or the pipe."""
+        if block and self.empty() and not self._closed:
+            try:
+                _wait(self._connection.poll, timeout)
+            except (EOFError, OSError):
+                self.disconnect()
+        self._receive()
+        return queue.Queue.get(self, block, timeout)
+
+    def _receive(self):
+        """Move waiting signals from the pipe to the queue."""
+        try:
+            while not self._closed and self._connection.poll():
+                self.put(self._connection.recv())
+        except (EOFError, OSError):
+            self.disconnect()
+
+    def disconnect(self):
+        """The interface has gone away: tell the interpreter to quit."""
+        if not self._closed:
+            self._closed = True
+            self.put(signals.Event(signals.QUIT))
+
+
+###############################################################################
+# interface end
+
+class ProcessRelay(object):
+    """Interface end of the signal pipes and owner of the shared pixel buffer."""
+
+    def __init__(self, input_queue, video_queue, audio_queue):
+        """Create the pipes and the shared buffer."""
+        self._input_queue = input_queue
+        self._video_queue = video_queue
+        self._audio_queue = audio_queue
+        self._input_recv, self._input_send = multiprocessing.Pipe(duplex=False)
+        self._video_recv, self._video_send = multiprocessing.Pipe(duplex=False)
+        self._ack_recv, self._ack_send = multiprocessing.Pipe(duplex=False)
+        self._audio_recv, self._audio_send = multiprocessing.Pipe(duplex=False)
+        self._shared = None
+        if shared_memory:
+            self._shared = shared_memory.SharedMemory(create=True, size=SHARED_BUFFER_SIZE)
+        self._closed = False
+
+    def get_process_args(self):
+        """Connections and buffer name to hand to the interpreter process."""
+        return (
+            self._input_recv, self._video_send, self._ack_recv, self._audio_send,
+            self._shared.name if self._shared else None
+        )
+
+    def cycle(self):
+        """Forward input signals to the interpreter and output signals to the plugins."""
+        if self._closed:
+            return
+        try:
+            while True:
+                self._input_send.send(self._input_queue.get(False))
+                self._input_queue.task_done()
+        except queue.Empty:
+            pass
+        except (EOFError, OSError):
+            # interpreter has gone away
+            self._closed = True
+        self._receive(self._video_recv, self._video_queue, self._retrieve_batch)
+        self._receive(self._audio_recv, self._audio_queue)
+
+    def _receive(self, connection, out_queue, rebuild=None):
+        """Move waiting signals from a pipe to a plugin queue."""
+        try:
+            while connection.poll():
+                signal = connection.recv()
+                out_queue.put(rebuild(signal) if rebuild else signal)
+        except (EOFError, OSError):
+            # interpreter has gone away without saying goodbye
+            self._closed = True
+            out_queue.put(signals.Event(signals.QUIT))
+
+    def _retrieve_batch(self, signal):
+        """Retrieve batched update pixels from the shared buffer and release its part."""
+        if signal.event_type != signals.VIDEO_BATCH or not self._shared:
+            return signal
+        stowed, slot = signal.params
+        batch = []
+        for signal in stowed:
+            if signal.event_type == signals.VIDEO_UPDATE and isinstance(signal.params[-1], tuple):
+                row, col, text, attrs, y0, x0, (offset, height, width) = signal.params
+                sprite = ByteMatrix.view_from_buffer(
+                    height, width, width, self._shared.buf[offset:offset+height*width]
+                ).copy()
+                signal = signals.Event(signals.VIDEO_UPDATE, (row, col, text, attrs, y0, x0, sprite))
+            batch.append(signal)
+        self._ack_send.send(slot)
+        return signals.Event(signals.VIDEO_BATCH, (batch,))
+
+    def close(self):
+        """Close the pipes and release the shared buffer."""
+        self._closed = True
+        for connection in (
+                self._input_recv, self._input_send, self._video_recv, self._video_send,
+                self._ack_recv, self._ack_send, self._audio_recv, self._audio_send
+            ):
+            connection.close()
+        if self._shared:
+            self._shared.close()
+            self._shared.unlink()
+            self._shared = None
@@ -0,0 +1,383 @@
+"""
+PC-BASIC - interface.recording
+Recording of screen output and its conversion to images and text casts
+
+(c) 2013--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import io
+import gzip
+import json
+import struct
+import time
+import zlib
+
+from ..basic.base.bytematrix import ByteMatrix
+
+
+# file signature and format version
+MAGIC = b'PCBASIC-REC'
+VERSION = 1
+
+# record types
+# video mode change, clears the screen: canvas height and width, text height and width
+MODE = 1
+# palette: per attribute, foreground and background rgb, blink and underline flags
+PALETTE = 2
+# full screen contents, for seeking: dimensions, pixels, text and attributes
+KEYFRAME = 3
+# changed pixels, xor-ed against the previously recorded contents of a rectangle
+PIXELS = 4
+# text written to a rectangle of cells
+TEXT = 5
+# scroll up (-1) or down (1) between two rows, filling with a background attribute
+SCROLL = 6
+# rows cleared to a background attribute
+CLEAR = 7
+
+# record header: milliseconds since start of recording, record type
+_HEADER = struct.Struct('<IB')
+_RECT = struct.Struct('<HHHH')
+_LENGTH = struct.Struct('<H')
+_SCROLL = struct.Struct('<bHHB')
+_CLEAR = struct.Struct('<BHH')
+
+
+###############################################################################
+# encoding helpers
+
+def _pack_text(unicode_matrix, attr_matrix):
+    """Encode rows of text cells and attributes."""
+    # cells are separated by NUL; NUL characters show as spaces anyway
+    # trailing halves of fullwidth characters are empty cells
+    out = []
+    for text, attrs in zip(unicode_matrix, attr_matrix):
+        row = u'\0'.join(_c if _c != u'\0' else u' ' for _c in text).encode('utf-8')
+        out.extend((_LENGTH.pack(len(row)), row, bytes(bytearray(attrs))))
+    return b''.join(out)
+
+def _unpack_text(data, offset, height, width):
+    """Decode rows of text cells and attributes."""
+    text, attrs = [], []
+    for _ in range(height):
+        length, = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        text.append(data[offset:offset+length].decode('utf-8').split(u'\0'))
+        offset += length
+        attrs.append(list(bytearray(data[offset:offset+width])))
+        offset += width
+    return text, attrs, offset
+
+def _cleared_row(width):
+    """Row of blank cells in black, as (character, foreground rgb, background rgb)."""
+    return [(u' ', (0, 0, 0), (0, 0, 0))] * width
+
+
+###############################################################################
+# writing
+
+class RecordingWriter(object):
+    """Write screen changes to a recording stream."""
+
+    def __init__(self, stream):
+        """Start the recording."""
+        self._stream = stream
+        self._start = time.time()
+        # records are collected and written in one go, as small writes compress slowly
+        self._records = [MAGIC + bytes(bytearray((VERSION,)))]
+
+    def _write(self, kind, payload):
+        """Add a time-stamped record."""
+        millis = int((time.time() - self._start) * 1000)
+        self._records.append(_HEADER.pack(millis, kind) + payload)
+
+    def flush(self):
+        """Write the collected records to the stream."""
+        if self._records:
+            self._stream.write(b''.join(self._records))
+            self._records = []
+
+    def write_mode(self, canvas_height, canvas_width, text_height, text_width):
+        """Record a video mode change."""
+        self._write(MODE, _RECT.pack(canvas_height, canvas_width, text_height, text_width))
+
+    def write_palette(self, attributes):
+        """Record a palette change."""
+        self._write(PALETTE, _LENGTH.pack(len(attributes)) + b''.join(
+            bytes(bytearray(tuple(_fore) + tuple(_back) + (bool(_blink), bool(_underline))))
+            for _fore, _back, _blink, _underline in attributes
+        ))
+
+    def write_keyframe(self, pixels, text, attrs):
+        """Record the full screen."""
+        self._write(KEYFRAME, b''.join((
+            _RECT.pack(pixels.height, pixels.width, len(text), len(text[0]) if text else 0),
+            pixels.to_bytes(),
+            _pack_text(text, attrs),
+        )))
+
+    def write_pixels(self, y0, x0, delta):
+        """Record changed pixels as the xor with the previously recorded pixels."""
+        self._write(PIXELS, _RECT.pack(y0, x0, delta.height, delta.width) + delta.to_bytes())
+
+    def write_text(self, row, col, unicode_matrix, attr_matrix):
+        """Record text written to the screen."""
+        self._write(TEXT, b''.join((
+            _RECT.pack(row, col, len(attr_matrix), len(attr_matrix[0]) if attr_matrix else 0),
+            _pack_text(unicode_matrix, attr_matrix),
+        )))
+
+    def write_scroll(self, direction, from_line, scroll_height, back_attr):
+        """Record a scroll."""
+        self._write(SCROLL, _SCROLL.pack(direction, from_line, scroll_height, back_attr))
+
+    def write_clear(self, back_attr, start, stop):
+        """Record cleared rows."""
+        self._write(CLEAR, _CLEAR.pack(back_attr, start, stop))
+
+
+###############################################################################
+# reading
+
+def open_recording(name):
+    """Open a recording file for reading."""
+    return gzip.open(name, 'rb')
+
+def read_recording(stream):
+    """Iterate over the records in a stream as (seconds, type, parameters)."""
+    # read all at once: the stream is compressed and recordings are written in one go
+    data = stream.read()
+    if not data.startswith(MAGIC):
+        raise ValueError('Not a PC-BASIC recording.')
+    offset = len(MAGIC)
+    version = bytearray(data[offset:offset+1])[0]
+    if version != VERSION:
+        raise ValueError('Unsupported recording version %d.' % (version,))
+    offset += 1
+    while offset < len(data):
+        millis, kind = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        if kind == MODE:
+            params = _RECT.unpack_from(data, offset)
+            offset += _RECT.size
+        elif kind == PALETTE:
+            count, = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            entries = bytearray(data[offset:offset+8*count])
+            params = [(
+                tuple(entries[_i:_i+3]), tuple(entries[_i+3:_i+6]),
+                bool(entries[_i+6]), bool(entries[_i+7])
+            ) for _i in range(0, 8*count, 8)],
+            offset += 8*count
+        elif kind == KEYFRAME:
+            height, width, text_height, text_width = _RECT.unpack_from(data, offset)
+            offset += _RECT.size
+            pixels = ByteMatrix(height, width, data[offset:offset+height*width])
+            offset += height*width
+            text, attrs, offset = _unpack_text(data, offset, text_height, text_width)
+            params = pixels, text, attrs
+        elif kind == PIXELS:
+            y0, x0, height, width = _RECT.unpack_from(data, offset)
+            offset += _RECT.size
+            params = y0, x0, ByteMatrix(height, width, data[offset:offset+height*width])
+            offset += height*width
+        elif kind == TEXT:
+            row, col, height, width = _RECT.unpack_from(data, offset)
+            offset += _RECT.size
+            text, attrs, offset = _unpack_text(data, offset, height, width)
+            params = row, col, text, attrs
+        elif kind == SCROLL:
+            params = _SCROLL.unpack_from(data, offset)
+            offset += _SCROLL.size
+        elif kind == CLEAR:
+            params = _CLEAR.unpack_from(data, offset)
+            offset += _CLEAR.size
+        else:
+            raise ValueError('Unknown record type %d in recording.' % (kind,))
+        yield millis / 1000., kind, params
+
+
+class Screen(object):
+    """Screen contents rebuilt from a recording."""
+
+    def __init__(self):
+        """Start with an empty screen."""
+        self.pixels = ByteMatrix()
+        self.palette = []
+        # cells of (character, foreground rgb, background rgb)
+        # with colours taken from the palette at the time of writing
+        self.cells = []
+        self._font_height = 1
+
+    def apply(self, kind, params):
+        """Apply a record to the screen."""
+        if kind == MODE:
+            canvas_height, canvas_width, text_height, text_width = params
+            self.pixels = ByteMatrix(canvas_height, canvas_width)
+            self._font_height = -(-canvas_height // text_height)
+            self.cells = [_cleared_row(text_width) for _ in range(text_height)]
+        elif kind == PALETTE:
+            self.palette, = params
+        elif kind == KEYFRAME:
+            pixels, text, attrs = params
+            self.pixels = pixels
+            self._font_height = -(-pixels.height // len(text)) if text else 1
+            self.cells = [[None] * len(_row) for _row in text]
+            self._put_text(1, 1, text, attrs)
+        elif kind == PIXELS:
+            y0, x0, delta = params
+            self.pixels[y0:y0+delta.height, x0:x0+delta.width] = (
+                self.pixels[y0:y0+delta.height, x0:x0+delta.width] ^ delta
+            )
+        elif kind == TEXT:
+            self._put_text(*params)
+        elif kind == SCROLL:
+            direction, from_line, scroll_height, back_attr = params
+            scroll_pixels(self.pixels, self._font_height, *params)
+            blank = self._blank_row(back_attr)
+            rows = self.cells[from_line-1:scroll_height]
+            if direction == -1:
+                self.cells[from_line-1:scroll_height] = rows[1:] + [blank]
+            else:
+                self.cells[from_line-1:scroll_height] = [blank] + rows[:-1]
+        elif kind == CLEAR:
+            back_attr, start, stop = params
+            clear_pixels(self.pixels, self._font_height, *params)
+            self.cells[start-1:stop] = [self._blank_row(back_attr) for _ in range(start, stop+1)]
+
+    def _colours(self, attr):
+        """Foreground and background rgb of an attribute."""
+        try:
+            fore, back, _, _ = self.palette[attr]
+        except IndexError:
+            return (170, 170, 170), (0, 0, 0)
+        return fore, back
+
+    def _blank_row(self, back_attr):
+        """Row of blank cells on a background."""
+        # pixels are cleared to the attribute, so the background is its foreground colour
+        back, _ = self._colours(back_attr)
+        return [(u' ', back, back)] * (len(self.cells[0]) if self.cells else 0)
+
+    def _put_text(self, row, col, text, attrs):
+        """Write text cells."""
+        for cells, chars, row_attrs in zip(self.cells[row-1:], text, attrs):
+            cells[col-1:col-1+len(chars)] = [
+                (_char,) + self._colours(_attr) for _char, _attr in zip(chars, row_attrs)
+            ]
+
+
+def scroll_pixels(pixels, font_height, direction, from_line, scroll_height, back_attr):
+    """Scroll a pixel canvas by one text row."""
+    top, bottom = (from_line-1) * font_height, scroll_height * font_height
+    if direction == -1:
+        pixels.move(top+font_height, bottom, 0, pixels.width, top, 0)
+        pixels[bottom-font_height:bottom, :] = back_attr
+    else:
+        pixels.move(top, bottom-font_height, 0, pixels.width, top+font_height, 0)
+        pixels[top:top+font_height, :] = back_attr
+
+def clear_pixels(pixels, font_height, back_attr, start, stop):
+    """Clear text rows on a pixel canvas."""
+    pixels[(start-1) * font_height : stop * font_height, :] = back_attr
+
+
+def _iter_frames(stream):
+    """Iterate over the screen as recorded at each time stamp, as (seconds, screen)."""
+    screen = Screen()
+    last_time = None
+    for seconds, kind, params in read_recording(stream):
+        if last_time is not None and seconds != last_time:
+            yield last_time, screen
+        screen.apply(kind, params)
+        last_time = seconds
+    if last_time is not None:
+        yield last_time, screen
+
+
+###############################################################################
+# image export
+
+def _png_chunk(kind, data):
+    """Build a PNG chunk."""
+    chunk = kind + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+def write_png(stream, pixels, palette):
+    """Write a pixel matrix of attributes to a stream as indexed-colour PNG."""
+    # attributes are shown in their foreground colour, as with blink on
+    colours = [_fore for _fore, _, _, _ in palette[:256]]
+    colours += [(0, 0, 0)] * (256 - len(colours))
+    raw = b''.join(b'\0' + bytes(bytearray(_row)) for _row in pixels.to_rows())
+    stream.write(b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', pixels.width, pixels.height, 8, 3, 0, 0, 0)),
+        _png_chunk(b'PLTE', b''.join(bytes(bytearray(_rgb)) for _rgb in colours)),
+        _png_chunk(b'IDAT', zlib.compress(raw)),
+        _png_chunk(b'IEND', b''),
+    )))
+
+def export_images(recording_name, image_pattern=u'frame%05d.png'):
+    """Convert a recording to a sequence of PNG images, one per recorded frame."""
+    count = 0
+    with open_recording(recording_name) as stream:
+        for _, screen in _iter_frames(stream):
+            if not screen.pixels.width or not screen.pixels.height:
+                continue
+            with io.open(image_pattern % (count,), 'wb') as image:
+                write_png(image, screen.pixels, screen.palette)
+            count += 1
+    return count
+
+
+###############################################################################
+# text cast export
+
+def _sgr(fore, back):
+    """Escape sequence for true-colour foreground and background."""
+    return u'\x1b[38;2;%d;%d;%d;48;2;%d;%d;%dm' % (tuple(fore) + tuple(back))
+
+def _render_row(row, cells):
+    """Escape sequences and text to draw a row of cells."""
+    out = [u'\x1b[%d;1H' % (row,)]
+    last = None
+    for char, fore, back in cells:
+        # trailing halves of fullwidth characters take no output
+        if not char:
+            continue
+        if (fore, back) != last:
+            out.append(_sgr(fore, back))
+            last = fore, back
+        out.append(char)
+    out.append(u'\x1b[0m')
+    return u''.join(out)
+
+def export_asciicast(recording_name, cast_name):
+    """Convert the text on screen in a recording to an asciicast (version 2) text recording."""
+    events = []
+    size, shown = None, []
+    with open_recording(recording_name) as stream:
+        for seconds, screen in _iter_frames(stream):
+            if not screen.cells:
+                continue
+            new_size = len(screen.cells[0]), len(screen.cells)
+            if new_size != size:
+                if size:
+                    events.append([seconds, u'r', u'%dx%d' % new_size])
+                events.append([seconds, u'o', u'\x1b[0m\x1b[2J'])
+                size, shown = new_size, [_cleared_row(new_size[0])] * new_size[1]
+            output = u''.join(
+                _render_row(_row, _cells)
+                for _row, _cells in enumerate(screen.cells, 1) if _cells != shown[_row-1]
+            )
+            if output:
+                events.append([seconds, u'o', output])
+                shown = [list(_cells) for _cells in screen.cells]
+    if not size:
+        size = 80, 25
+    with io.open(cast_name, 'w', encoding='utf-8') as cast:
+        cast.write(u'%s\n' % (json.dumps({u'version': 2, u'width': size[0], u'height': size[1]}),))
+        for event in events:
+            cast.write(u'%s\n' % (json.dumps(event),))
+    return len(events)
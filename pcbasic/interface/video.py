@@ -15,6 +15,9 @@ from ..basic.base import signals
 class VideoPlugin(object):
     """Base class for display/input interface plugins."""
 
+    # the plugin shows the pixels sent with screen updates
+    needs_pixels = True
+
     def __init__(self, input_queue, video_queue, **kwargs):
         """Setup the interface."""
         self.alive = True
@@ -60,14 +63,23 @@ class VideoPlugin(object):
                 return True
             # putting task_done before the execution avoids hanging on join() after an exception
             self._video_queue.task_done()
-            if signal.event_type == signals.QUIT:
-                # close thread
-                self.alive = False
+            if signal.event_type == signals.VIDEO_BATCH:
+                batch, = signal.params
+                for signal in batch:
+                    self._handle_signal(signal)
             else:
-                try:
-                    self._handlers[signal.event_type](*signal.params)
-                except KeyError:
-                    pass
+                self._handle_signal(signal)
+
+    def _handle_signal(self, signal):
+        """Handle a single video signal."""
+        if signal.event_type == signals.QUIT:
+            # close thread
+            self.alive = False
+        else:
+            try:
+                self._handlers[signal.event_type](*signal.params)
+            except KeyError:
+                pass
 
     # plugin overrides
 
@@ -20,6 +20,28 @@ COLOURS_4 = (0, 3, 5, 7) * 4
 # Mono colours: black, white
 COLOURS_2 = (0, 7) * 8
 
+# approximate number of bytes in a cursor movement sequence
+# unchanged cells in a shorter gap are overwritten rather than moved over
+MOVE_COST = 8
+
+
+def _cell(char, fore, back, blink, underline):
+    """Character and split attribute of a cell; all blank cells on a background look the same."""
+    if char in (u' ', u'\0') and not underline:
+        return u' ', 0, back, False, False
+    return char, fore, back, blink, underline
+
+def _blank_row(width, back=0):
+    """Row of blank cells."""
+    return [_cell(u' ', 0, back, False, False)] * width
+
+def _shift_rows(rows, direction, from_line, scroll_height, new_row):
+    """Scroll a list of rows up (-1) or down (1), inserting the new row."""
+    if direction == -1:
+        rows[from_line-1:scroll_height] = rows[from_line:scroll_height] + [new_row]
+    else:
+        rows[from_line-1:scroll_height] = [new_row] + rows[from_line-1:scroll_height-1]
+
 
 @video_plugins.register('ansi')
 class VideoANSI(video_cli.VideoTextBase):
@@ -43,6 +65,16 @@ class VideoANSI(video_cli.VideoTextBase):
         self._cursor_attr = None
         # text and colour buffer
         self._height, self._width = 25, 80
+        # cells as they should be
+        self._cells = [_blank_row(self._width) for _ in range(self._height)]
+        # cells as they are shown on the terminal
+        self._shown = [_blank_row(self._width) for _ in range(self._height)]
+        # rows that may differ from what is shown
+        self._dirty_rows = set()
+        # scroll operations not yet sent to the terminal
+        self._scrolls = []
+        # position of the terminal cursor, or None if not known
+        self._terminal_cursor = None
         self._border_y = int(round((self._height * border_width)/200.))
         self._border_x = int(round((self._width * border_width)/200.))
         self._border_attr = 0
@@ -67,6 +99,81 @@ class VideoANSI(video_cli.VideoTextBase):
 
     def _work(self):
         """Handle screen and interface events."""
+        cursor = self._cursor_row, self._cursor_col
+        if not self._scrolls and not self._dirty_rows and self._terminal_cursor == cursor:
+            return
+        # write the changes since the last cycle as a single frame
+        with console.collect_output():
+            for direction, from_line, scroll_height in self._scrolls:
+                # set the default background
+                # as some (not all) consoles use the background color when inserting/deleting
+                # and if they can't resize this leads to glitches outside the window
+                self._set_attributes(7, 0, False, False)
+                console.scroll(
+                    from_line + self._border_y, scroll_height + self._border_y, rows=direction
+                )
+                self._terminal_cursor = None
+            self._scrolls = []
+            for row in sorted(self._dirty_rows):
+                self._draw_row(row)
+            self._dirty_rows = set()
+            if self._terminal_cursor != cursor:
+                console.move_cursor_to(
+                    self._cursor_row + self._border_y, self._cursor_col + self._border_x
+                )
+                self._terminal_cursor = cursor
+
+    def _draw_row(self, row):
+        """Send the changed cells in a row to the terminal."""
+        cells, shown = self._cells[row-1], self._shown[row-1]
+        changed = [_col for _col, _c in enumerate(cells) if _c != shown[_col]]
+        if not changed:
+            return
+        back = cells[0][2]
+        if len(changed) > MOVE_COST and cells == _blank_row(self._width, back):
+            # clearing the row is cheaper than writing the blanks
+            self._set_attributes(7, back, False, False)
+            console.move_cursor_to(row + self._border_y, 1)
+            console.clear_row(self._width + self._border_x)
+            self._terminal_cursor = None
+            if self._border_x:
+                self._set_attributes(0, self._border_attr, False, False)
+                console.write(u' ' * self._border_x)
+            self._shown[row-1] = list(cells)
+            return
+        # overwrite unchanged cells in short gaps rather than moving the cursor
+        spans = []
+        for col in changed:
+            if spans and col - spans[-1][1] <= MOVE_COST:
+                spans[-1][1] = col
+            else:
+                spans.append([col, col])
+        for start, stop in spans:
+            # don't start or end halfway through a double-width character
+            # which come through as pairs c, u''
+            while start > 0 and not cells[start][0]:
+                start -= 1
+            if stop < self._width - 1 and not cells[stop+1][0]:
+                stop += 1
+            if self._terminal_cursor != (row, start+1):
+                console.move_cursor_to(row + self._border_y, start+1 + self._border_x)
+            span = cells[start:stop+1]
+            # blanks can be written in the attributes of the preceding cell if the background matches
+            attrs = [span[0][1:]]
+            for char, fore, back, blink, underline in span[1:]:
+                if char == u' ' and not underline and back == attrs[-1][1]:
+                    attrs.append(attrs[-1])
+                else:
+                    attrs.append((fore, back, blink, underline))
+            for chars, attr in iter_chunks([_c[0] for _c in span], attrs):
+                self._set_attributes(*attr)
+                console.write(u''.join(chars))
+            shown[start:stop+1] = cells[start:stop+1]
+            # the terminal may not advance the cursor beyond the last column
+            if stop < self._width - 1:
+                self._terminal_cursor = row, stop+2
+            else:
+                self._terminal_cursor = None
 
     def _redraw_border(self):
         """Redraw the border."""
@@ -87,9 +194,7 @@ class VideoANSI(video_cli.VideoTextBase):
         for row in range(self._border_y):
             console.move_cursor_to(row+1 + self._border_y + self._height, 1)
             console.clear_row(self._width + 2 * self._border_x)
-        console.move_cursor_to(
-            self._cursor_row + self._border_y, self._cursor_col + self._border_x
-        )
+        self._terminal_cursor = None
 
     def _set_default_colours(self, num_attr):
         """Set colours for default palette."""
@@ -118,6 +223,8 @@ class VideoANSI(video_cli.VideoTextBase):
     def set_palette(self, attributes, dummy_pack_pixels):
         """Set the colour palette."""
         self._set_default_colours(len(attributes))
+        # the same attributes may now map to different colours
+        self._last_attributes = None
         rgb_table = [_fore for _fore, _, _, _ in attributes[:16]]
         if len(attributes) > 16:
             # *assume* the first 16 attributes are foreground-on-black
@@ -141,37 +248,26 @@ class VideoANSI(video_cli.VideoTextBase):
         self._height = text_height
         self._width = text_width
         console.set_attributes(0, 0, False, False)
+        self._last_attributes = None
         console.resize(self._height + 2*self._border_y, self._width + 2*self._border_x)
         console.clear()
+        self._cells = [_blank_row(self._width) for _ in range(self._height)]
+        self._shown = [_blank_row(self._width) for _ in range(self._height)]
+        self._dirty_rows = set()
+        self._scrolls = []
+        self._terminal_cursor = None
         self._redraw_border()
         return True
 
     def clear_rows(self, back_attr, start, stop):
         """Clear screen rows."""
-        self._set_attributes(7, back_attr, False, False)
-        for row in range(start, stop+1):
-            console.move_cursor_to(row + self._border_y, 1 + self._border_x)
-            console.clear_row(self._width + 2 * self._border_x)
-        # draw border
-        self._set_attributes(
-            0, self.default_colours[self._border_attr%16], False, False
-        )
         for row in range(start, stop+1):
-            console.move_cursor_to(row + self._border_y, 1)
-            console.write(u' ' * self._border_x)
-            console.move_cursor_to(row + self._border_y, 1 + self._width + self._border_x)
-            console.write(u' ' * self._border_x)
-        console.move_cursor_to(
-            self._cursor_row + self._border_y, self._cursor_col + self._border_x
-        )
+            self._cells[row-1] = _blank_row(self._width, back_attr)
+            self._dirty_rows.add(row)
 
     def move_cursor(self, row, col, attr, width):
         """Move the cursor to a new position."""
-        if (row, col) != (self._cursor_row, self._cursor_col):
-            self._cursor_row, self._cursor_col = row, col
-            console.move_cursor_to(
-                self._cursor_row + self._border_y, self._cursor_col + self._border_x
-            )
+        self._cursor_row, self._cursor_col = row, col
         # change attribute of cursor
         # cursor width is controlled by terminal
         if attr != self._cursor_attr:
@@ -195,39 +291,26 @@ class VideoANSI(video_cli.VideoTextBase):
 
     def update(self, row, col, unicode_matrix, attr_matrix, y0, x0, sprite):
         """Put text or pixels at a given position."""
-        start_col = col
-        curs_row, curs_col = self._cursor_row, self._cursor_col
         for text, attrs in zip(unicode_matrix, attr_matrix):
-            console.move_cursor_to(row + self._border_y, col + self._border_x)
-            for unicode_list, attr in iter_chunks(text, attrs):
-                fore, back, blink, underline = self._attributes[attr]
-                self._set_attributes(fore, back, blink, underline)
-                console.write(u''.join(unicode_list).replace(u'\0', u' '))
-                col += len(unicode_list)
+            self._cells[row-1][col-1:col-1+len(text)] = [
+                _cell(_char, *self._attributes[_attr]) for _char, _attr in zip(text, attrs)
+            ]
+            self._dirty_rows.add(row)
             row += 1
-            col = start_col
-        console.move_cursor_to(self._cursor_row + self._border_y, self._cursor_col + self._border_x)
 
     def scroll(self, direction, from_line, scroll_height, back_attr):
         """Scroll the screen between from_line and scroll_height."""
-        # set the default background
-        # as some (not all) consoles use the background color when inserting/deleting
-        # and if they can't resize this leads to glitches outside the window
-        self._set_attributes(7, 0, False, False)
+        if scroll_height > from_line:
+            # the terminal scrolls what it shows; new lines come in blank on the default background
+            self._scrolls.append((direction, from_line, scroll_height))
+            new_row = _blank_row(self._width)
+            _shift_rows(self._shown, direction, from_line, scroll_height, new_row)
+            _shift_rows(self._cells, direction, from_line, scroll_height, None)
+            self._dirty_rows.update(range(from_line, scroll_height+1))
         if direction == -1:
-            self._scroll_up(from_line, scroll_height, back_attr)
+            self.clear_rows(back_attr, scroll_height, scroll_height)
         else:
-            self._scroll_down(from_line, scroll_height, back_attr)
-
-    def _scroll_up(self, from_line, scroll_height, back_attr):
-        """Scroll the screen up between from_line and scroll_height."""
-        console.scroll(from_line + self._border_y, scroll_height + self._border_y, rows=-1)
-        self.clear_rows(back_attr, scroll_height, scroll_height)
-
-    def _scroll_down(self, from_line, scroll_height, back_attr):
-        """Scroll the screen down between from_line and scroll_height."""
-        console.scroll(from_line + self._border_y, scroll_height + self._border_y, rows=1)
-        self.clear_rows(back_attr, from_line, from_line)
+            self.clear_rows(back_attr, from_line, from_line)
 
     def set_caption_message(self, msg):
         """Add a message to the window caption."""
@@ -154,6 +154,8 @@ ALT_KEY_TO_EASCII = {
 class VideoTextBase(VideoPlugin):
     """Text-based interface."""
 
+    needs_pixels = False
+
     def __init__(self, input_queue, video_queue, **kwargs):
         """Initialise text-based interface."""
         if not console:
@@ -87,6 +87,8 @@ if curses:
 class VideoCurses(VideoPlugin):
     """Curses-based text interface."""
 
+    needs_pixels = False
+
     def __init__(self, input_queue, video_queue, caption=u'', border_width=0, **kwargs):
         """Initialise the text interface."""
         logging.warning('The `curses` interface is deprecated, please use the `text` interface instead.')
@@ -0,0 +1,140 @@
+"""
+PC-BASIC - interface.video_record
+Offscreen interface that records the screen output to a file
+
+(c) 2013--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import gzip
+import time
+
+from ..basic.base.bytematrix import ByteMatrix
+from .video import VideoPlugin
+from .base import video_plugins, InitFailed
+from . import recording
+
+
+# seconds between full-screen keyframes
+KEYFRAME_INTERVAL = 10
+# compression level of the recording; fast, so that we keep up with the interpreter
+COMPRESS_LEVEL = 1
+
+
+@video_plugins.register('record')
+class VideoRecord(VideoPlugin):
+    """Record screen changes to a file, without showing them."""
+
+    def __init__(self, input_queue, video_queue, record_file=u'', **kwargs):
+        """Initialise the recording interface."""
+        VideoPlugin.__init__(self, input_queue, video_queue)
+        if not record_file:
+            raise InitFailed('No recording file given.')
+        try:
+            self._stream = gzip.open(record_file, 'wb', compresslevel=COMPRESS_LEVEL)
+        except EnvironmentError as e:
+            raise InitFailed('Could not open recording file `%s`: %s' % (record_file, e))
+        self._writer = recording.RecordingWriter(self._stream)
+        # screen as it is now
+        self._pixels = ByteMatrix()
+        self._text, self._attrs = [], []
+        self._font_height = 1
+        # pixels as they are in the recording
+        self._recorded = ByteMatrix()
+        # rectangles updated since the last recorded frame, as (y0, x0, height, width)
+        self._dirty_rects = []
+        self._last_keyframe = time.time()
+
+    def __exit__(self, type, value, traceback):
+        """Finish the recording."""
+        try:
+            self._record_pixels()
+            self._writer.flush()
+            self._stream.close()
+        finally:
+            VideoPlugin.__exit__(self, type, value, traceback)
+
+    def _work(self):
+        """Record the pixels changed in this cycle."""
+        self._record_pixels()
+        if self._text and time.time() - self._last_keyframe >= KEYFRAME_INTERVAL:
+            self._writer.write_keyframe(self._pixels, self._text, self._attrs)
+            self._last_keyframe = time.time()
+        self._writer.flush()
+
+    def _record_pixels(self):
+        """Write the changed parts of the dirty rectangles."""
+        for y0, x0, height, width in self._dirty_rects:
+            new = self._pixels[y0:y0+height, x0:x0+width]
+            old = self._recorded[y0:y0+height, x0:x0+width]
+            # leave out unchanged rows at the top and bottom of the rectangle
+            new_bytes, old_bytes = new.to_bytes(), old.to_bytes()
+            changed = [
+                _y for _y in range(height)
+                if new_bytes[_y*width:(_y+1)*width] != old_bytes[_y*width:(_y+1)*width]
+            ]
+            if not changed:
+                continue
+            top, bottom = changed[0], changed[-1] + 1
+            new, old = new[top:bottom, :], old[top:bottom, :]
+            self._writer.write_pixels(y0 + top, x0, new ^ old)
+            self._recorded[y0+top:y0+bottom, x0:x0+width] = new
+        self._dirty_rects = []
+
+    # signal handlers
+
+    def set_mode(self, canvas_height, canvas_width, text_height, text_width):
+        """Initialise a given text or graphics mode."""
+        self._dirty_rects = []
+        self._pixels = ByteMatrix(canvas_height, canvas_width)
+        self._recorded = ByteMatrix(canvas_height, canvas_width)
+        self._font_height = -(-canvas_height // text_height)
+        self._text = [[u' '] * text_width for _ in range(text_height)]
+        self._attrs = [[0] * text_width for _ in range(text_height)]
+        self._writer.write_mode(canvas_height, canvas_width, text_height, text_width)
+
+    def set_palette(self, attributes, pack_pixels):
+        """Record the palette."""
+        self._writer.write_palette(attributes)
+
+    def clear_rows(self, back_attr, start, stop):
+        """Clear a range of screen rows."""
+        # record pending changes first, as the recording applies records in order
+        self._record_pixels()
+        for pixels in (self._pixels, self._recorded):
+            recording.clear_pixels(pixels, self._font_height, back_attr, start, stop)
+        for row in range(start, stop+1):
+            self._text[row-1] = [u' '] * len(self._text[row-1])
+            self._attrs[row-1] = [back_attr] * len(self._attrs[row-1])
+        self._writer.write_clear(back_attr, start, stop)
+
+    def scroll(self, direction, from_line, scroll_height, back_attr):
+        """Scroll the screen between from_line and scroll_height."""
+        self._record_pixels()
+        for pixels in (self._pixels, self._recorded):
+            recording.scroll_pixels(
+                pixels, self._font_height, direction, from_line, scroll_height, back_attr
+            )
+        width = len(self._text[0]) if self._text else 0
+        for rows, blank in ((self._text, u' '), (self._attrs, back_attr)):
+            section = rows[from_line-1:scroll_height]
+            if direction == -1:
+                rows[from_line-1:scroll_height] = section[1:] + [[blank] * width]
+            else:
+                rows[from_line-1:scroll_height] = [[blank] * width] + section[:-1]
+        self._writer.write_scroll(direction, from_line, scroll_height, back_attr)
+
+    def update(self, row, col, unicode_matrix, attr_matrix, y0, x0, sprite):
+        """Record text and pixels at a given position."""
+        for text, attrs, chars, char_attrs in zip(
+                self._text[row-1:], self._attrs[row-1:], unicode_matrix, attr_matrix
+            ):
+            text[col-1:col-1+len(chars)] = chars
+            attrs[col-1:col-1+len(char_attrs)] = char_attrs
+        self._writer.write_text(row, col, unicode_matrix, attr_matrix)
+        if sprite is None:
+            return
+        # clip to size if needed
+        sprite = sprite[:self._pixels.height-y0, :self._pixels.width-x0]
+        self._pixels[y0:y0+sprite.height, x0:x0+sprite.width] = sprite
+        self._dirty_rects.append((y0, x0, sprite.height, sprite.width))
@@ -41,6 +41,10 @@ N_BLINK_STATES = 4
 # ms duration of a blink
 BLINK_TIME = 120
 CYCLE_TIME = BLINK_TIME // BLINK_CYCLES
+# number of changed rectangles above which we redraw the whole window
+MAX_DIRTY_RECTS = 64
+# logical pixels around a changed rectangle that affect it through smooth scaling
+SMOOTH_MARGIN = 1
 
 
 # blank icon
@@ -274,6 +278,10 @@ class SDL2Clipboard(clipboard.Clipboard):
 
 ###############################################################################
 
+def _copy_rect(rect):
+    """Copy an SDL rectangle, as blit functions overwrite their rectangle arguments."""
+    return sdl2.SDL_Rect(rect.x, rect.y, rect.w, rect.h)
+
 def _pixels2d(surface_ptr):
     """Creates a 2D pixel array view of the passed 8-bit surface."""
     # based on pysdl2.ext.pixels2d by Marcus von Appen
@@ -373,6 +381,12 @@ class VideoSDL2(VideoPlugin):
         # one cache per blink state
         self._display_cache = [None] * N_BLINK_STATES
         self._has_display_cache = [False] * N_BLINK_STATES
+        # rectangles (in logical window coordinates) that have changed since the last flip
+        self._dirty_rects = []
+        # rectangles that have changed since each blink state cache was last drawn
+        self._stale_rects = [[] for _ in range(N_BLINK_STATES)]
+        # blink state currently on the display
+        self._shown_blink_state = None
         # pointer to the zoomed surface
         self._zoomed_surface = None
         # clipboard handler
@@ -802,11 +816,14 @@ class VideoSDL2(VideoPlugin):
             blink_state, blink_tock = divmod(self._cycle, BLINK_CYCLES)
             if not self._palette_blinks and not self._text_cursor:
                 blink_state = 1
-            # flip display fully if changed, use cache if just blinking
-            if self.busy:
+            # flip display fully if changed, flip changed parts if we can,
+            # use cache if just blinking
+            if self.busy or self._dirty_rects and not self._can_flip_partial(blink_state):
                 self._clear_display_cache()
                 self._flip_busy(blink_state)
                 self.busy = False
+            elif self._dirty_rects:
+                self._flip_partial(blink_state)
             elif (self._palette_blinks or self._text_cursor) and blink_tock == 0:
                 self._flip_lazy(blink_state)
 
@@ -814,6 +831,18 @@ class VideoSDL2(VideoPlugin):
         """Clear cursor cache on busy flip."""
         # one cache per blink state
         self._has_display_cache = [False] * N_BLINK_STATES
+        self._stale_rects = [[] for _ in range(N_BLINK_STATES)]
+        self._dirty_rects = []
+
+    def _can_flip_partial(self, blink_state):
+        """Check if only the changed rectangles need to be redrawn."""
+        return (
+            len(self._dirty_rects) <= MAX_DIRTY_RECTS
+            and blink_state == self._shown_blink_state
+            and self._has_display_cache[blink_state]
+            and not self._pixel_packing
+            and not self._clipboard_interface.active()
+        )
 
     def _flip_lazy(self, blink_state):
         """Blink the cursor only, to avoid doing all the scaling and converting work."""
@@ -821,11 +850,104 @@ class VideoSDL2(VideoPlugin):
             sdl2.SDL_BlitSurface(
                 self._display_cache[blink_state], None, self._display_surface, None
             )
+            # bring the cache up to date with what changed since it was drawn
+            self._draw_rects(blink_state, self._stale_rects[blink_state])
+            self._stale_rects[blink_state] = []
+            self._shown_blink_state = blink_state
             sdl2.SDL_UpdateWindowSurface(self._display)
         else:
             # if we don't have a cache for this state, build it
             self._flip_busy(blink_state)
 
+    def _flip_partial(self, blink_state):
+        """Draw the changed rectangles of the canvas to the screen."""
+        rects, self._dirty_rects = self._dirty_rects, []
+        targets = self._draw_rects(blink_state, rects)
+        # the caches for other blink states are now out of date in these places
+        for state in range(N_BLINK_STATES):
+            if state != blink_state and self._has_display_cache[state]:
+                self._stale_rects[state].extend(rects)
+                if len(self._stale_rects[state]) > MAX_DIRTY_RECTS:
+                    self._has_display_cache[state] = False
+                    self._stale_rects[state] = []
+        # flip the changed parts of the display
+        sdl2.SDL_UpdateWindowSurfaceRects(
+            self._display, (sdl2.SDL_Rect * len(targets))(*targets), len(targets)
+        )
+
+    def _draw_rects(self, blink_state, rects):
+        """Convert and scale rectangles of the canvas onto display and cache; return targets."""
+        targets = []
+        if not rects:
+            return targets
+        # apply cursor to work surface
+        with self._show_cursor((blink_state % 2) or not self._text_cursor):
+            sdl2.SDL_SetSurfacePalette(self._window_surface, self._palette[blink_state // 2])
+            for rect in rects:
+                target = self._draw_rect(*rect)
+                # save in display cache for this blink state
+                sdl2.SDL_BlitSurface(
+                    self._display_surface, _copy_rect(target),
+                    self._display_cache[blink_state], _copy_rect(target)
+                )
+                targets.append(target)
+        return targets
+
+    def _draw_rect(self, x, y, width, height):
+        """Convert and scale a rectangle of the work surface onto the display."""
+        # include the pixels that contribute to the scaled rectangle
+        margin = SMOOTH_MARGIN if self._smooth else 0
+        lwindow_w, lwindow_h = self._window_sizer.window_size_logical
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(lwindow_w, x + width + margin), min(lwindow_h, y + height + margin)
+        # convert 8-bit work surface rectangle to (usually) 32-bit display surface format
+        pixelformat = self._display_surface.contents.format.contents
+        conv = sdl2.SDL_CreateRGBSurface(
+            0, x1 - x0, y1 - y0, pixelformat.BitsPerPixel,
+            pixelformat.Rmask, pixelformat.Gmask, pixelformat.Bmask, pixelformat.Amask
+        )
+        sdl2.SDL_BlitSurface(
+            self._window_surface, sdl2.SDL_Rect(x0, y0, x1 - x0, y1 - y0), conv, None
+        )
+        target = self._scale_rect(x, y, width, height)
+        if not self._smooth:
+            sdl2.SDL_BlitScaled(conv, None, self._display_surface, _copy_rect(target))
+        else:
+            scalex, scaley = self._window_sizer.scale
+            zoomed = sdl2.sdlgfx.zoomSurface(conv, scalex, scaley, 1)
+            # only use the part of the zoomed surface that is not affected by its edges
+            zoomed_origin = self._scale_rect(x0, y0, 0, 0)
+            source = sdl2.SDL_Rect(
+                target.x - zoomed_origin.x, target.y - zoomed_origin.y, target.w, target.h
+            )
+            sdl2.SDL_BlitSurface(zoomed, source, self._display_surface, _copy_rect(target))
+            sdl2.SDL_FreeSurface(zoomed)
+        sdl2.SDL_FreeSurface(conv)
+        return target
+
+    def _scale_rect(self, x, y, width, height):
+        """Convert a rectangle in logical window coordinates to display coordinates."""
+        xshift, yshift = self._window_sizer.letterbox_shift
+        window_w, window_h = self._window_sizer.window_size
+        lwindow_w, lwindow_h = self._window_sizer.window_size_logical
+        left, top = x * window_w // lwindow_w, y * window_h // lwindow_h
+        right = (x + width) * window_w // lwindow_w
+        bottom = (y + height) * window_h // lwindow_h
+        return sdl2.SDL_Rect(xshift + left, yshift + top, right - left, bottom - top)
+
+    def _mark_dirty(self, x, y, width, height):
+        """Mark a rectangle of the canvas to be redrawn on the next flip."""
+        border_x, border_y = self._window_sizer.border_shift
+        self._dirty_rects.append((x + border_x, y + border_y, width, height))
+
+    def _mark_cursor_dirty(self):
+        """Mark the cursor cell to be redrawn on the next flip."""
+        if self._cursor_visible and self._cursor_width:
+            self._mark_dirty(
+                (self._cursor_col-1) * self._font_width, (self._cursor_row-1) * self._font_height,
+                self._cursor_width, self._font_height
+            )
+
     def _flip_busy(self, blink_state):
         """Draw the canvas to the screen."""
         if self._pixel_packing:
@@ -870,6 +992,8 @@ class VideoSDL2(VideoPlugin):
         # save in display cache for this blink state
         sdl2.SDL_BlitSurface(self._display_surface, None, self._display_cache[blink_state], None)
         self._has_display_cache[blink_state] = True
+        self._stale_rects[blink_state] = []
+        self._shown_blink_state = blink_state
         # flip the display
         sdl2.SDL_UpdateWindowSurface(self._display)
 
@@ -1030,30 +1154,37 @@ class VideoSDL2(VideoPlugin):
             (start-1)*self._font_height : stop*self._font_height,
             0 : self._window_sizer.width
         ] = back_attr
-        self.busy = True
+        self._mark_dirty(
+            0, (start-1)*self._font_height,
+            self._window_sizer.width, (stop-start+1)*self._font_height
+        )
 
     def show_cursor(self, cursor_on, cursor_blinks):
         """Change visibility of cursor."""
+        self._mark_cursor_dirty()
         self._text_cursor = cursor_blinks
         self._cursor_visible = cursor_on
-        self.busy = True
+        self._mark_cursor_dirty()
 
     def move_cursor(self, row, col, attr, width):
         """Move the cursor to a new position."""
-        if self._cursor_visible and (
-                self._cursor_row, self._cursor_col, self._cursor_attr, self._cursor_width
-            ) != (row, col, attr, width):
-            self.busy = True
+        changed = (
+            self._cursor_row, self._cursor_col, self._cursor_attr, self._cursor_width
+        ) != (row, col, attr, width)
+        if changed:
+            # redraw the cell the cursor is leaving
+            self._mark_cursor_dirty()
         self._cursor_row, self._cursor_col = row, col
         self._cursor_attr = attr
         self._cursor_width = width
+        if changed:
+            self._mark_cursor_dirty()
 
     def set_cursor_shape(self, from_line, to_line):
         """Build a sprite for the cursor."""
         self._cursor_from = from_line
         self._cursor_height = to_line + 1 - from_line
-        if self._cursor_visible:
-            self.busy = True
+        self._mark_cursor_dirty()
 
     def scroll(self, direction, from_line, scroll_height, back_attr):
         """Scroll the screen between from_line and scroll_height."""
@@ -1073,7 +1204,7 @@ class VideoSDL2(VideoPlugin):
             pixels[lo_y0:lo_y1, :] = pixels[hi_y0:hi_y1, :].copy()
             # clear the new empty line
             pixels[hi_y0:lo_y0, :] = back_attr
-        self.busy = True
+        self._mark_dirty(0, hi_y0, pixels.width, lo_y1 - hi_y0)
 
     def update(self, row, col, unicode_matrix, attr_matrix, y0, x0, sprite):
         """Put text or pixels at a given position."""
@@ -1085,4 +1216,4 @@ class VideoSDL2(VideoPlugin):
         if y0 + sprite.height > pixels.height or x0 + sprite.width > pixels.width:
             sprite = sprite[:pixels.height-y0, :pixels.width-x0]
         pixels[y0:y0+sprite.height, x0:x0+sprite.width] = sprite
-        self.busy = True
+        self._mark_dirty(x0, y0, sprite.width, sprite.height)
@@ -14,6 +14,7 @@ import traceback
 
 from . import config
 from . import info
+from . import batch
 from .basic import Session
 from .debug import DebugSession
 from .guard import ExceptionGuard
@@ -37,6 +38,9 @@ def main(*arguments):
         elif settings.convert:
             # convert and exit
             _convert(settings)
+        elif settings.batch:
+            # run a batch of jobs in worker processes and exit
+            _run_batch(settings)
         elif settings.interface:
             # start an interpreter session with interface
             _run_session_with_interface(settings)
@@ -69,6 +73,11 @@ def _convert(settings):
             mode_suffix = b',%s' % (mode.encode('ascii'),) if mode.upper() in ('A', 'P') else b''
             session.execute(b'SAVE "%s"%s' % (outfile, mode_suffix))
 
+def _run_batch(settings):
+    """Run a batch of jobs."""
+    job_file, workers, timeout = settings.batch_params
+    batch.run_batch(job_file, workers, timeout, settings.session_params)
+
 
 def _run_session_with_interface(settings):
     """Start an interactive interpreter session."""
@@ -77,14 +86,15 @@ def _run_session_with_interface(settings):
     except InitFailed as e: # pragma: no cover
         logging.error(e)
     else:
-        exception_guard = ExceptionGuard(interface, **settings.guard_params)
         interface.launch(
-            _run_session,
-            interface=interface,
-            exception_handler=exception_guard,
-            **settings.launch_params
+            _run_guarded_session, guard_params=settings.guard_params, **settings.launch_params
         )
 
+def _run_guarded_session(interface, guard_params, **launch_params):
+    """Start or resume session on an interface, with crash guard."""
+    exception_guard = ExceptionGuard(interface, **guard_params)
+    _run_session(interface=interface, exception_handler=exception_guard, **launch_params)
+
 def _run_session(
         interface=None, exception_handler=nullcontext,
         resume=False, debug=False, state_file=None,
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+""" PC-BASIC benchmarks
+
+(c) 2020--2026 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import shutil
+import tempfile
+from timeit import default_timer as timer
+
+# make pcbasic package accessible if run from top level
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path = [os.path.dirname(HERE)] + sys.path
+
+from pcbasic import Session
+
+
+def _timed(session, code):
+    """Execute BASIC code in a session and return the time taken, in seconds."""
+    start = timer()
+    session.execute(code)
+    return timer() - start
+
+
+def bench_heap():
+    """Fill string and numeric arrays of increasing size in large-heap mode."""
+    print('%8s %10s %12s %10s' % ('elements', 'bytes', 'free', 'seconds'))
+    for size in (250, 1000, 4000, 16000):
+        with Session(large_heap=True, max_memory=16*1024*1024, input_streams=None) as s:
+            seconds = _timed(s, (
+                'DIM A$(%d), B#(%d)\r'
+                'FOR I=0 TO %d: A$(I)=STRING$(200, 65 + I MOD 26): B#(I)=I/3: NEXT\r'
+            ) % (size, size, size))
+            free = s.evaluate('FRE(0)')
+            error = s.evaluate('ERR')
+        data = (size + 1) * (200 + 5 + 8)
+        print('%8d %10d %12d %10.3f%s' % (
+            size, data, free, seconds, ' (error %d)' % (error,) if error else ''
+        ))
+
+
+def bench_substrings():
+    """Parse fixed-width records with nested LEFT$, MID$ and RIGHT$."""
+    with Session(input_streams=None) as s:
+        s.execute('R$ = STRING$(40, "0") + "12345678901234567890" + STRING$(40, "A")')
+        seconds = _timed(s, (
+            'FOR I=1 TO 5000: '
+            'A$ = MID$(LEFT$(R$, 60), 41, 10): B$ = RIGHT$(MID$(R$, 31, 40), 15): '
+            'N = VAL(MID$(MID$(R$, 41, 20), 5, 5)): '
+            'NEXT'
+        ))
+    print('%d records in %.3f seconds' % (5000, seconds))
+
+
+def bench_graphics():
+    """Draw patterned lines, circles and ellipses."""
+    with Session(input_streams=None) as s:
+        s.execute('SCREEN 2')
+        seconds = _timed(s, (
+            'FOR I=0 TO 99: '
+            'LINE (0, I)-(639, 199-I), 1, , &HF0F0: LINE (I, 0)-(639-I, 199): '
+            'CIRCLE (320, 100), I*3, 1: CIRCLE (320, 100), I*3, 1, , , 0.2: '
+            'NEXT'
+        ))
+    print('400 shapes in %.3f seconds' % (seconds,))
+
+
+def bench_paint():
+    """Flood-fill the EGA screen with a solid colour and with a tiled pattern."""
+    with Session(video='ega', input_streams=None) as s:
+        s.execute('SCREEN 9: CIRCLE (320, 175), 100, 15')
+        seconds = _timed(s, (
+            'PAINT (0, 0), 1, 15: PAINT (320, 175), CHR$(&HAA)+CHR$(&H55)+CHR$(&HFF)+CHR$(0), 15'
+        ))
+    print('2 fills in %.3f seconds' % (seconds,))
+
+
+def bench_print():
+    """Print and list lines of text that scroll the screen."""
+    with Session(input_streams=None, output_streams=None) as s:
+        s.execute('10 FOR I=1 TO 2000: PRINT "LINE"; I; TAB(20); STRING$(40, 42): NEXT')
+        for line in range(100, 600):
+            s.execute('%d REM %s' % (line, 'PRINT "LINE"; I; TAB(20); STRING$(40, 42)'))
+        seconds = _timed(s, 'RUN: LIST')
+    print('2500 lines in %.3f seconds' % (seconds,))
+
+
+def bench_sprites():
+    """Animate a sprite with PUT in XOR mode."""
+    with Session(input_streams=None) as s:
+        s.execute('SCREEN 1: DIM A%(2000): CIRCLE (40, 40), 30, 3: PAINT (40, 40), 2, 3')
+        s.execute('GET (0, 0)-(79, 79), A%')
+        seconds = _timed(s, 'FOR I=0 TO 499: PUT (I MOD 200, 50), A%: NEXT')
+    print('500 frames in %.3f seconds' % (seconds,))
+
+
+def bench_textload():
+    """Load full text screens into video memory with BLOAD."""
+    tempdir = tempfile.mkdtemp()
+    try:
+        with Session(devices={'c': tempdir}, input_streams=None, output_streams=None) as s:
+            s.execute('FOR I=1 TO 24: PRINT STRING$(79, 32 + I): NEXT')
+            s.execute('DEF SEG=&HB800: BSAVE "c:screen.bin", 0, 4000')
+            seconds = _timed(s, 'FOR I=1 TO 200: CLS: BLOAD "c:screen.bin": NEXT')
+            saved = s._impl.display.vpage.saved_updates
+    finally:
+        shutil.rmtree(tempdir)
+    print('200 screens in %.3f seconds, %d update events saved' % (seconds, saved))
+
+
+BENCHMARKS = {
+    'graphics': bench_graphics,
+    'heap': bench_heap,
+    'paint': bench_paint,
+    'print': bench_print,
+    'sprites': bench_sprites,
+    'substrings': bench_substrings,
+    'textload': bench_textload,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        print('%s: %s' % (name, BENCHMARKS[name].__doc__))
+        BENCHMARKS[name]()
@@ -345,11 +345,15 @@ class ByteMatrixTest(unittest.TestCase):
         assert ByteMatrix(1, 8, [[0, 1, 2, 4, 8, 16, 32, 64]]).packed(4) == bytearray(b'\x18\x00')
         # zero fill-out
         assert ByteMatrix(1, 7, 1).packed(8) == bytearray(b'\xfe')
+        # each row starts on a new byte
+        assert ByteMatrix(2, 3, [[1, 2, 3], [3, 2, 1]]).packed(4) == bytearray(b'\x6c\xe4')
+        assert ByteMatrix(2, 3, [[15, 1, 10], [0, 16, 5]]).packed(2) == bytearray(b'\xf1\xa0\x00\x50')
 
     def test_unpack(self):
         """Test unpacking packed representation."""
         assert ByteMatrix.frompacked(b'\x18\x00', 1, 4) == ByteMatrix(1, 8, [[0, 1, 2, 0, 0, 0, 0, 0]])
         assert ByteMatrix.frompacked(b'\xfe', 1, 8) == ByteMatrix(1, 8, [[1, 1, 1, 1, 1, 1, 1, 0]])
+        assert ByteMatrix.frompacked(b'\xf1\xa0', 2, 2) == ByteMatrix(2, 2, [[15, 1], [10, 0]])
         # empty
         assert ByteMatrix.frompacked(b'', 0, 8) == ByteMatrix()
         # insufficient length
@@ -412,6 +416,14 @@ class ByteMatrixTest(unittest.TestCase):
         bm.move(1, 2, 0, 2, 0, 0)
         assert bm == ByteMatrix(2, 3, b'453\x00\x006')
 
+    def test_move_rows(self):
+        """Test moving whole rows up and down."""
+        bm = ByteMatrix(4, 2, b'11223344')
+        bm.move(1, 4, 0, 2, 0, 0)
+        assert bm == ByteMatrix(4, 2, b'223344\0\0')
+        bm.move(0, 2, 0, 2, 1, 0)
+        assert bm == ByteMatrix(4, 2, b'\0\x002233\0\0')
+
     def test_to_bytes(self):
         """Test to_bytes."""
         assert ByteMatrix(2, 3, b'123456').to_bytes() == b'123456'
@@ -441,6 +453,37 @@ class ByteMatrixTest(unittest.TestCase):
         bm[:, :] = 0
         assert buf == bytearray(b'\0\0\x0000000\0\0\x0000000')
 
+    def test_view_slice(self):
+        """Test that slices of views are views and slices of matrices are copies."""
+        buf = bytearray(b'1230000045600000')
+        bm = ByteMatrix.view_from_buffer(2, 3, 8, buf)
+        bm[:, 1:][1, 1:] = 0x41
+        assert bm == ByteMatrix(2, 3, b'12345A')
+        copy = bm.copy()
+        copy[0:1, :][:, :] = 0
+        assert copy == ByteMatrix(2, 3, b'12345A')
+        bm[:, :] ^= 1
+        assert buf == bytearray(b'0320000054@00000')
+
+    def test_step_slice(self):
+        """Test slicing with steps."""
+        bm = ByteMatrix(4, 4, b'0123456789abcdef')
+        assert bm[1::2, :] == ByteMatrix(2, 4, b'4567cdef')
+        assert bm[::-2, 1:3] == ByteMatrix(2, 2, b'de56')
+        assert bm[1:3, ::2] == ByteMatrix(2, 2, b'468a')
+        bm[::2, 1:3] = 0x2a
+        assert bm == ByteMatrix(4, 4, b'0**345678**bcdef')
+        bm[::3, :] ^= 1
+        assert bm == ByteMatrix(4, 4, b'1++245678**bbedg')
+
+    def test_wide_operations(self):
+        """Test elementwise bitwise operations between matrices."""
+        bm = ByteMatrix(2, 3, b'\x00\x0f\xf0\xff\x55\x01')
+        rhs = ByteMatrix(2, 3, b'\x00\xff\xff\x0f\xaa\x00')
+        assert bm | rhs == ByteMatrix(2, 3, b'\x00\xff\xff\xff\xff\x01')
+        assert bm & rhs == ByteMatrix(2, 3, b'\x00\x0f\xf0\x0f\x00\x00')
+        assert bm ^ rhs == ByteMatrix(2, 3, b'\x00\xf0\x0f\xf0\xff\x01')
+
     def test_hstack(self):
         """Test horizontal stacking."""
         bm = ByteMatrix(2, 3, b'123456')
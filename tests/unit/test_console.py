@@ -240,6 +240,17 @@ class ConsoleTest(TestCase):
         assert s._impl.text_screen.current_col == 3, s._impl.text_screen.current_col
         assert self.get_text_stripped(s) == [b'', b'xy'] + [b''] * 23, repr(self.get_text_stripped(s))
 
+    def test_cursor_run_wraps(self):
+        """Test cursor movement after print a run of chars that wraps."""
+        with Session() as s:
+            s.execute(b'locate 1,75: print string$(90, "x") "y" chr$(9) "z";')
+        assert s._impl.text_screen.current_row == 3, s._impl.text_screen.current_row
+        assert s._impl.text_screen.current_col == 18, s._impl.text_screen.current_col
+        # string is moved to the next row as it doesn't fit
+        assert self.get_text_stripped(s) == (
+            [b'', b'x'*80, b'x'*10 + b'y' + b' '*5 + b'z'] + [b''] * 22
+        ), repr(self.get_text_stripped(s))
+
     def test_cursor_overflow_cr_char(self):
         """Test cursor movement after print char, return, char on last column."""
         with Session() as s:
@@ -10,10 +10,22 @@ import unittest
 import os
 
 from pcbasic import Session
-from pcbasic.compat import int2byte
+from pcbasic.compat import int2byte, queue
+from pcbasic.basic.base import signals
 from tests.unit.utils import TestCase, run_tests
 
 
+class QueueInterface(object):
+    """Interface stand-in that keeps its queues for inspection."""
+
+    def __init__(self, needs_pixels=True):
+        self.needs_pixels = needs_pixels
+        self.queues = queue.Queue(), queue.Queue(), queue.Queue()
+
+    def get_queues(self):
+        return self.queues
+
+
 class DisplayTest(TestCase):
     """Unit tests for display."""
 
@@ -49,6 +61,119 @@ class DisplayTest(TestCase):
                 model_chars = model.read()
             assert bytes(bytearray(_c for _r in self.get_text(s) for _c in _r)) == model_chars
 
+    def test_line_pattern(self):
+        """Draw patterned lines and boxes."""
+        with Session() as s:
+            s.execute(b'SCREEN 1: LINE (0,0)-(39,0),3,,&HF0F0')
+            s.execute(b'LINE (0,10)-(1,49),2,,&HC000')
+            s.execute(b'LINE (100,100)-(119,109),1,B,&HAAAA')
+            pixels = s.get_pixels()
+        # lines at constant height are drawn from the end point
+        assert pixels[0][:40] == ((0,)*4 + (3,)*4) * 5
+        # steep line is patterned along its length
+        assert [_r[0] for _r in pixels[10:50]] == [2, 2] + [0]*14 + [2, 2] + [0]*22
+        assert [_r[1] for _r in pixels[10:50]] == [0]*32 + [2, 2] + [0]*6
+        # the box pattern continues from side to side
+        assert pixels[109][100:120] == (0, 1)*10
+        assert pixels[100][100:120] == (1,) + (1, 0)*9 + (1,)
+        assert [_r[100] for _r in pixels[100:110]] == [1, 0]*5
+
+    def test_paint(self):
+        """Flood-fill with a solid colour and with a tiled pattern."""
+        with Session() as s:
+            s.execute(b'SCREEN 1: LINE (10,10)-(29,19),3,B: PAINT (15,15),2,3')
+            s.execute(b'LINE (40,10)-(59,19),3,B: PAINT (50,15),CHR$(&H24)+CHR$(&H90),3')
+            pixels = s.get_pixels()
+        # solid fill stops at the border
+        assert pixels[15][8:32] == (0, 0, 3) + (2,)*18 + (3, 0, 0)
+        assert [_r[20] for _r in pixels[8:22]] == [0, 0, 3] + [2]*8 + [3, 0, 0]
+        # pattern rows are tiled from the left edge of the screen
+        assert pixels[14][40:60] == (3,) + (2, 1, 0, 0)*4 + (2, 1, 3)
+        assert pixels[15][40:60] == (3,) + (1, 0, 0, 2)*4 + (1, 0, 3)
+
+    def test_video_memory(self):
+        """Save and load interleaved CGA memory."""
+        with Session(devices={'c': self.output_path()}, peek_values={}) as s:
+            s.execute(b'SCREEN 1: DEF SEG = &HB800: POKE &H2000, &HE4: POKE 80, &H1B')
+            s.execute(b'CIRCLE (160, 100), 90, 2: PAINT (160, 100), 1, 2')
+            s.execute(b'BSAVE "c:screen.bin", 0, &H4000')
+            pixels = s.get_pixels()
+            s.execute(b'CLS: BLOAD "c:screen.bin", 0')
+            assert s.get_pixels() == pixels
+            assert s.evaluate(b'PEEK(&H2000) + 256*PEEK(80)') == 0x1be4
+        # odd rows are in the second bank
+        assert pixels[1][:4] == (3, 2, 1, 0)
+        assert pixels[2][:4] == (0, 1, 2, 3)
+        assert pixels[100][150:170] == (1,)*20
+
+    def test_ram_font(self):
+        """Redefining a RAM font character changes text rendered after it."""
+        with Session() as s:
+            s.execute(b'SCREEN 1: CLS: LOCATE 1, 1: PRINT CHR$(200);')
+            before = s.get_pixels()[:8]
+            # character 200 is the 73rd in the RAM font table
+            s.execute(b'DEF SEG = &HC000: FOR I = 0 TO 7: POKE &H500 + 72*8 + I, &HFF: NEXT')
+            s.execute(b'LOCATE 1, 1: PRINT CHR$(200);')
+            after = s.get_pixels()[:8]
+            assert before != after
+            assert [_row[:8] for _row in after] == [(3,)*8]*8
+
+    def test_merged_updates(self):
+        """Loading a full text screen submits merged updates."""
+        with Session(devices={'c': self.output_path()}) as s:
+            s.execute(b'CLS: FOR I = 1 TO 24: PRINT STRING$(I, 64 + I): NEXT')
+            s.execute(b'DEF SEG = &HB800: BSAVE "c:text.bin", 0, 4000')
+            text = s.get_chars()
+            s.execute(b'CLS: BLOAD "c:text.bin"')
+            assert s.get_chars() == text
+            # one event for the whole page instead of one for each row
+            assert s._impl.display.vpage.saved_updates >= 24
+
+    def test_batched_updates(self):
+        """Screen updates are handed to the interface in batches, once per frame."""
+        iface = QueueInterface()
+        with Session() as s:
+            s.attach(iface)
+            s.execute(b'CLS: FOR I = 1 TO 200: LOCATE 1, 1: PRINT I;: NEXT')
+            # updates to the same spot are replaced by later ones
+            assert s._impl.queues.video.coalesced > 0
+        video_queue = iface.queues[1]
+        batches = [video_queue.get() for _ in range(video_queue.qsize())]
+        assert batches
+        assert all(_signal.event_type == signals.VIDEO_BATCH for _signal in batches)
+        updates = [
+            _signal for _batch in batches for _signal in _batch.params[0]
+            if _signal.event_type == signals.VIDEO_UPDATE
+        ]
+        assert len(updates) < 200, len(updates)
+        # the last update shows the last number
+        assert u''.join(updates[-1].params[2][0]).strip() == u'200'
+
+    def test_text_only(self):
+        """Text interfaces get no pixels, but the pixels are drawn when asked for."""
+        program = (
+            b'SCREEN 1: FOR I = 1 TO 30: PRINT I, STRING$(20, 64 + I): NEXT: '
+            b'LINE (0, 0)-(100, 100), 2: PRINT "done"'
+        )
+        pixels = []
+        for needs_pixels in (True, False):
+            iface = QueueInterface(needs_pixels)
+            with Session() as s:
+                s.attach(iface)
+                s.execute(program)
+                pixels.append(s.get_pixels())
+            video_queue = iface.queues[1]
+            updates = [
+                _signal
+                for _batch in (video_queue.get() for _ in range(video_queue.qsize()))
+                for _signal in _batch.params[0]
+                if _signal.event_type == signals.VIDEO_UPDATE
+            ]
+            assert updates
+            # the sprite is the last parameter
+            assert all((_signal.params[-1] is None) != needs_pixels for _signal in updates)
+        assert pixels[0] == pixels[1]
+
 
 if __name__ == '__main__':
     run_tests()
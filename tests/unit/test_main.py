@@ -9,6 +9,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import io
+import json
 import sys
 import unittest
 from tempfile import NamedTemporaryFile
@@ -16,8 +17,11 @@ from tempfile import NamedTemporaryFile
 from pcbasic import main
 from pcbasic.compat import stdio
 from pcbasic.debug import DebugException
+from pcbasic.interface import recording, process
+from pcbasic.basic.base import signals
+from pcbasic.basic.base.bytematrix import ByteMatrix
 from tests.unit.utils import TestCase, run_tests
-from pcbasic.compat import PY2, WIN32
+from pcbasic.compat import PY2, WIN32, queue
 
 
 class MainTest(TestCase):
@@ -72,6 +76,83 @@ class MainTest(TestCase):
         with stdio.quiet():
             main('-q')
 
+    def test_cli_process(self):
+        """Exercise cli run in a separate interpreter process."""
+        with stdio.quiet():
+            main('-bq', '--process')
+
+    def _record(self, name, program, *args):
+        """Record a run of a program and return the screen at the end of the recording."""
+        record_file = self.output_path(name)
+        with stdio.quiet():
+            main('--interface=record', '--record=' + record_file, '-q', '--exec=' + program, *args)
+        screen = recording.Screen()
+        with recording.open_recording(record_file) as stream:
+            for _, kind, params in recording.read_recording(stream):
+                screen.apply(kind, params)
+        return screen
+
+    def test_record_process(self):
+        """Pixels drawn in a separate interpreter process reach the interface."""
+        program = (
+            'SCREEN 1:CIRCLE (160, 100), 50, 3:'
+            'FOR I = 1 TO 60:PRINT I; STRING$(I MOD 30, "*"):NEXT:LINE (0, 0)-(100, 100), 2, BF'
+        )
+        screen = self._record(u'thread.rec', program)
+        process_screen = self._record(u'process.rec', program, '--process')
+        assert process_screen.pixels[50, 50] == 2
+        assert process_screen.pixels == screen.pixels
+        assert process_screen.cells == screen.cells
+
+    @unittest.skipIf(not process.shared_memory, 'shared memory needs Python 3.8 or later.')
+    def test_process_pipes(self):
+        """Pixels go through the shared buffer and the pipes fail cleanly."""
+        input_queue, video_queue, audio_queue = queue.Queue(), queue.Queue(), queue.Queue()
+        relay = process.ProcessRelay(input_queue, video_queue, audio_queue)
+        input_recv, video_send, ack_recv, audio_send, buffer_name = relay.get_process_args()
+        inputs = process.InputPipeQueue(input_recv)
+        video = process.VideoPipeQueue(video_send, ack_recv, buffer_name, inputs.disconnect)
+        sprite = ByteMatrix(8, 8, 3)
+        batch = signals.Event(signals.VIDEO_BATCH, ([
+            signals.Event(signals.VIDEO_UPDATE, (1, 1, [[u'A']], [[3]], 0, 0, sprite))
+        ],))
+        try:
+            video.put(batch)
+            video.put(batch)
+            # both parts of the buffer are in use until the interface has taken the pixels
+            with self.assertRaises(queue.Full):
+                video.put_nowait(batch)
+            with self.assertRaises(queue.Full):
+                video.put(batch, timeout=0.1)
+            relay.cycle()
+            for _ in range(2):
+                update, = video_queue.get(False).params[0]
+                assert update.params[-1] == sprite
+            video.put(batch, timeout=1)
+        finally:
+            relay.close()
+        # the interface has gone: signals are dropped and the interpreter is told to quit
+        video.put(batch)
+        assert inputs.get(timeout=1).event_type == signals.QUIT
+        video.close()
+
+    def test_record(self):
+        """Record a run without display and convert the recording."""
+        record_file = self.output_path(u'run.rec')
+        with stdio.quiet():
+            main(
+                '--interface=record', '--record=' + record_file, '-q',
+                '--exec=SCREEN 1:PRINT "hello":CIRCLE (160, 100), 50, 3'
+            )
+        screen = recording.Screen()
+        with recording.open_recording(record_file) as stream:
+            for _, kind, params in recording.read_recording(stream):
+                screen.apply(kind, params)
+        assert u''.join(_cell[0] for _cell in screen.cells[0]).startswith(u'hello')
+        assert screen.pixels[100, 210] == 3
+        assert recording.export_images(record_file, self.output_path(u'frame%d.png'))
+        assert recording.export_asciicast(record_file, self.output_path(u'run.cast'))
+
     def test_bad_interface(self):
         """Exercise run with bad interface."""
         with stdio.quiet():
@@ -164,6 +245,49 @@ class MainTest(TestCase):
             output = outfile.read()
         assert output == b' 13 \r\n\x1a', repr(output)
 
+    # batch
+
+    def test_batch(self):
+        """Run a batch of jobs in worker processes."""
+        programs = {
+            u'hello.bas': b'10 PRINT "hello"\r\n',
+            u'loop.bas': b'10 GOTO 10\r\n',
+            u'input.bas': b'10 INPUT A$\r\n20 PRINT A$; A$\r\n',
+            u'error.bas': b'10 A = 1\r\n20 ERROR 5\r\n',
+            u'memory.bas': b'10 DIM A(5000)\r\n',
+            u'input.txt': b'abc\r\n',
+        }
+        for name, program in programs.items():
+            with open(self.output_path(name), 'wb') as f:
+                f.write(program)
+        jobs = [
+            self.output_path(u'hello.bas'),
+            u'{"id": "loop", "run": "%s", "timeout": 1}' % (self.output_path(u'loop.bas'),),
+            u'{"run": "%s", "input": "%s"}' % (
+                self.output_path(u'input.bas'), self.output_path(u'input.txt')
+            ),
+            self.output_path(u'error.bas'),
+            self.output_path(u'memory.bas'),
+            u'{"run": "%s", "max-memory": 20000}' % (self.output_path(u'memory.bas'),),
+            u'{"nothing": "to run"}',
+            self.output_path(u'input.bas'),
+        ]
+        with open(self.output_path(u'jobs.txt'), 'w') as f:
+            f.write(u'\n'.join(jobs))
+        output = io.BytesIO()
+        with stdio.redirect_output(output, 'stdout'):
+            main('--batch=%s' % (self.output_path(u'jobs.txt'),), '--workers=2')
+        results = [json.loads(_line) for _line in output.getvalue().decode('ascii').splitlines()]
+        assert [_r[u'job'] for _r in results] == [1, u'loop', 3, 4, 5, 6, 7, 8], results
+        assert [_r[u'status'] for _r in results] == [
+            u'ended', u'timeout', u'ended', u'error', u'ended', u'error', u'failed', u'input'
+        ], results
+        assert results[0][u'output'] == u'hello\r\n'
+        assert results[2][u'output'] == u'? abc\r\nabcabc\r\n'
+        assert (results[3][u'error'], results[3][u'line']) == (5, 20)
+        # out of memory
+        assert results[5][u'error'] == 7
+
 
 class ConvertTest(TestCase):
     """Unit tests for convert script."""
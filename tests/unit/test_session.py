@@ -10,10 +10,14 @@ This file is released under the GNU GPL version 3 or later.
 
 import os
 import io
+import time
 from io import open
+import threading
 import unittest
 
 from pcbasic import Session
+from pcbasic.compat import PY2
+from pcbasic.basic.base import signals
 from tests.unit.utils import TestCase, run_tests
 
 
@@ -257,6 +261,149 @@ class SessionTest(TestCase):
         assert output[:3] == [b'0', b'Break\xff', b'Syntax error\xff']
         assert output[3:] == [b''] * 22
 
+    def test_session_idle(self):
+        """Programs that wait for a keypress block until it arrives, but still keep time."""
+        with Session(input_streams=None, output_streams=None) as s:
+            s.execute(b'10 ON TIMER(1) GOSUB 100: TIMER ON')
+            s.execute(b'20 A$ = INPUT$(1)')
+            s.execute(b'30 END')
+            s.execute(b'100 T = T + 1: RETURN')
+            keypress = signals.Event(signals.KEYB_DOWN, (u'a', None, []))
+            timer = threading.Timer(2.5, s._impl.queues.inputs.put, (keypress,))
+            timer.start()
+            s.execute(b'RUN')
+            timer.join()
+            assert s.evaluate(b'A$') == b'a'
+            # the timer has gone off while we waited, and is handled once INPUT$ is done
+            assert s.evaluate(b'T') == 1
+
+    def test_session_idle_loop(self):
+        """An INKEY$ loop that does nothing else blocks until a key is pressed, but still keeps time."""
+        with Session(input_streams=None, output_streams=None) as s:
+            s.execute(b'10 ON TIMER(1) GOSUB 100: TIMER ON')
+            s.execute(b'20 IF INKEY$ = "" GOTO 20')
+            s.execute(b'30 END')
+            s.execute(b'100 T = T + 1: RETURN')
+            keypress = signals.Event(signals.KEYB_DOWN, (u'a', None, []))
+            timer = threading.Timer(2.5, s._impl.queues.inputs.put, (keypress,))
+            timer.start()
+            # trace the line numbers to count how often the loop goes round
+            s.execute(b'TRON: RUN')
+            timer.join()
+            assert s.evaluate(b'T') == 2
+        passes = b''.join(self.get_text_stripped(s)).count(b'[20]')
+        # polling every tick would go round hundreds of times
+        assert passes < 100, passes
+
+    def test_session_poll(self):
+        """Programs that compute while polling for input keep their speed."""
+        with Session(input_streams=None, output_streams=None) as s:
+            s.execute(b'10 I = I + 1: IF I < 200 THEN IF INKEY$ = "" GOTO 10')
+            start = time.time()
+            s.execute(b'RUN')
+            assert s.evaluate(b'I') == 200
+            # a tick per poll is 1.2 seconds; blocking on each poll would take 20
+            assert time.time() - start < 5
+            # in time slices, the loop is never waiting for input
+            s.press_keys(u'RUN\r')
+            statuses = [s.run(max_time=0.01)]
+            while statuses[-1] == 'running':
+                statuses.append(s.run(max_time=0.01))
+            assert statuses[-1] == 'ended'
+            assert 'waiting' not in statuses
+            assert s.evaluate(b'I') == 200
+
+    def test_session_run(self):
+        """Run a session in time slices."""
+        with Session(input_streams=None, output_streams=None) as s:
+            s.execute(b'10 FOR I = 1 TO 100: NEXT')
+            s.execute(b'20 INPUT "Name"; N$: PRINT "Hello "; N$')
+            s.execute(b'30 ERROR 5')
+            # nothing to do yet
+            assert s.run() == 'ended'
+            s.press_keys(u'RUN\r')
+            assert s.run(max_statements=10) == 'running'
+            assert 0 < s.evaluate(b'I') < 100
+            statuses = [s.run(max_statements=10) for _ in range(30)]
+            assert statuses[-1] == 'waiting'
+            s.press_keys(u'Bob\r')
+            assert s.run() == 'error'
+            assert s.run() == 'ended'
+        output = self.get_text_stripped(s)
+        # the INPUT prompt is shown once, however often we looked for input
+        assert output[:6] == [
+            b'Ok\xff', b'RUN', b'Name? Bob', b'Hello Bob', b'Illegal function call in 30\xff', b'Ok\xff'
+        ]
+
+    def test_session_run_input(self):
+        """Statements waiting for input in time slices don't do anything twice."""
+        with Session(input_streams=None, output_streams=None) as s:
+            s.execute(b'10 N = N + 1: PRINT "A"; INPUT$(1); N')
+            s.execute(b'20 INPUT "Number"; X: PRINT X * 2')
+            assert s.run(max_statements=100, command=b'RUN') == 'waiting'
+            for _ in range(4):
+                assert s.run(max_statements=100) == 'waiting'
+            s.press_keys(u'x')
+            assert s.run(max_statements=100) == 'waiting'
+            # a wrong entry has INPUT start over
+            s.press_keys(u'y\r')
+            assert s.run(max_statements=100) == 'waiting'
+            s.press_keys(u'21\r')
+            assert s.run(max_statements=100) == 'ended'
+            assert s.evaluate(b'N') == 1
+        output = self.get_text_stripped(s)
+        assert output[:5] == [b'Ax 1', b'Number? y', b'?Redo from start', b'Number? 21', b' 42']
+
+    @unittest.skipIf(PY2, 'asyncio is not available in Python 2')
+    def test_async_session(self):
+        """Run sessions side by side in the asyncio event loop."""
+        import asyncio
+        from pcbasic import AsyncSession
+        sessions = [AsyncSession(input_streams=None, output_streams=None) for _ in range(3)]
+        loop = asyncio.new_event_loop()
+        try:
+            for s in sessions:
+                s.execute(b'10 FOR I = 1 TO 100: NEXT: INPUT A: PRINT A * 2')
+                s.press_keys(u'RUN\r')
+            tasks = [loop.create_task(_s.run()) for _s in sessions]
+            loop.run_until_complete(asyncio.sleep(0.5))
+            # the sessions wait for input without holding each other up
+            assert [_s.evaluate(b'I') for _s in sessions] == [101] * 3
+            assert not any(_t.done() for _t in tasks)
+            for number, s in enumerate(sessions):
+                s.press_keys(u'%d\r' % (number,))
+            assert loop.run_until_complete(asyncio.gather(*tasks)) == ['ended'] * 3
+            assert [_s.evaluate(b'A') for _s in sessions] == [0, 1, 2]
+        finally:
+            loop.close()
+            for s in sessions:
+                s.close()
+
+    def test_session_template(self):
+        """Clone sessions from a template."""
+        template = Session.template(input_streams=None, output_streams=None)
+        with template.clone() as s, template.clone(max_memory=20000) as t:
+            s.execute(b'10 A = 1\r20 SCREEN 1: PRINT CHR$(200)')
+            s.execute(b'RUN')
+            # redefine a character in the RAM font
+            s.execute(b'DEF SEG = &HC000: FOR I = 0 TO 7: POKE &H500 + 72*8 + I, &HFF: NEXT')
+            t.execute(b'SCREEN 1: PRINT CHR$(200)')
+            # the clones share what doesn't change
+            assert s._impl.codepage is t._impl.codepage
+            assert s._impl.tokeniser._keyword_prefixes is t._impl.tokeniser._keyword_prefixes
+            # but each has its own program, variables, memory settings and screen
+            assert t.evaluate(b'A') == 0
+            assert t.execute(b'LIST') == b''
+            assert t.evaluate(b'FRE(0)') < s.evaluate(b'FRE(0)')
+            assert [_row[:8] for _row in s.get_pixels()[:8]] == [(3,)*8]*8
+            assert t.get_pixels()[:8] != s.get_pixels()[:8]
+        # a changed font doesn't carry over to later clones
+        with template.clone() as u:
+            u.execute(b'SCREEN 1: PRINT CHR$(200)')
+            assert u.get_pixels()[:8] == t.get_pixels()[:8]
+        with self.assertRaises(ValueError):
+            template.clone(syntax=u'pcjr')
+
     def test_session_no_streams(self):
         """Test Session without stream copy."""
         with Session(input_streams=None, output_streams=None) as s:
@@ -392,6 +539,30 @@ class SessionTest(TestCase):
                 [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
             ]
 
+    def test_session_large_heap(self):
+        """Test large-heap mode: data beyond 64 KiB."""
+        with Session() as session:
+            session.execute('DIM A$(1000): FOR I=0 TO 1000: A$(I)=SPACE$(200): NEXT')
+            assert session.evaluate('ERR') == 14
+        with Session(large_heap=True, max_memory=1024*1024) as session:
+            session.execute("""
+            DIM A$(1000), B#(200, 200)
+            FOR I=0 TO 1000: A$(I)=STRING$(200, 65 + I MOD 26): NEXT
+            B#(200, 200) = 1.5
+            """)
+            assert session.evaluate('ERR') == 0
+            assert session.evaluate('A$(1000)') == b'M' * 200
+            assert session.evaluate('B#(200, 200)') == 1.5
+            # 32-bit VARPTR
+            assert session.evaluate('VARPTR(B#(200, 200))') > 0xffff
+            assert session.evaluate('FRE(0)') > 0xffff
+            # strings survive garbage collection
+            session.execute('FOR I=0 TO 1000 STEP 2: A$(I)="": NEXT: X=FRE("")')
+            assert session.evaluate('A$(999)') == b'L' * 200
+            # string length is still limited to 255
+            session.execute('A$ = SPACE$(255) + "A"')
+            assert session.evaluate('ERR') == 15
+
 
 from pcbasic.basic import iostreams
 from pcbasic.basic.codepage import Codepage